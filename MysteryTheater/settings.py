@@ -10,9 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 import os
+import sys
 from datetime import timedelta
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -25,6 +28,25 @@ SECRET_KEY = os.environ["SECRET_KEY"]
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.getenv("DEBUG")
 
+# "dev" adds the debug toolbar and the API docs, "prod" loads neither unless
+# API_DOCS is set, and `manage.py test` always runs with "test"
+PROFILES = ("dev", "prod", "test")
+PROFILE = (
+    "test"
+    if sys.argv[1:2] == ["test"]
+    else os.getenv("DJANGO_PROFILE") or ("dev" if DEBUG else "prod")
+)
+if PROFILE not in PROFILES:
+    raise ImproperlyConfigured(
+        f"DJANGO_PROFILE must be one of {', '.join(PROFILES)}, not {PROFILE}"
+    )
+DEBUG_TOOLBAR = PROFILE == "dev"
+API_DOCS = PROFILE != "prod" or bool(os.getenv("API_DOCS"))
+# /api/doc/ serves the schema written by `manage.py build_schema`; "dev"
+# generates it on first request instead so it follows code changes
+API_SCHEMA_FILE = BASE_DIR / "openapi.yaml"
+API_SCHEMA_PRECOMPUTED = PROFILE != "dev"
+
 ALLOWED_HOSTS = []
 
 INTERNAL_IPS = [
@@ -41,15 +63,20 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "rest_framework",
-    "drf_spectacular",
-    "debug_toolbar",
+    *(["drf_spectacular"] if API_DOCS else []),
+    *(["debug_toolbar"] if DEBUG_TOOLBAR else []),
     "theater",
     "user",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "theater.metrics.RequestMetricsMiddleware",
+    *(
+        ["debug_toolbar.middleware.DebugToolbarMiddleware"]
+        if DEBUG_TOOLBAR
+        else []
+    ),
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -93,6 +120,32 @@ DATABASES = {
     }
 }
 
+# Rendered catalog lists and their version counters are shared by the
+# workers of a host, so a write invalidates the copies of every worker
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "catalog": {
+        "BACKEND": os.getenv(
+            "CATALOG_CACHE_BACKEND",
+            "django.core.cache.backends.filebased.FileBasedCache",
+        ),
+        "LOCATION": os.getenv(
+            "CATALOG_CACHE_LOCATION", str(BASE_DIR / "catalog_cache")
+        ),
+        "TIMEOUT": 60 * 60 * 24,
+        "OPTIONS": {"MAX_ENTRIES": 10_000},
+    },
+}
+if PROFILE == "test":
+    # Tests reset cached responses by clearing the local-memory cache
+    CACHES["catalog"] = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "catalog",
+        "TIMEOUT": 60 * 60 * 24,
+    }
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Mystery Theater",
     "DESCRIPTION": "Book your tickets for play",
@@ -159,12 +212,64 @@ REST_FRAMEWORK = {
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ],
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "theater.throttling.AnonRateThrottle",
+        "theater.throttling.UserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {"anon": "10/day", "user": "30/day"},
-    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # Negotiated on Accept or ?format=, JSON first for clients sending */*
+    "DEFAULT_RENDERER_CLASSES": [
+        "theater.renderers.ORJSONRenderer",
+        "theater.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+if API_DOCS:
+    REST_FRAMEWORK["DEFAULT_SCHEMA_CLASS"] = (
+        "drf_spectacular.openapi.AutoSchema"
+    )
+
+# Throttle counters shared by all workers; DatabaseThrottleStore keeps them
+# in an unlogged PostgreSQL table for deployments spanning several hosts
+THROTTLE_STORE = {
+    "BACKEND": os.getenv(
+        "THROTTLE_STORE_BACKEND", "theater.throttling.SQLiteThrottleStore"
+    ),
+    "LOCATION": os.getenv(
+        "THROTTLE_STORE_LOCATION", str(BASE_DIR / "throttle.sqlite3")
+    ),
+}
+if PROFILE == "test":
+    # Tests reset throttle history by clearing the local-memory cache
+    THROTTLE_STORE = {
+        "BACKEND": "theater.throttling.CacheThrottleStore",
+        "LOCATION": "default",
+    }
+
+SEAT_HOLD_MINUTES = 10
+SEAT_HOLD_MAX_MINUTES = 30
+
+# How long the first response to an Idempotency-Key is replayed
+IDEMPOTENCY_KEY_HOURS = 24
+# How long a key stays claimed by a request that has not answered yet; a
+# retry takes it over afterwards in case the worker died mid-request
+IDEMPOTENCY_KEY_LEASE_SECONDS = 60
+
+# Checkouts let through per performance at once; the rest wait their turn
+# in a queue kept in an SQLite file shared by the workers of a host
+ADMISSION_CONTROL = {
+    "LOCATION": os.getenv(
+        "ADMISSION_STORE_LOCATION", str(BASE_DIR / "admission.sqlite3")
+    ),
+    "CONCURRENCY": int(os.getenv("ADMISSION_CONCURRENCY", "4")),
+    # A slot outlives a worker that died holding it by at most this long
+    "LEASE_SECONDS": 30,
+    # Waiters that stop retrying leave the queue after this long
+    "QUEUE_SECONDS": 15,
+    "RETRY_AFTER": 1,
 }
+if PROFILE == "test":
+    # One queue per thread, emptied with the test process
+    ADMISSION_CONTROL["LOCATION"] = ":memory:"
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
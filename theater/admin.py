@@ -7,6 +7,7 @@ from theater.models import (
     Performance,
     Ticket,
     Reservation,
+    SeatHold,
     TheaterHall,
 )
 
@@ -27,3 +28,4 @@ admin.site.register(Play)
 admin.site.register(Ticket)
 admin.site.register(Performance)
 admin.site.register(TheaterHall)
+admin.site.register(SeatHold)
@@ -0,0 +1,232 @@
+import functools
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+TOKEN_HEADER = "Waiting-Room-Token"
+
+
+class WaitingRoom(APIException):
+    """Sent instead of running a checkout while others are ahead of it."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_code = "waiting_room"
+
+    default_detail = "This performance is busy, retry with the token."
+
+    def __init__(self, token, position, wait):
+        super().__init__()
+        # Sent as is, so the position stays a number
+        self.detail = {
+            "detail": self.detail,
+            "token": token,
+            "position": position,
+        }
+        # DRF turns this into the Retry-After header
+        self.wait = wait
+
+
+class AdmissionStore:
+    """Checkout slots and a FIFO of waiters per performance.
+
+    Kept in an SQLite file shared by the workers of a host. A request
+    joins the queue of a performance under its token and is let in once
+    everyone ahead of it has gone in and a slot is free; each attempt is one
+    ``BEGIN IMMEDIATE`` transaction, which SQLite serializes across
+    processes. A request for several performances waits in all of their
+    queues and takes its slots together, so it keeps its place in each
+    line while any of them is full. Slots expire after ``lease`` seconds
+    in case their worker died, and queue entries after ``patience``
+    seconds without a retry, so abandoned clients never block the line.
+    Connections are opened per thread and re-opened after a fork.
+    """
+
+    def __init__(self, location, concurrency, lease, patience):
+        self.location = str(location)
+        self.concurrency = concurrency
+        self.lease = lease
+        self.patience = patience
+        self.local = threading.local()
+
+    @property
+    def connection(self):
+        if getattr(self.local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(
+                self.location, timeout=5, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS admission_slot ("
+                "performance_id INTEGER NOT NULL, token TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, "
+                "PRIMARY KEY (performance_id, token))"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS admission_queue ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "performance_id INTEGER NOT NULL, token TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, "
+                "UNIQUE (performance_id, token))"
+            )
+            self.local.connection = connection
+            self.local.pid = os.getpid()
+        return self.local.connection
+
+    def enter(self, performance_id, token, now=None) -> int:
+        """Take a slot for ``token``; return 0, or its place in line."""
+        return self.enter_all([performance_id], token, now=now)
+
+    def enter_all(self, performance_ids, token, now=None) -> int:
+        """Take a slot of every performance for ``token`` together.
+
+        Returns 0, or the furthest place in line, in which case no slot is
+        taken and the token keeps its place in every queue.
+        """
+        now = time.time() if now is None else now
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            positions = [
+                self._queue(connection, performance_id, token, now)
+                for performance_id in performance_ids
+            ]
+            if not any(positions):
+                for performance_id in performance_ids:
+                    self._admit(connection, performance_id, token, now)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return max(positions, default=0)
+
+    def _queue(self, connection, performance_id, token, now):
+        for table in ("admission_slot", "admission_queue"):
+            connection.execute(
+                f"DELETE FROM {table} "
+                "WHERE performance_id = ? AND expires_at <= ?",
+                (performance_id, now),
+            )
+        connection.execute(
+            "INSERT INTO admission_queue "
+            "(performance_id, token, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (performance_id, token) "
+            "DO UPDATE SET expires_at = excluded.expires_at",
+            (performance_id, token, now + self.patience),
+        )
+        (taken,) = connection.execute(
+            "SELECT COUNT(*) FROM admission_slot WHERE performance_id = ?",
+            (performance_id,),
+        ).fetchone()
+        (position,) = connection.execute(
+            "SELECT COUNT(*) FROM admission_queue "
+            "WHERE performance_id = ? AND seq <= ("
+            "SELECT seq FROM admission_queue "
+            "WHERE performance_id = ? AND token = ?)",
+            (performance_id, performance_id, token),
+        ).fetchone()
+        free = self.concurrency - taken
+        return max(position - max(free, 0), 0)
+
+    def _admit(self, connection, performance_id, token, now):
+        connection.execute(
+            "DELETE FROM admission_queue "
+            "WHERE performance_id = ? AND token = ?",
+            (performance_id, token),
+        )
+        connection.execute(
+            "INSERT OR REPLACE INTO admission_slot "
+            "(performance_id, token, expires_at) VALUES (?, ?, ?)",
+            (performance_id, token, now + self.lease),
+        )
+
+    def leave(self, performance_id, token) -> None:
+        self.connection.execute(
+            "DELETE FROM admission_slot "
+            "WHERE performance_id = ? AND token = ?",
+            (performance_id, token),
+        )
+
+    def clear(self) -> None:
+        for table in ("admission_slot", "admission_queue"):
+            self.connection.execute(f"DELETE FROM {table}")
+
+
+@functools.cache
+def get_admission_store() -> AdmissionStore:
+    config = settings.ADMISSION_CONTROL
+    return AdmissionStore(
+        config["LOCATION"],
+        concurrency=config["CONCURRENCY"],
+        lease=config["LEASE_SECONDS"],
+        patience=config["QUEUE_SECONDS"],
+    )
+
+
+def parse_performance_ids(values) -> list[int]:
+    """The distinct valid ids among ``values``, in lock order."""
+    ids = set()
+    for value in values:
+        if isinstance(value, int) or (
+            isinstance(value, str) and value.isdigit()
+        ):
+            ids.add(int(value))
+    return sorted(ids)
+
+
+class AdmissionControlMixin:
+    """Runs ``create`` only once ``AdmissionStore`` lets the request in.
+
+    Other actions wrap their checkout in ``admission``. Nothing else
+    waits, so catalog reads and lists are never queued. A request for
+    several performances is let into all of them at once.
+    """
+
+    def get_admission_performance_ids(self, request) -> list[int]:
+        if not isinstance(request.data, dict):
+            return []
+        return parse_performance_ids([request.data.get("performance")])
+
+    @contextmanager
+    def admission(self, request, performance_ids=None):
+        if performance_ids is None:
+            performance_ids = self.get_admission_performance_ids(request)
+        store = get_admission_store()
+        token = request.headers.get(TOKEN_HEADER) or uuid.uuid4().hex
+        position = store.enter_all(performance_ids, token)
+        if position:
+            raise WaitingRoom(
+                token, position, settings.ADMISSION_CONTROL["RETRY_AFTER"]
+            )
+        try:
+            yield
+        finally:
+            for performance_id in performance_ids:
+                store.leave(performance_id, token)
+
+    def create(self, request, *args, **kwargs):
+        with self.admission(request):
+            return super().create(request, *args, **kwargs)
+
+
+class ReservationAdmissionMixin(AdmissionControlMixin):
+    def get_admission_performance_ids(self, request):
+        tickets = (
+            request.data.get("tickets")
+            if isinstance(request.data, dict)
+            else None
+        )
+        if not isinstance(tickets, list):
+            return []
+        return parse_performance_ids(
+            ticket.get("performance")
+            for ticket in tickets
+            if isinstance(ticket, dict)
+        )
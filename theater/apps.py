@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TheaterConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "theater"
+
+    def ready(self):
+        import theater.signals  # noqa: F401
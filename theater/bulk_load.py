@@ -0,0 +1,68 @@
+from itertools import islice
+
+from django.db import connection
+
+
+def reserve_ids(model, count: int) -> int:
+    """Reserve ``count`` consecutive primary keys and return the first one.
+
+    On PostgreSQL the block is taken from the table's sequence, so rows
+    created afterwards through the ORM never collide with it. Loaders are
+    expected to run alone; a concurrent insert between the two sequence
+    calls would get an id inside the block.
+    """
+    table = model._meta.db_table
+    column = model._meta.pk.column
+    # setval() rejects values below the sequence start, so an empty block
+    # still consumes one id
+    count = max(count, 1)
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT setval(pg_get_serial_sequence(%s, %s), "
+                "nextval(pg_get_serial_sequence(%s, %s)) + %s - 1)",
+                [table, column, table, column, count],
+            )
+            return cursor.fetchone()[0] - count + 1
+        quote = connection.ops.quote_name
+        cursor.execute(
+            f"SELECT COALESCE(MAX({quote(column)}), 0) FROM {quote(table)}"
+        )
+        return cursor.fetchone()[0] + 1
+
+
+def copy_rows(model, fields, rows, batch_size=10_000) -> int:
+    """Write tuples of ``fields`` values straight into the model's table.
+
+    PostgreSQL streams them through ``COPY ... FROM STDIN``; other backends
+    fall back to batched ``executemany``. No ``save()``, ``full_clean()`` or
+    signals run, so callers must supply every column that has no database
+    default, primary key included unless the database generates it.
+    """
+    quote = connection.ops.quote_name
+    model_fields = [model._meta.get_field(name) for name in fields]
+    table = quote(model._meta.db_table)
+    columns = ", ".join(quote(field.column) for field in model_fields)
+    written = 0
+    rows = (
+        [
+            field.get_db_prep_value(value, connection)
+            for field, value in zip(model_fields, row)
+        ]
+        for row in rows
+    )
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            with cursor.copy(f"COPY {table} ({columns}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+                    written += 1
+            return written
+
+        placeholders = ", ".join(["%s"] * len(model_fields))
+        sql = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+        while batch := list(islice(rows, batch_size)):
+            cursor.executemany(sql, batch)
+            written += len(batch)
+    return written
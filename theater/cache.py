@@ -0,0 +1,97 @@
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+
+CATALOG_CACHE = "catalog"
+
+
+def _version_key(model) -> str:
+    return f"catalog:version:{model._meta.label_lower}"
+
+
+def get_versions(models) -> list[int]:
+    cache = caches[CATALOG_CACHE]
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Seed from the clock so an evicted counter never falls back to
+            # a value that older cached responses were stored under
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(model) -> None:
+    # A new clock value rather than incr, which the file backend does as a
+    # read and a write that concurrent bumps from two workers could merge
+    caches[CATALOG_CACHE].set(
+        _version_key(model), time.time_ns(), timeout=None
+    )
+
+
+def invalidate(model) -> None:
+    """Bump ``model``'s version now and again once the write commits.
+
+    A reader that runs before the commit can still cache the old rows
+    under the first new version; the second bump orphans that entry.
+    """
+    bump_version(model)
+    transaction.on_commit(lambda: bump_version(model))
+
+
+class CachedListMixin:
+    """Serves rendered ``list`` responses from the catalog cache.
+
+    The cache key combines the endpoint, the accepted renderer, the host,
+    the normalized ``cache_query_params`` and the version counters of
+    ``cache_models``, which are bumped by signals whenever those models
+    change, so stale entries are never looked up again.
+    """
+
+    cache_models = ()
+    cache_query_params = ()
+    cache_formats = ("json", "msgpack")
+
+    def get_cache_key(self, request):
+        params = sorted(
+            (name, request.query_params.get(name, "").lower())
+            for name in self.cache_query_params
+        )
+        raw_key = repr(
+            (
+                self.basename,
+                self.action,
+                request.accepted_renderer.format,
+                # Image fields render absolute URLs for the requesting host
+                request.build_absolute_uri("/"),
+                get_versions(self.cache_models),
+                params,
+            )
+        )
+        return "catalog:response:" + hashlib.sha256(
+            raw_key.encode()
+        ).hexdigest()
+
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format not in self.cache_formats:
+            return super().list(request, *args, **kwargs)
+
+        cache = caches[CATALOG_CACHE]
+        key = self.get_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            content_type, content = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = super().list(request, *args, **kwargs)
+
+        def store(rendered):
+            if rendered.status_code == 200:
+                cache.set(key, (rendered["Content-Type"], rendered.content))
+
+        response.add_post_render_callback(store)
+        return response
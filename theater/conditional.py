@@ -0,0 +1,102 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from theater.cache import get_versions
+
+
+class ConditionalGetMixin:
+    """Answers ``If-None-Match`` / ``If-Modified-Since`` before serializing.
+
+    Use it through ``ConditionalListMixin`` and ``ConditionalRetrieveMixin``.
+    Validators are built from ``updated_at`` of the resource and of the
+    relations listed in ``etag_related``, the row count for lists, and the
+    catalog version counters of ``etag_models`` for nested data that has no
+    timestamp of its own. Lists served by ``CachedListMixin`` are validated
+    by their version counters alone, so a revalidation costs no query.
+    """
+
+    etag_related = ()
+    etag_models = ()
+
+    def get_list_state(self, queryset):
+        if getattr(self, "cache_models", ()):
+            return None, []
+        aggregates = {"count": Count("id"), "updated_at": Max("updated_at")}
+        for relation in self.etag_related:
+            aggregates[relation] = Max(f"{relation}__updated_at")
+        state = queryset.order_by().aggregate(**aggregates)
+        count = state.pop("count")
+        return count, [value for value in state.values() if value]
+
+    def get_object_state(self, instance):
+        timestamps = [instance.updated_at] + [
+            getattr(instance, relation).updated_at
+            for relation in self.etag_related
+        ]
+        return instance.pk, timestamps
+
+    def get_validators(self, request, identity, timestamps):
+        raw_etag = repr(
+            (
+                self.basename,
+                self.action,
+                request.accepted_renderer.format,
+                request.get_full_path(),
+                identity,
+                [timestamp.isoformat() for timestamp in timestamps],
+                get_versions(
+                    self.etag_models + getattr(self, "cache_models", ())
+                ),
+            )
+        )
+        etag = quote_etag(hashlib.sha256(raw_etag.encode()).hexdigest())
+        last_modified = (
+            int(max(timestamps).timestamp()) if timestamps else None
+        )
+        return etag, last_modified
+
+    def conditional_response(self, request, response_factory, validators):
+        etag, last_modified = validators
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = response_factory()
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+
+class ConditionalListMixin(ConditionalGetMixin):
+    def list(self, request, *args, **kwargs):
+        validators = self.get_validators(
+            request,
+            *self.get_list_state(self.filter_queryset(self.get_queryset())),
+        )
+        return self.conditional_response(
+            request,
+            lambda: super(ConditionalListMixin, self).list(
+                request, *args, **kwargs
+            ),
+            validators,
+        )
+
+
+class ConditionalRetrieveMixin(ConditionalGetMixin):
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        validators = self.get_validators(
+            request, *self.get_object_state(instance)
+        )
+
+        def respond():
+            serializer = self.get_serializer(instance)
+            return Response(serializer.data)
+
+        return self.conditional_response(request, respond, validators)
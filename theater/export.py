@@ -0,0 +1,82 @@
+import csv
+import io
+
+import orjson
+from django.utils.timezone import localtime
+
+# Output column and the ticket lookup it is read from, in output order
+EXPORT_COLUMNS = {
+    "performance": "performance_id",
+    "show_time": "performance__show_time",
+    "play": "performance__play__title",
+    "theater_hall": "performance__theater_hall__name",
+    "row": "row",
+    "seat": "seat",
+    "user_email": "reservation__user__email",
+    "created_at": "reservation__created_at",
+}
+DATETIME_COLUMNS = ("show_time", "created_at")
+# Rows fetched from the cursor and written out per chunk
+EXPORT_CHUNK_SIZE = 2000
+
+
+def export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield a flat dict per ticket of ``queryset``.
+
+    The rows are read through ``.iterator()``, which on PostgreSQL fetches
+    them ``chunk_size`` at a time from a server-side cursor, so memory
+    stays flat however many tickets are exported. Tickets come in the
+    order of the performance seat constraint, which the database can read
+    straight from its index.
+    """
+    rows = (
+        queryset.order_by("performance_id", "row", "seat")
+        .values_list(*EXPORT_COLUMNS.values())
+        .iterator(chunk_size=chunk_size)
+    )
+    names = list(EXPORT_COLUMNS)
+    for values in rows:
+        row = dict(zip(names, values))
+        for name in DATETIME_COLUMNS:
+            row[name] = localtime(row[name]).isoformat()
+        yield row
+
+
+def chunked(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_csv(
+    rows, fieldnames=tuple(EXPORT_COLUMNS), chunk_size=EXPORT_CHUNK_SIZE
+):
+    """Encode dict ``rows`` as CSV, a chunk at a time.
+
+    The header goes out with the first chunk, or alone when there are no
+    rows, so consumers always get the column names.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(fieldnames))
+    writer.writeheader()
+    for chunk in chunked(rows, chunk_size):
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def stream_ndjson(rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """Encode dict ``rows`` as newline-delimited JSON, a chunk at a time."""
+    for chunk in chunked(rows, chunk_size):
+        yield b"".join(
+            orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE)
+            for row in chunk
+        )
@@ -0,0 +1,215 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+
+def parse_paths(value):
+    """Split a ``?fields=`` or ``?expand=`` value; None when it is absent."""
+    if value is None:
+        return None
+    return [path.strip() for path in value.split(",") if path.strip()]
+
+
+def group_paths(paths) -> dict[str, list[str]]:
+    """Group dotted paths by their first name: ``play.title`` -> play."""
+    grouped = {}
+    for path in paths:
+        name, _, rest = path.partition(".")
+        nested = grouped.setdefault(name, [])
+        if rest:
+            nested.append(rest)
+    return grouped
+
+
+def sparse_serializer(field):
+    """The ``SparseFieldsMixin`` serializer behind a field, if any."""
+    if isinstance(field, serializers.ListSerializer):
+        field = field.child
+    if isinstance(field, SparseFieldsMixin):
+        return field
+    return None
+
+
+def nested_serializer(field):
+    """The serializer a relation field renders its objects with, if any."""
+    if isinstance(field, serializers.ListSerializer):
+        return field.child
+    if isinstance(field, serializers.BaseSerializer):
+        return field
+    return None
+
+
+class SparseFieldsMixin:
+    """Lets a client trim and expand the fields of a serializer.
+
+    ``fields`` keeps only the named fields and ``expand`` replaces fields
+    with the serializers declared in ``Meta.expandable_fields``, given as
+    ``name: (serializer_class, kwargs)``. Dotted names reach into nested
+    serializers, so ``expand=play.actors`` expands ``play`` and then its
+    ``actors``. Unknown names raise a ``ValidationError``.
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        self.sparse_fields = fields
+        self.expand_fields = expand
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        expandable = getattr(self.Meta, "expandable_fields", {})
+
+        for name, nested_expand in group_paths(
+            self.expand_fields or ()
+        ).items():
+            if name in expandable:
+                serializer_class, kwargs = expandable[name]
+                fields[name] = serializer_class(read_only=True, **kwargs)
+            elif sparse_serializer(fields.get(name)) is None:
+                raise ValidationError({"expand": [f"Cannot expand {name}"]})
+            if nested_expand:
+                sparse_serializer(fields[name]).expand_fields = nested_expand
+
+        if self.sparse_fields is not None:
+            requested = group_paths(self.sparse_fields)
+            unknown = sorted(set(requested) - set(fields))
+            if unknown:
+                raise ValidationError(
+                    {"fields": [f"Unknown field: {name}" for name in unknown]}
+                )
+            fields = {
+                name: field
+                for name, field in fields.items()
+                if name in requested
+            }
+            for name, nested_fields in requested.items():
+                if not nested_fields:
+                    continue
+                nested = sparse_serializer(fields[name])
+                if nested is None:
+                    raise ValidationError(
+                        {"fields": [f"{name} has no nested fields"]}
+                    )
+                nested.sparse_fields = nested_fields
+        return fields
+
+
+class QueryPlan:
+    """The ``select_related`` and prefetches a serializer's fields need.
+
+    Built by walking the ``source`` of every field down the model
+    relations: single-valued relations are joined, many-valued ones are
+    prefetched with a plan of their own for the nested serializer.
+    ``Meta.field_relations`` names the relations that a field backed by a
+    property or method reads, which its source cannot show.
+    """
+
+    def __init__(self):
+        self.select = set()
+        self.prefetch = {}
+
+    @classmethod
+    def for_serializer(cls, serializer) -> "QueryPlan":
+        plan = cls()
+        plan.add_serializer(serializer)
+        return plan
+
+    def add_serializer(self, serializer, prefix=""):
+        model = serializer.Meta.model
+        field_relations = getattr(serializer.Meta, "field_relations", {})
+        for name, field in serializer.fields.items():
+            for path in field_relations.get(name, ()):
+                self.add_path(model, path.split("__"), prefix)
+
+            if field.source == "*":
+                continue
+            if (
+                isinstance(field, serializers.RelatedField)
+                and field.use_pk_only_optimization()
+                and len(field.source_attrs) == 1
+            ):
+                # The primary key is read from the local column
+                continue
+            self.add_path(
+                model, field.source_attrs, prefix, nested_serializer(field)
+            )
+
+    def add_path(self, model, attrs, prefix="", nested=None):
+        for index, attr in enumerate(attrs):
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                # A property or method: nothing more to load
+                return
+            if not model_field.is_relation:
+                return
+            related_model = model_field.related_model
+            if model_field.many_to_many or model_field.one_to_many:
+                lookup = prefix + attr
+                if lookup not in self.prefetch:
+                    self.prefetch[lookup] = (related_model, QueryPlan())
+                plan = self.prefetch[lookup][1]
+                plan.add_path(related_model, attrs[index + 1:], "", nested)
+                return
+            prefix += attr
+            self.select.add(prefix)
+            prefix += "__"
+            model = related_model
+        if nested is not None:
+            self.add_serializer(nested, prefix)
+
+    def apply(self, queryset, prefetch=True):
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if self.select:
+            queryset = queryset.select_related(*sorted(self.select))
+        if not prefetch:
+            return queryset
+        for lookup, (model, plan) in sorted(self.prefetch.items()):
+            related = plan.apply(model._default_manager.all())
+            if not model._meta.ordering:
+                # Keep nested lists in a stable order
+                related = related.order_by("pk")
+            queryset = queryset.prefetch_related(
+                Prefetch(lookup, queryset=related)
+            )
+        return queryset
+
+
+class SparseFieldsViewMixin:
+    """Reads ``?fields=`` and ``?expand=`` and plans the query for them.
+
+    Both are passed to serializers built with ``SparseFieldsMixin``, and
+    the queryset is given exactly the joins and prefetches the resulting
+    fields read, replacing any set on the base queryset.
+    """
+
+    def get_requested_fields(self):
+        return parse_paths(self.request.query_params.get("fields"))
+
+    def get_requested_expand(self):
+        return parse_paths(self.request.query_params.get("expand"))
+
+    def get_serializer(self, *args, **kwargs):
+        serializer_class = self.get_serializer_class()
+        # Schema generation builds serializers without a request
+        if getattr(self, "request", None) is not None and issubclass(
+            serializer_class, SparseFieldsMixin
+        ):
+            kwargs.setdefault("fields", self.get_requested_fields())
+            kwargs.setdefault("expand", self.get_requested_expand())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_query_plan(self):
+        serializer = nested_serializer(self.get_serializer())
+        if serializer is None or not hasattr(serializer, "Meta"):
+            return None
+        return QueryPlan.for_serializer(serializer)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        plan = self.get_query_plan()
+        if plan is None:
+            return queryset
+        # A single object loads its many-valued relations with one query
+        # each either way, and lazily they are skipped on a 304
+        return plan.apply(queryset, prefetch=not self.detail)
@@ -0,0 +1,86 @@
+import hashlib
+
+import orjson
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from theater.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class IdempotencyKeyInUse(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "A request with this Idempotency-Key is still running."
+    default_code = "idempotency_key_in_use"
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = (
+        "This Idempotency-Key was sent with a different request."
+    )
+    default_code = "idempotency_key_reused"
+
+
+def request_fingerprint(request) -> str:
+    """Hash of what makes two requests with one key the same request."""
+    body = orjson.dumps(
+        request.data, option=orjson.OPT_SORT_KEYS, default=str
+    )
+    return hashlib.sha256(
+        request.method.encode() + b" " + request.path.encode() + b"\n" + body
+    ).hexdigest()
+
+
+class IdempotentCreateMixin:
+    """Replays the first response to a ``create`` sent again with its key.
+
+    Clients retrying a POST send the same ``Idempotency-Key`` header; the
+    first successful response is stored per user and returned for the
+    retries without validating or writing anything again. Failed requests
+    release their key so a corrected retry can run.
+    """
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return super().create(request, *args, **kwargs)
+        if not key or len(key) > 255:
+            raise ValidationError(
+                {IDEMPOTENCY_HEADER: ["Send between 1 and 255 characters."]}
+            )
+
+        fingerprint = request_fingerprint(request)
+        if not IdempotencyKey.claim(request.user.id, key, fingerprint):
+            return self.replay(request, key, fingerprint)
+
+        records = IdempotencyKey.objects.filter(user=request.user, key=key)
+        try:
+            response = super().create(request, *args, **kwargs)
+        except Exception:
+            records.delete()
+            raise
+        if status.is_success(response.status_code):
+            IdempotencyKey.store(
+                request.user.id, key, response.status_code, response.data
+            )
+        else:
+            records.delete()
+        return response
+
+    def replay(self, request, key, fingerprint):
+        record = IdempotencyKey.objects.filter(
+            user=request.user, key=key
+        ).first()
+        if record is None or record.status_code is None:
+            raise IdempotencyKeyInUse()
+        if record.fingerprint != fingerprint:
+            raise IdempotencyKeyReused()
+        return Response(
+            record.response,
+            status=record.status_code,
+            headers={REPLAYED_HEADER: "true"},
+        )
@@ -0,0 +1,272 @@
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers.base import DeserializationError
+from django.core.serializers.python import Deserializer
+from django.db import connection, transaction
+from django.db.models.expressions import DatabaseDefault
+from django.utils import timezone
+
+from theater.bulk_load import copy_rows
+from theater.cache import bump_version
+from theater.models import (
+    Actor,
+    Genre,
+    LoadedFixture,
+    Performance,
+    Play,
+    SeatHold,
+    Ticket,
+)
+
+CHUNK_SIZE = 1 << 16
+# Objects of one model parsed before they are written out
+BATCH_SIZE = 5000
+# Whitespace and the commas separating the objects of the top-level array
+SEPARATOR = re.compile(r"[\s,]*")
+
+
+def fixture_checksum(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fixture:
+        while chunk := fixture.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_fixture_objects(path):
+    """Yield the objects of a JSON fixture array one at a time.
+
+    The file is read in chunks, so memory stays bounded by the largest
+    object rather than by the size of the fixture.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8-sig") as fixture:
+        buffer = fixture.read(CHUNK_SIZE)
+        position = SEPARATOR.match(buffer).end()
+        if buffer[position:position + 1] != "[":
+            raise CommandError(f"{path} is not a JSON array of objects")
+        position += 1
+
+        while True:
+            position = SEPARATOR.match(buffer, position).end()
+            if buffer[position:position + 1] == "]":
+                return
+            try:
+                if position == len(buffer):
+                    raise ValueError("Need more data")
+                obj, position = decoder.raw_decode(buffer, position)
+            except ValueError:
+                chunk = fixture.read(CHUNK_SIZE)
+                if not chunk:
+                    raise CommandError(f"{path} ends before its closing ]")
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            yield obj
+
+
+def dependency_order(models):
+    """Sort models so that every foreign key target comes first."""
+    ordered = []
+    visiting = set()
+
+    def visit(model):
+        if model in ordered or model in visiting:
+            return
+        visiting.add(model)
+        for field in model._meta.concrete_fields:
+            if field.is_relation and field.related_model in models:
+                visit(field.related_model)
+        ordered.append(model)
+
+    for model in models:
+        visit(model)
+    return ordered
+
+
+def row_values(instance, fields, now):
+    values = []
+    for field in fields:
+        value = getattr(instance, field.attname)
+        if isinstance(value, DatabaseDefault) or (
+            value is None
+            and (
+                getattr(field, "auto_now", False)
+                or getattr(field, "auto_now_add", False)
+            )
+        ):
+            # COPY has no DEFAULT; fill what auto_now would have stored
+            value = now
+        values.append(value)
+    return values
+
+
+class Command(BaseCommand):
+    """Stream a fixture into the database in per-model batches.
+
+    A model's objects are written once ``BATCH_SIZE`` of them are parsed,
+    whatever their order in the file; foreign keys are checked at commit,
+    so a batch may reference rows further down the fixture. Memory holds
+    at most one partial batch per model plus the primary keys loaded so
+    far, which the derived data refresh needs.
+    """
+
+    help = (
+        "Load a JSON fixture with bulk inserts unless the same file (by "
+        "checksum) is already loaded. A faster, idempotent stand-in for "
+        "loaddata at container start."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("fixture", help="Path to a JSON fixture")
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Load even if this fixture was already loaded",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["fixture"])
+        if not path.is_file():
+            raise CommandError(f"No fixture named {path}")
+        started = time.perf_counter()
+        checksum = fixture_checksum(path)
+        if (
+            not options["force"]
+            and LoadedFixture.objects.filter(
+                name=path.name, checksum=checksum
+            ).exists()
+        ):
+            self.stdout.write(f"{path.name} is already loaded, skipping")
+            return
+
+        with transaction.atomic():
+            loaded = {}
+            pending = {}
+            for obj in iter_fixture_objects(path):
+                try:
+                    model = apps.get_model(obj["model"])
+                except (KeyError, LookupError) as error:
+                    raise CommandError(
+                        f"{path.name}: invalid object: {error}"
+                    )
+                batch = pending.setdefault(model, [])
+                batch.append(obj)
+                if len(batch) >= BATCH_SIZE:
+                    loaded.setdefault(model, []).extend(
+                        self.load_model(model, pending.pop(model))
+                    )
+            for model in dependency_order(pending):
+                loaded.setdefault(model, []).extend(
+                    self.load_model(model, pending.pop(model))
+                )
+            self.reset_sequences(loaded)
+            self.refresh_derived_data(loaded)
+            LoadedFixture.objects.update_or_create(
+                name=path.name, defaults={"checksum": checksum}
+            )
+        ContentType.objects.clear_cache()
+        for model in loaded:
+            bump_version(model)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Installed {sum(map(len, loaded.values()))} object(s) "
+                f"from {path.name} in {time.perf_counter() - started:.2f}s"
+            )
+        )
+
+    def load_model(self, model, objects):
+        """Replace the rows of ``objects`` and return their primary keys."""
+        try:
+            deserialized = list(Deserializer(objects))
+        except DeserializationError as error:
+            raise CommandError(str(error))
+
+        fields = model._meta.concrete_fields
+        pks = [item.object.pk for item in deserialized]
+        self.delete_rows(model, model._meta.pk.column, pks)
+        now = timezone.now()
+        copy_rows(
+            model,
+            [field.name for field in fields],
+            (row_values(item.object, fields, now) for item in deserialized),
+        )
+
+        for field in model._meta.local_many_to_many:
+            through = field.remote_field.through
+            if not through._meta.auto_created:
+                continue
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+            self.delete_rows(
+                through, through._meta.get_field(source).column, pks
+            )
+            copy_rows(
+                through,
+                (source, target),
+                (
+                    (item.object.pk, related_pk)
+                    for item in deserialized
+                    for related_pk in item.m2m_data.get(field.name, ())
+                ),
+            )
+        return pks
+
+    @staticmethod
+    def delete_rows(model, column, values, batch_size=1000):
+        """Delete rows by ``column`` without cascades or signals.
+
+        Foreign keys are deferred until commit, so rows that point at a
+        deleted primary key are fine once the fixture inserts it again.
+        """
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            for offset in range(0, len(values), batch_size):
+                batch = values[offset:offset + batch_size]
+                cursor.execute(
+                    f"DELETE FROM {quote(model._meta.db_table)} "
+                    f"WHERE {quote(column)} IN "
+                    f"({', '.join(['%s'] * len(batch))})",
+                    batch,
+                )
+
+    @staticmethod
+    def reset_sequences(loaded):
+        models = set(loaded)
+        for model in loaded:
+            models.update(
+                field.remote_field.through
+                for field in model._meta.local_many_to_many
+            )
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    @staticmethod
+    def refresh_derived_data(loaded):
+        """Recompute what signals maintain when rows are saved one by one."""
+        performance_ids = set(loaded.get(Performance, ()))
+        for model in (Ticket, SeatHold):
+            if model in loaded:
+                performance_ids.update(
+                    model.objects.filter(pk__in=loaded[model]).values_list(
+                        "performance_id", flat=True
+                    )
+                )
+        if performance_ids:
+            Performance.rebuild_seat_maps(performance_ids)
+
+        if {Play, Genre, Actor} & set(loaded):
+            Play.update_search_fields(
+                Play.objects.values_list("id", flat=True)
+            )
@@ -0,0 +1,37 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import BaseCommand, CommandError
+
+from theater.schema import generate_schema
+
+
+class Command(BaseCommand):
+    help = "Write the precomputed OpenAPI schema served at /api/doc/"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Fail if the schema file is missing or out of date",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(settings.API_SCHEMA_FILE)
+        try:
+            content = generate_schema()
+        except ImproperlyConfigured as error:
+            raise CommandError(error)
+
+        if options["check"]:
+            if not path.exists() or path.read_bytes() != content:
+                raise CommandError(
+                    f"{path.name} is out of date; "
+                    "run `python manage.py build_schema`"
+                )
+            self.stdout.write(f"{path.name} is up to date")
+            return
+
+        path.write_bytes(content)
+        self.stdout.write(f"Wrote {path.name} ({len(content)} bytes)")
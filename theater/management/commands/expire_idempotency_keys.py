@@ -0,0 +1,26 @@
+import time
+
+from django.core.management import BaseCommand
+
+from theater.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Delete stored Idempotency-Key responses whose time has run out"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            type=int,
+            metavar="SECONDS",
+            help="Keep sweeping every SECONDS instead of exiting",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["loop"]
+        while True:
+            deleted = IdempotencyKey.expire()
+            self.stdout.write(f"Deleted {deleted} expired idempotency key(s)")
+            if not interval:
+                break
+            time.sleep(interval)
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management import BaseCommand
+
+from theater.models import SeatHold
+
+
+class Command(BaseCommand):
+    help = "Release seat holds whose time has run out"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            type=int,
+            metavar="SECONDS",
+            help="Keep sweeping every SECONDS instead of exiting",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["loop"]
+        while True:
+            released = SeatHold.expire()
+            self.stdout.write(f"Released {released} expired seat hold(s)")
+            if not interval:
+                break
+            time.sleep(interval)
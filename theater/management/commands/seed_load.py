@@ -0,0 +1,328 @@
+import math
+import random
+from datetime import date, datetime, time, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from theater.bulk_load import copy_rows, reserve_ids
+from theater.models import Performance, Play, Reservation, TheaterHall, Ticket
+from theater.seat_map import SeatMap
+
+# Relative demand per weekday, Monday first; halls are dark on Mondays
+WEEKDAY_DEMAND = (0, 0.6, 0.7, 0.8, 1.0, 1.0, 0.85)
+EVENING = time(19)
+MATINEE = time(14)
+MATINEE_DEMAND = 0.7
+# Demand peaks in the holiday season and bottoms out in early summer
+SEASON_PEAK_DAY = 350
+SEASON_AMPLITUDE = 0.3
+PARTY_SIZES = (1, 2, 3, 4, 5, 6)
+PARTY_WEIGHTS = (15, 45, 10, 20, 5, 5)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic season of users, performances, reservations "
+        "and tickets for load tests. The output depends only on --seed, the "
+        "options and the existing halls and plays."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--users", type=int, default=20_000, help="Customers to create"
+        )
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            default=date(2025, 1, 1),
+            help="First day of the season (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--days", type=int, default=365, help="Length of the season"
+        )
+        parser.add_argument(
+            "--sell-through",
+            type=float,
+            default=0.8,
+            help="Share of seats sold for a peak-demand performance",
+        )
+        parser.add_argument(
+            "--lead-days",
+            type=float,
+            default=21,
+            help="Mean number of days between booking and show time",
+        )
+        parser.add_argument(
+            "--run-days",
+            type=int,
+            nargs=2,
+            default=(14, 42),
+            metavar=("MIN", "MAX"),
+            help="How long a hall keeps staging the same play",
+        )
+        parser.add_argument(
+            "--username-prefix",
+            default="load",
+            help="Prefix for generated usernames and emails",
+        )
+        parser.add_argument(
+            "--chunk",
+            type=int,
+            default=200,
+            help="Performances generated and copied per batch",
+        )
+
+    def handle(self, *args, **options):
+        halls = list(TheaterHall.objects.order_by("id"))
+        plays = list(Play.objects.order_by("id").values_list("id", flat=True))
+        if not halls or not plays:
+            raise CommandError(
+                "seed_load needs existing theater halls and plays; "
+                "load them first, e.g. with `loaddata dump.json`"
+            )
+        if options["users"] < 1:
+            raise CommandError("--users must be at least 1")
+
+        rng = random.Random(options["seed"])
+        self.options = options
+        self.rng = rng
+        # A play's draw is fixed for the whole season
+        self.popularity = {
+            play_id: rng.lognormvariate(0, 0.3) for play_id in plays
+        }
+
+        with transaction.atomic():
+            first_user_id = self.load_users(options["users"])
+            schedule = self.schedule(halls, plays)
+            totals = {"performances": 0, "reservations": 0, "tickets": 0}
+            for offset in range(0, len(schedule), options["chunk"]):
+                counts = self.load_sales(
+                    schedule[offset:offset + options["chunk"]], first_user_id
+                )
+                for name, count in counts.items():
+                    totals[name] += count
+
+        if connection.vendor == "postgresql":
+            tables = [
+                model._meta.db_table
+                for model in (User, Performance, Reservation, Ticket)
+            ]
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {', '.join(tables)}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Loaded {options['users']} users, "
+                f"{totals['performances']} performances, "
+                f"{totals['reservations']} reservations and "
+                f"{totals['tickets']} tickets"
+            )
+        )
+
+    def load_users(self, count):
+        prefix = self.options["username_prefix"]
+        # One hash with a fixed salt keeps the rows reproducible and fast
+        password = make_password(
+            prefix, salt=f"{prefix}{self.options['seed']}"
+        )
+        joined = datetime.combine(
+            self.options["start"], time(), timezone.utc
+        ) - timedelta(days=365)
+        first_id = reserve_ids(User, count)
+        copy_rows(
+            User,
+            (
+                "id",
+                "password",
+                "is_superuser",
+                "username",
+                "first_name",
+                "last_name",
+                "email",
+                "is_staff",
+                "is_active",
+                "date_joined",
+            ),
+            (
+                (
+                    first_id + index,
+                    password,
+                    False,
+                    f"{prefix}{index}",
+                    "",
+                    "",
+                    f"{prefix}{index}@example.com",
+                    False,
+                    True,
+                    joined,
+                )
+                for index in range(count)
+            ),
+        )
+        return first_id
+
+    def demand(self, day, show_time):
+        season = 1 + SEASON_AMPLITUDE * math.cos(
+            2 * math.pi * (day.timetuple().tm_yday - SEASON_PEAK_DAY) / 365
+        )
+        demand = season * WEEKDAY_DEMAND[day.weekday()]
+        if show_time == MATINEE:
+            demand *= MATINEE_DEMAND
+        return demand
+
+    def schedule(self, halls, plays):
+        """Return ``(hall, play_id, show_time, demand)`` for the season.
+
+        Every hall stages one play for a run of ``--run-days`` before moving
+        on, with an evening show each day except Monday and a matinee at
+        weekends.
+        """
+        options = self.options
+        shows = []
+        for hall in halls:
+            run_left = 0
+            for offset in range(options["days"]):
+                if not run_left:
+                    play_id = self.rng.choice(plays)
+                    run_left = self.rng.randint(*options["run_days"])
+                run_left -= 1
+                day = options["start"] + timedelta(days=offset)
+                if not WEEKDAY_DEMAND[day.weekday()]:
+                    continue
+                times = [EVENING]
+                if day.weekday() >= 5:
+                    times.insert(0, MATINEE)
+                for show_time in times:
+                    shows.append(
+                        (
+                            hall,
+                            play_id,
+                            datetime.combine(day, show_time, timezone.utc),
+                            self.demand(day, show_time),
+                        )
+                    )
+        shows.sort(key=lambda show: (show[2], show[0].id))
+        return shows
+
+    def sell(self, hall, occupancy):
+        """Seat parties side by side, filling the best rows first."""
+        rng = self.rng
+        target = round(hall.rows * hall.seats_in_row * occupancy)
+        rows = sorted(
+            range(1, hall.rows + 1),
+            key=lambda row: abs(row - hall.rows * 0.4)
+            + rng.random() * hall.rows * 0.3,
+        )
+        parties = []
+        for row in rows:
+            seat = 1
+            while target and seat <= hall.seats_in_row:
+                size = min(
+                    rng.choices(PARTY_SIZES, PARTY_WEIGHTS)[0],
+                    target,
+                    hall.seats_in_row - seat + 1,
+                )
+                parties.append([(row, seat + index) for index in range(size)])
+                seat += size
+                target -= size
+            if not target:
+                break
+        return parties
+
+    def load_sales(self, shows, first_user_id):
+        rng = self.rng
+        options = self.options
+        updated_at = datetime.combine(
+            options["start"], time(), timezone.utc
+        )
+        performances = []
+        reservations = []
+        tickets = []
+        performance_id = reserve_ids(Performance, len(shows))
+
+        sales = []
+        for index, (hall, play_id, show_time, demand) in enumerate(shows):
+            occupancy = min(
+                1.0,
+                options["sell_through"]
+                * demand
+                * self.popularity[play_id]
+                * rng.uniform(0.85, 1.15),
+            )
+            parties = self.sell(hall, occupancy)
+            seats = SeatMap.for_hall(hall)
+            for party in parties:
+                for row, seat in party:
+                    seats.occupy(row, seat)
+            performances.append(
+                (
+                    performance_id + index,
+                    play_id,
+                    hall.id,
+                    show_time,
+                    bytes(seats),
+                    b"",
+                    None,
+                    updated_at,
+                )
+            )
+            for party in parties:
+                # Squaring skews bookings toward a core of repeat customers
+                user_index = int(options["users"] * rng.random() ** 2)
+                booked_at = show_time - timedelta(
+                    days=rng.expovariate(1 / options["lead_days"])
+                )
+                sales.append(
+                    (
+                        performance_id + index,
+                        first_user_id + user_index,
+                        booked_at,
+                        party,
+                    )
+                )
+
+        reservation_id = reserve_ids(Reservation, len(sales))
+        for offset, (performance, user_id, booked_at, party) in enumerate(
+            sales
+        ):
+            reservations.append((reservation_id + offset, user_id, booked_at))
+            tickets.extend(
+                (performance, reservation_id + offset, row, seat)
+                for row, seat in party
+            )
+
+        copy_rows(
+            Performance,
+            (
+                "id",
+                "play",
+                "theater_hall",
+                "show_time",
+                "seat_map",
+                "hold_map",
+                "holds_expire_at",
+                "updated_at",
+            ),
+            performances,
+        )
+        copy_rows(Reservation, ("id", "user", "created_at"), reservations)
+        ticket_id = reserve_ids(Ticket, len(tickets))
+        copy_rows(
+            Ticket,
+            ("id", "performance", "reservation", "row", "seat"),
+            (
+                (ticket_id + index, *ticket)
+                for index, ticket in enumerate(tickets)
+            ),
+        )
+        return {
+            "performances": len(performances),
+            "reservations": len(reservations),
+            "tickets": len(tickets),
+        }
@@ -0,0 +1,226 @@
+import bisect
+import contextvars
+import functools
+import threading
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+METRICS = {
+    "request_duration_seconds": (
+        "Time spent handling the request",
+        SECONDS_BUCKETS,
+    ),
+    "request_db_queries": ("Database queries per request", QUERY_BUCKETS),
+    "request_db_seconds": (
+        "Time spent in database queries per request",
+        SECONDS_BUCKETS,
+    ),
+    "request_serializer_seconds": (
+        "Time spent building serializer data per request, queries included",
+        SECONDS_BUCKETS,
+    ),
+    "response_size_bytes": ("Size of the response body", BYTES_BUCKETS),
+}
+PREFIX = "theater_"
+
+current_recorder = contextvars.ContextVar("current_recorder", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def snapshot(self):
+        """Return cumulative ``(le, count)`` pairs and the sum."""
+        with self.lock:
+            counts, total = list(self.counts), self.sum
+        cumulative, running = [], 0
+        for bound, count in zip((*self.buckets, "+Inf"), counts):
+            running += count
+            cumulative.append((bound, running))
+        return cumulative, total
+
+
+class Registry:
+    """Histograms per metric and ``(view, method)`` for this process.
+
+    Every worker keeps its own numbers, the way Prometheus expects
+    per-process targets; the scrape labels them by instance.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def observe(self, labels, values):
+        for name, value in values.items():
+            key = (name, labels)
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                with self.lock:
+                    histogram = self.histograms.setdefault(
+                        key, Histogram(METRICS[name][1])
+                    )
+            histogram.observe(value)
+
+    def clear(self):
+        with self.lock:
+            self.histograms.clear()
+
+    def render(self) -> str:
+        """Format every histogram in the Prometheus text format."""
+        lines = []
+        histograms = sorted(self.histograms.items())
+        for name, (description, _) in METRICS.items():
+            metric = PREFIX + name
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} histogram")
+            for (histogram_name, labels), histogram in histograms:
+                if histogram_name != name:
+                    continue
+                label_text = ",".join(
+                    f'{label}="{escape_label(value)}"'
+                    for label, value in labels
+                )
+                cumulative, total = histogram.snapshot()
+                for bound, count in cumulative:
+                    lines.append(
+                        f'{metric}_bucket{{{label_text},le="{bound}"}} '
+                        f"{count}"
+                    )
+                lines.append(f"{metric}_sum{{{label_text}}} {total}")
+                lines.append(
+                    f"{metric}_count{{{label_text}}} {cumulative[-1][1]}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+def escape_label(value) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+REGISTRY = Registry()
+
+
+class RequestRecorder:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+
+class RequestMetricsMiddleware:
+    """Feeds per-view request histograms into ``REGISTRY``.
+
+    For each request it records the query count, time spent in the
+    database and in serializers, the total time and the response size,
+    labelled by resolved view name and method. Requests that resolve to no
+    view are skipped to keep label values bounded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = RequestRecorder()
+        token = current_recorder.set(recorder)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        if match is not None:
+            REGISTRY.observe(
+                (("view", match.view_name), ("method", request.method)),
+                {
+                    "request_duration_seconds": duration,
+                    "request_db_queries": recorder.queries,
+                    "request_db_seconds": recorder.db_time,
+                    "request_serializer_seconds": recorder.serializer_time,
+                    "response_size_bytes": (
+                        0 if response.streaming else len(response.content)
+                    ),
+                },
+            )
+        return response
+
+
+class TimedDataMixin:
+    """Adds the time the outermost ``data`` call takes to the request."""
+
+    @property
+    def data(self):
+        recorder = current_recorder.get()
+        if recorder is None or recorder.serializing:
+            return super().data
+        recorder.serializing = True
+        start = time.perf_counter()
+        try:
+            return super().data
+        finally:
+            recorder.serializer_time += time.perf_counter() - start
+            recorder.serializing = False
+
+
+@functools.cache
+def timed_serializer_class(serializer_class):
+    return type(
+        serializer_class.__name__,
+        (TimedDataMixin, serializer_class),
+        {"__module__": serializer_class.__module__},
+    )
+
+
+def timed(serializer):
+    """Time ``serializer.data`` while the request is being recorded.
+
+    Only this instance changes class, so serializers built outside a
+    recorded request, the schema generator's included, are left alone.
+    """
+    if current_recorder.get() is not None and not isinstance(
+        serializer, TimedDataMixin
+    ):
+        serializer.__class__ = timed_serializer_class(type(serializer))
+    return serializer
+
+
+class SerializerTimingMixin:
+    """Reports the serializers of a view in ``request_serializer_seconds``."""
+
+    def get_serializer(self, *args, **kwargs):
+        return timed(super().get_serializer(*args, **kwargs))
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.6 on 2026-10-17 00:16
+
+from django.db import migrations, models
+
+from theater.seat_map import SeatMap
+
+
+def fill_seat_maps(apps, schema_editor):
+    Performance = apps.get_model("theater", "Performance")
+    Ticket = apps.get_model("theater", "Ticket")
+
+    for performance in Performance.objects.select_related("theater_hall"):
+        seats = SeatMap.for_hall(performance.theater_hall)
+        for row, seat in Ticket.objects.filter(
+            performance=performance
+        ).values_list("row", "seat"):
+            seats.occupy(row, seat)
+        performance.seat_map = bytes(seats)
+        performance.save(update_fields=["seat_map"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theater", "0005_play_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="performance",
+            name="seat_map",
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.RunPython(fill_seat_maps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-17 00:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theater", "0007_seat_holds"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="performance",
+            index=models.Index(
+                fields=["-show_time", "-id"], name="performance_show_time_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="reservation_user_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.6 on 2026-10-17 00:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theater", "0008_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["reservation", "performance"],
+                name="ticket_reservation_perf_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.1.6 on 2026-10-17 00:34
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+TRIGRAM_INDEXES = {
+    "play_title_trgm_idx": "title",
+    "play_genre_names_trgm_idx": "genre_names",
+    "play_actor_names_trgm_idx": "actor_names",
+}
+
+
+def fill_search_fields(apps, schema_editor):
+    Play = apps.get_model("theater", "Play")
+
+    for play in Play.objects.prefetch_related("genres", "actors"):
+        play.genre_names = "\n".join(
+            sorted(genre.name for genre in play.genres.all())
+        )
+        play.actor_names = "\n".join(
+            sorted(
+                f"{actor.first_name} {actor.last_name}"
+                for actor in play.actors.all()
+            )
+        )
+        play.save(update_fields=["genre_names", "actor_names"])
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} "
+            f"ON theater_play USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theater", "0010_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="play",
+            name="actor_names",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="play",
+            name="genre_names",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.RunPython(fill_search_fields, migrations.RunPython.noop),
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
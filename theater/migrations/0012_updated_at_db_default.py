@@ -0,0 +1,38 @@
+# Generated by Django 5.1.6 on 2026-10-17 00:43
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theater", "0011_play_search_document"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="performance",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                db_default=django.db.models.functions.datetime.Now(),
+            ),
+        ),
+        migrations.AlterField(
+            model_name="play",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                db_default=django.db.models.functions.datetime.Now(),
+            ),
+        ),
+        migrations.AlterField(
+            model_name="theaterhall",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                db_default=django.db.models.functions.datetime.Now(),
+            ),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.6 on 2026-10-17 00:50
+
+from django.db import migrations, models
+
+
+def set_unlogged(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "ALTER TABLE theater_throttlecounter SET UNLOGGED"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theater", "0013_loaded_fixture"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ThrottleCounter",
+            fields=[
+                (
+                    "bucket",
+                    models.CharField(
+                        max_length=255, primary_key=True, serialize=False
+                    ),
+                ),
+                ("slot", models.BigIntegerField()),
+                ("hits", models.IntegerField()),
+                ("previous_hits", models.IntegerField()),
+                ("expires_at", models.FloatField(db_index=True)),
+            ],
+        ),
+        migrations.RunPython(set_unlogged, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.6 on 2026-10-17 02:10
+
+from django.db import migrations
+
+# On PostgreSQL ``icontains`` compiles to ``UPPER(column::text) LIKE
+# UPPER(%s)``, which only an index on that same expression can serve
+TRIGRAM_INDEXES = {
+    "play_title_upper_trgm_idx": "title",
+    "play_genre_names_upper_trgm_idx": "genre_names",
+    "play_actor_names_upper_trgm_idx": "actor_names",
+}
+COLUMN_TRIGRAM_INDEXES = {
+    "play_title_trgm_idx": "title",
+    "play_genre_names_trgm_idx": "genre_names",
+    "play_actor_names_trgm_idx": "actor_names",
+}
+
+
+def replace_indexes(schema_editor, drop, create, expression):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in drop:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+    for name, column in create.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON theater_play "
+            f"USING gin ({expression.format(column=column)} gin_trgm_ops)"
+        )
+
+
+def index_upper_columns(apps, schema_editor):
+    replace_indexes(
+        schema_editor,
+        COLUMN_TRIGRAM_INDEXES,
+        TRIGRAM_INDEXES,
+        "(UPPER({column}::text))",
+    )
+
+
+def index_columns(apps, schema_editor):
+    replace_indexes(
+        schema_editor, TRIGRAM_INDEXES, COLUMN_TRIGRAM_INDEXES, "{column}"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theater", "0016_idempotency_key"),
+    ]
+
+    operations = [
+        migrations.RunPython(index_upper_columns, index_columns),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-17 02:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theater", "0017_play_search_upper_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["reservation", "id"], name="ticket_reservation_id_idx"
+            ),
+        ),
+    ]
@@ -1,21 +1,74 @@
 import os
 import uuid
+from datetime import timedelta
 
 from django.conf import settings
-from django.db import models
+from django.core.exceptions import ValidationError as ModelValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import (
+    IntegrityError,
+    connections,
+    models,
+    router,
+    transaction,
+)
+from django.db.models import Min, Q
+from django.db.models.deletion import Collector
+from django.db.models.functions import Now
+from django.utils import timezone
 from django.utils.text import slugify
 from rest_framework.exceptions import ValidationError
 
+from theater.seat_map import SeatMap, best_block
+
+# The conflict target names the partial unique constraint on open
+# reservations, which both PostgreSQL and SQLite infer from the predicate
+OPEN_RESERVATION_SQL = """
+    INSERT INTO {table} (created_at, user_id, is_open)
+    VALUES (%s, %s, %s)
+    ON CONFLICT (user_id) WHERE is_open
+    DO UPDATE SET is_open = excluded.is_open
+    RETURNING *
+"""
+# Claims a key unless a live record holds it; an expired record, or the
+# lapsed lease of a request that never answered, is taken over in the same
+# statement
+CLAIM_IDEMPOTENCY_KEY_SQL = """
+    INSERT INTO {table} (user_id, "key", fingerprint, created_at, expires_at)
+    VALUES (%s, %s, %s, %s, %s)
+    ON CONFLICT (user_id, "key") DO UPDATE SET
+        fingerprint = excluded.fingerprint,
+        status_code = NULL,
+        response = NULL,
+        created_at = excluded.created_at,
+        expires_at = excluded.expires_at
+    WHERE {table}.expires_at <= excluded.created_at
+    RETURNING id
+"""
+
 
 class TheaterHall(models.Model):
     name = models.CharField(max_length=100)
     rows = models.IntegerField()
     seats_in_row = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True, db_default=Now())
 
     @property
     def capacity(self) -> int:
         return self.rows * self.seats_in_row
 
+    def clean(self):
+        if self.pk is None:
+            return
+        outside = Ticket.objects.filter(
+            Q(row__gt=self.rows) | Q(seat__gt=self.seats_in_row),
+            performance__theater_hall=self,
+        )
+        if outside.exists():
+            raise ModelValidationError(
+                "Sold tickets would fall outside the resized hall"
+            )
+
     def __str__(self):
         return self.name
 
@@ -53,6 +106,10 @@ class Play(models.Model):
     genres = models.ManyToManyField(Genre, blank=True, related_name="plays")
     actors = models.ManyToManyField(Actor, blank=True, related_name="plays")
     image = models.ImageField(null=True, upload_to=play_image_file_path)
+    updated_at = models.DateTimeField(auto_now=True, db_default=Now())
+    # Denormalized search document, see Play.update_search_fields
+    genre_names = models.TextField(blank=True, default="", editable=False)
+    actor_names = models.TextField(blank=True, default="", editable=False)
 
     class Meta:
         ordering = ["title"]
@@ -60,18 +117,185 @@ class Play(models.Model):
     def __str__(self):
         return f"{self.title} - {self.description[:50]}..."
 
+    @classmethod
+    def update_search_fields(cls, play_ids):
+        play_ids = set(play_ids)
+        genre_names = {play_id: [] for play_id in play_ids}
+        actor_names = {play_id: [] for play_id in play_ids}
+
+        play_genres = cls.genres.through.objects.filter(play_id__in=play_ids)
+        for play_id, name in play_genres.values_list(
+            "play_id", "genre__name"
+        ):
+            genre_names[play_id].append(name)
+        play_actors = cls.actors.through.objects.filter(play_id__in=play_ids)
+        for play_id, first_name, last_name in play_actors.values_list(
+            "play_id", "actor__first_name", "actor__last_name"
+        ):
+            actor_names[play_id].append(f"{first_name} {last_name}")
+
+        cls.objects.bulk_update(
+            [
+                cls(
+                    id=play_id,
+                    genre_names="\n".join(sorted(genre_names[play_id])),
+                    actor_names="\n".join(sorted(actor_names[play_id])),
+                )
+                for play_id in play_ids
+            ],
+            ["genre_names", "actor_names"],
+        )
+
 
 class Performance(models.Model):
     play = models.ForeignKey(Play, on_delete=models.CASCADE)
     theater_hall = models.ForeignKey(TheaterHall, on_delete=models.CASCADE)
     show_time = models.DateTimeField()
+    seat_map = models.BinaryField(default=bytes)
+    hold_map = models.BinaryField(default=bytes)
+    holds_expire_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_default=Now())
 
     class Meta:
         ordering = ["-show_time"]
+        indexes = [
+            models.Index(
+                fields=["-show_time", "-id"],
+                name="performance_show_time_id_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.play.title + " " + str(self.show_time)
 
+    @property
+    def seats(self) -> SeatMap:
+        return SeatMap.for_hall(self.theater_hall, self.seat_map)
+
+    @property
+    def tickets_available(self) -> int:
+        return self.seats.available_count
+
+    def get_held_seats(self) -> SeatMap:
+        if self.holds_expire_at and self.holds_expire_at <= timezone.now():
+            SeatHold.expire(performance_ids=[self.id])
+            self.refresh_from_db(fields=["hold_map", "holds_expire_at"])
+        return SeatMap.for_hall(self.theater_hall, self.hold_map)
+
+    def best_available(self, count) -> list[tuple[int, int]]:
+        return best_block(count, self.seats, self.get_held_seats())
+
+    @classmethod
+    def lock(cls, performance_id):
+        return (
+            cls.objects.select_for_update(of=("self",))
+            .select_related("theater_hall")
+            .get(pk=performance_id)
+        )
+
+    @classmethod
+    def lock_many(cls, performance_ids) -> dict[int, "Performance"]:
+        """Lock several performances in id order, in one query.
+
+        Every writer that holds more than one performance lock takes them
+        in this order, so overlapping checkouts wait for each other
+        instead of deadlocking.
+        """
+        return {
+            performance.id: performance
+            for performance in cls.objects.select_for_update(of=("self",))
+            .select_related("theater_hall")
+            .filter(pk__in=performance_ids)
+            .order_by("pk")
+        }
+
+    @classmethod
+    def update_seat_map(cls, performance_id, occupy=(), release=()):
+        with transaction.atomic():
+            performance = cls.lock(performance_id)
+            seats = performance.seats
+            for row, seat in release:
+                seats.release(row, seat)
+            for row, seat in occupy:
+                seats.occupy(row, seat)
+            cls.objects.filter(pk=performance_id).update(
+                seat_map=bytes(seats), updated_at=timezone.now()
+            )
+
+    @classmethod
+    def release_held_seats(cls, performance_id, seats):
+        with transaction.atomic():
+            performance = cls.lock(performance_id)
+            held = SeatMap.for_hall(
+                performance.theater_hall, performance.hold_map
+            )
+            for row, seat in seats:
+                # Seats cut off by a hall resize have no bit left to clear
+                if held.contains(row, seat):
+                    held.release(row, seat)
+            cls.objects.filter(pk=performance_id).update(
+                hold_map=bytes(held)
+            )
+
+    @classmethod
+    def rebuild_seat_map(cls, performance_id):
+        with transaction.atomic():
+            performance = cls.lock(performance_id)
+            seats = SeatMap.for_hall(performance.theater_hall)
+            for row, seat in performance.tickets.values_list("row", "seat"):
+                # Seats cut off by a hall resize have no bit to set
+                if seats.contains(row, seat):
+                    seats.occupy(row, seat)
+            held = SeatMap.for_hall(performance.theater_hall)
+            for hold in performance.holds.all():
+                for row, seat in hold.seat_list:
+                    if held.contains(row, seat):
+                        held.occupy(row, seat)
+            cls.objects.filter(pk=performance_id).update(
+                seat_map=bytes(seats),
+                hold_map=bytes(held),
+                updated_at=timezone.now(),
+            )
+
+    @classmethod
+    def rebuild_seat_maps(cls, performance_ids):
+        """Rebuild seat and hold maps of many performances in a few queries.
+
+        Nothing is locked, so this is meant for loaders that run before the
+        API takes traffic; live code goes through ``rebuild_seat_map``.
+        """
+        performances = cls.objects.select_related("theater_hall").in_bulk(
+            performance_ids
+        )
+        seats = {
+            performance.id: SeatMap.for_hall(performance.theater_hall)
+            for performance in performances.values()
+        }
+        held = {
+            performance.id: SeatMap.for_hall(performance.theater_hall)
+            for performance in performances.values()
+        }
+        for performance_id, row, seat in Ticket.objects.filter(
+            performance_id__in=performances
+        ).values_list("performance_id", "row", "seat"):
+            if seats[performance_id].contains(row, seat):
+                seats[performance_id].occupy(row, seat)
+        for hold in SeatHold.objects.filter(performance_id__in=performances):
+            for row, seat in hold.seat_list:
+                if held[hold.performance_id].contains(row, seat):
+                    held[hold.performance_id].occupy(row, seat)
+
+        now = timezone.now()
+        for performance in performances.values():
+            performance.seat_map = bytes(seats[performance.id])
+            performance.hold_map = bytes(held[performance.id])
+            performance.updated_at = now
+        cls.objects.bulk_update(
+            performances.values(),
+            ["seat_map", "hold_map", "updated_at"],
+            batch_size=1000,
+        )
+
 
 class Reservation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -79,13 +303,62 @@ class Reservation(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE, related_name="reservations"
     )
+    # The user's cart, which tickets bought one by one are added to
+    is_open = models.BooleanField(default=False, db_default=False)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="reservation_user_created_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user"],
+                condition=models.Q(is_open=True),
+                name="unique_open_reservation_per_user",
+            ),
+        ]
 
     def __str__(self):
         return str(self.created_at)
 
+    @classmethod
+    def open_for(cls, user_id) -> "Reservation":
+        """Return the open reservation of a user, creating it if needed.
+
+        A single ``INSERT ... ON CONFLICT`` against the partial unique
+        constraint either creates the cart or returns the existing one, so
+        concurrent requests of one user all get the same row without a
+        retry. The no-op update is what makes ``RETURNING`` report the
+        existing row.
+        """
+        connection = connections[router.db_for_write(cls)]
+        sql = OPEN_RESERVATION_SQL.format(
+            table=connection.ops.quote_name(cls._meta.db_table)
+        )
+        created_at = connection.ops.adapt_datetimefield_value(timezone.now())
+        return cls.objects.raw(sql, (created_at, user_id, True))[0]
+
+    @classmethod
+    def close_for(cls, user_id) -> "Reservation | None":
+        """Check out the open reservation of a user, if there is one.
+
+        The next ticket the user buys opens a new reservation.
+        """
+        with transaction.atomic():
+            reservation = (
+                cls.objects.select_for_update()
+                .filter(user_id=user_id, is_open=True)
+                .first()
+            )
+            if reservation is not None:
+                reservation.is_open = False
+                reservation.save(update_fields=["is_open"])
+            return reservation
+
 
 class Ticket(models.Model):
     performance = models.ForeignKey(
@@ -120,6 +393,103 @@ class Ticket(models.Model):
         if errors:
             raise error_to_raise(errors)
 
+    @classmethod
+    def book_seats(cls, tickets, error_to_raise=ValidationError):
+        """Insert unsaved ``tickets``, for any number of performances.
+
+        The performances are locked first with ``Performance.lock_many``
+        and seats are checked against their seat and hold maps, so a seat
+        can not be sold twice. All tickets then go in with one
+        ``bulk_create`` and the seat maps are written back with one
+        ``bulk_update``, committed together. The unique constraint settles
+        tickets written without going through the seat maps. Errors are
+        raised as a list aligned with ``tickets``.
+        """
+        with transaction.atomic():
+            return cls._book_locked_seats(tickets, error_to_raise)
+
+    @classmethod
+    def _book_locked_seats(cls, tickets, error_to_raise):
+        now = timezone.now()
+        performances = Performance.lock_many(
+            {ticket.performance_id for ticket in tickets}
+        )
+        seat_maps = {}
+        hold_maps = {}
+        for performance in performances.values():
+            if (
+                performance.holds_expire_at
+                and performance.holds_expire_at <= now
+            ):
+                SeatHold._release_expired(performance, now)
+            seat_maps[performance.id] = performance.seats
+            hold_maps[performance.id] = SeatMap.for_hall(
+                performance.theater_hall, performance.hold_map
+            )
+
+        errors = [{} for _ in tickets]
+        requested = set()
+        for ticket, ticket_errors in zip(tickets, errors):
+            performance = performances[ticket.performance_id]
+            ticket.performance = performance
+            try:
+                cls.validate_ticket(
+                    ticket.row,
+                    ticket.seat,
+                    performance.theater_hall,
+                    ValidationError,
+                )
+            except ValidationError as error:
+                ticket_errors.update(error.detail)
+                continue
+
+            key = (performance.id, ticket.row, ticket.seat)
+            if (
+                key in requested
+                or seat_maps[performance.id].is_taken(ticket.row, ticket.seat)
+                or hold_maps[performance.id].is_taken(ticket.row, ticket.seat)
+            ):
+                ticket_errors["seat"] = cls.seat_taken_message(ticket)
+            requested.add(key)
+
+        if any(errors):
+            raise error_to_raise(errors)
+
+        try:
+            with transaction.atomic():
+                cls.objects.bulk_create(tickets)
+        except IntegrityError:
+            taken = set(
+                cls.objects.filter(
+                    performance_id__in=performances,
+                    row__in={ticket.row for ticket in tickets},
+                    seat__in={ticket.seat for ticket in tickets},
+                ).values_list("performance_id", "row", "seat")
+            )
+            for ticket, ticket_errors in zip(tickets, errors):
+                if (ticket.performance_id, ticket.row, ticket.seat) in taken:
+                    ticket_errors["seat"] = cls.seat_taken_message(ticket)
+            if not any(errors):
+                raise
+            raise error_to_raise(errors)
+
+        for ticket in tickets:
+            seat_maps[ticket.performance_id].occupy(ticket.row, ticket.seat)
+        for performance in performances.values():
+            performance.seat_map = bytes(seat_maps[performance.id])
+            performance.updated_at = now
+        Performance.objects.bulk_update(
+            performances.values(), ["seat_map", "updated_at"]
+        )
+        return tickets
+
+    @staticmethod
+    def seat_taken_message(ticket):
+        return (
+            f"Seat {ticket.seat} in row {ticket.row} "
+            f"is already taken for this performance"
+        )
+
     def clean(self):
         self.validate_ticket(
             self.row,
@@ -130,7 +500,8 @@ class Ticket(models.Model):
 
     def save(self, *args, **kwargs):
         self.full_clean()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{str(self.performance)} (row: {self.row}, seat: {self.seat})"
@@ -142,4 +513,309 @@ class Ticket(models.Model):
                 name="unique_ticket_performance_seat",
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["reservation", "performance"],
+                name="ticket_reservation_perf_idx",
+            ),
+            # Keyset pages of a user's ticket list seek on this order
+            models.Index(
+                fields=["reservation", "id"], name="ticket_reservation_id_idx"
+            ),
+        ]
         ordering = ["row", "seat"]
+
+
+class SeatHold(models.Model):
+    """Seats kept aside for a user until ``expires_at``.
+
+    Held seats are mirrored into ``Performance.hold_map`` so that checking
+    and claiming a seat is a bit test on the locked performance row.
+    """
+
+    performance = models.ForeignKey(
+        Performance, on_delete=models.CASCADE, related_name="holds"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE, related_name="seat_holds"
+    )
+    seats = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ["expires_at"]
+
+    def __str__(self):
+        return f"{str(self.performance)} (until {self.expires_at})"
+
+    @property
+    def seat_list(self) -> list[tuple[int, int]]:
+        return [(place["row"], place["seat"]) for place in self.seats]
+
+    @property
+    def is_expired(self) -> bool:
+        return self.expires_at <= timezone.now()
+
+    @staticmethod
+    def _delete_released(holds):
+        """Delete holds whose seats are already cleared from ``hold_map``.
+
+        Any other delete, such as a cascade from the user or the admin
+        action, leaves the clearing to the ``post_delete`` receiver.
+        """
+        for hold in holds:
+            hold._hold_map_released = True
+        collector = Collector(using=router.db_for_write(SeatHold))
+        collector.collect(holds)
+        collector.delete()
+
+    @staticmethod
+    def _release_expired(performance, now):
+        expired = list(performance.holds.filter(expires_at__lte=now))
+        if expired:
+            held = SeatMap.for_hall(
+                performance.theater_hall, performance.hold_map
+            )
+            for hold in expired:
+                for row, seat in hold.seat_list:
+                    held.release(row, seat)
+            performance.hold_map = bytes(held)
+            SeatHold._delete_released(expired)
+        performance.holds_expire_at = performance.holds.filter(
+            expires_at__gt=now
+        ).aggregate(next_expiry=Min("expires_at"))["next_expiry"]
+        performance.save(update_fields=["hold_map", "holds_expire_at"])
+        return len(expired)
+
+    @classmethod
+    def place(cls, user, performance_id, seats, minutes):
+        now = timezone.now()
+        expires_at = now + timedelta(minutes=minutes)
+
+        with transaction.atomic():
+            performance = Performance.lock(performance_id)
+            if (
+                performance.holds_expire_at
+                and performance.holds_expire_at <= now
+            ):
+                cls._release_expired(performance, now)
+
+            taken = performance.seats
+            held = SeatMap.for_hall(
+                performance.theater_hall, performance.hold_map
+            )
+            errors = [{} for _ in seats]
+            for (row, seat), seat_errors in zip(seats, errors):
+                try:
+                    Ticket.validate_ticket(
+                        row, seat, performance.theater_hall, ValidationError
+                    )
+                except ValidationError as error:
+                    seat_errors.update(error.detail)
+                    continue
+                if taken.is_taken(row, seat) or held.is_taken(row, seat):
+                    seat_errors["seat"] = (
+                        f"Seat {seat} in row {row} is not available"
+                    )
+                    continue
+                held.occupy(row, seat)
+            if any(errors):
+                raise ValidationError(errors)
+
+            performance.hold_map = bytes(held)
+            if (
+                performance.holds_expire_at is None
+                or expires_at < performance.holds_expire_at
+            ):
+                performance.holds_expire_at = expires_at
+            performance.save(update_fields=["hold_map", "holds_expire_at"])
+
+            return cls.objects.create(
+                performance=performance,
+                user=user,
+                seats=[{"row": row, "seat": seat} for row, seat in seats],
+                expires_at=expires_at,
+            )
+
+    @classmethod
+    def place_best(cls, user, performance_id, count, minutes):
+        """Hold the best ``count`` adjacent seats that are free."""
+        now = timezone.now()
+
+        with transaction.atomic():
+            performance = Performance.lock(performance_id)
+            if (
+                performance.holds_expire_at
+                and performance.holds_expire_at <= now
+            ):
+                cls._release_expired(performance, now)
+
+            seats = best_block(
+                count,
+                performance.seats,
+                SeatMap.for_hall(
+                    performance.theater_hall, performance.hold_map
+                ),
+            )
+            if not seats:
+                raise ValidationError(
+                    {"count": f"No {count} adjacent seats are available"}
+                )
+            # The lock is still ours, so nobody took the block meanwhile
+            return cls.place(user, performance_id, seats, minutes)
+
+    def _release(self, performance):
+        held = SeatMap.for_hall(performance.theater_hall, performance.hold_map)
+        for row, seat in self.seat_list:
+            held.release(row, seat)
+        performance.hold_map = bytes(held)
+        self._delete_released([self])
+        performance.holds_expire_at = performance.holds.aggregate(
+            next_expiry=Min("expires_at")
+        )["next_expiry"]
+        performance.save(update_fields=["hold_map", "holds_expire_at"])
+
+    def release(self):
+        with transaction.atomic():
+            self._release(Performance.lock(self.performance_id))
+
+    def checkout(self):
+        with transaction.atomic():
+            performance = Performance.lock(self.performance_id)
+            if self.is_expired:
+                raise ValidationError({"detail": "Seat hold has expired"})
+            self._release(performance)
+
+            reservation = Reservation.objects.create(user_id=self.user_id)
+            Ticket.book_seats(
+                [
+                    Ticket(
+                        performance=performance,
+                        reservation=reservation,
+                        row=row,
+                        seat=seat,
+                    )
+                    for row, seat in self.seat_list
+                ]
+            )
+            return reservation
+
+    @classmethod
+    def expire(cls, now=None, performance_ids=None):
+        now = now or timezone.now()
+        expired = cls.objects.filter(expires_at__lte=now)
+        if performance_ids is not None:
+            expired = expired.filter(performance_id__in=performance_ids)
+
+        released = 0
+        for performance_id in set(
+            expired.values_list("performance_id", flat=True)
+        ):
+            with transaction.atomic():
+                released += cls._release_expired(
+                    Performance.lock(performance_id), now
+                )
+        return released
+
+
+class LoadedFixture(models.Model):
+    """Checksum of the last fixture file loaded by ``bootstrap_fixture``."""
+
+    name = models.CharField(max_length=255, unique=True)
+    checksum = models.CharField(max_length=64)
+    loaded_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.checksum[:12]})"
+
+
+class ThrottleCounter(models.Model):
+    """Sliding-window hit counts kept by ``DatabaseThrottleStore``."""
+
+    bucket = models.CharField(max_length=255, primary_key=True)
+    slot = models.BigIntegerField()
+    hits = models.IntegerField()
+    previous_hits = models.IntegerField()
+    expires_at = models.FloatField(db_index=True)
+
+    def __str__(self):
+        return self.bucket
+
+
+class IdempotencyKey(models.Model):
+    """The first response to a request sent with an ``Idempotency-Key``.
+
+    A record without ``status_code`` belongs to a request still running
+    and is only leased to it for ``IDEMPOTENCY_KEY_LEASE_SECONDS``; once
+    the response is stored it lives for ``IDEMPOTENCY_KEY_HOURS``.
+    ``expire_idempotency_keys`` deletes records past ``expires_at``.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE, related_name="idempotency_keys"
+    )
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"],
+                name="unique_idempotency_key_per_user",
+            ),
+        ]
+
+    def __str__(self):
+        return self.key
+
+    @classmethod
+    def claim(cls, user_id, key, fingerprint) -> bool:
+        """Reserve ``key`` for a new request; False if it is taken.
+
+        Concurrent requests with the same key race on the unique
+        constraint, so exactly one of them runs.
+        """
+        now = timezone.now()
+        expires_at = now + timedelta(
+            seconds=settings.IDEMPOTENCY_KEY_LEASE_SECONDS
+        )
+        connection = connections[router.db_for_write(cls)]
+        sql = CLAIM_IDEMPOTENCY_KEY_SQL.format(
+            table=connection.ops.quote_name(cls._meta.db_table)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                sql,
+                (
+                    user_id,
+                    key,
+                    fingerprint,
+                    connection.ops.adapt_datetimefield_value(now),
+                    connection.ops.adapt_datetimefield_value(expires_at),
+                ),
+            )
+            return cursor.fetchone() is not None
+
+    @classmethod
+    def store(cls, user_id, key, status_code, response) -> None:
+        """Keep the response of a finished request to replay to retries."""
+        cls.objects.filter(user_id=user_id, key=key).update(
+            status_code=status_code,
+            response=response,
+            expires_at=timezone.now()
+            + timedelta(hours=settings.IDEMPOTENCY_KEY_HOURS),
+        )
+
+    @classmethod
+    def expire(cls, now=None) -> int:
+        deleted, _ = cls.objects.filter(
+            expires_at__lte=now or timezone.now()
+        ).delete()
+        return deleted
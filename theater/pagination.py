@@ -0,0 +1,158 @@
+import json
+from functools import reduce
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    PageNumberPagination,
+)
+
+
+class OrderPagination(PageNumberPagination):
+    page_size = 5
+    max_page_size = 50
+
+
+class KeysetPagination(CursorPagination):
+    """Cursor pagination that seeks on the queryset ordering plus ``id``.
+
+    Unlike DRF's ``CursorPagination`` the cursor stores the full sort key of
+    the boundary row, so every page is a single indexed range scan with no
+    OFFSET and no ``COUNT(*)``.
+    """
+
+    page_size = 5
+    max_page_size = 50
+
+    def get_ordering(self, request, queryset, view):
+        ordering = [
+            {"pk": "id", "-pk": "-id"}.get(field, field)
+            for field in queryset.query.order_by
+            or queryset.model._meta.ordering
+        ]
+        if not {"id", "-id"} & set(ordering):
+            descending = bool(ordering) and ordering[0].startswith("-")
+            ordering.append("-id" if descending else "id")
+        return tuple(ordering)
+
+    def _get_field(self, field):
+        return self.model._meta.get_field(field.lstrip("-"))
+
+    def _get_key(self, instance):
+        if isinstance(instance, dict):
+            # A row of a .values() queryset
+            instance = self.model(
+                **{
+                    self._get_field(field).attname: instance[
+                        field.lstrip("-")
+                    ]
+                    for field in self.ordering
+                }
+            )
+        return json.dumps(
+            [
+                self._get_field(field).value_to_string(instance)
+                for field in self.ordering
+            ]
+        )
+
+    def _seek(self, key, reverse):
+        values = [
+            self._get_field(field).to_python(value)
+            for field, value in zip(self.ordering, json.loads(key))
+        ]
+        conditions = []
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip("-")
+            descending = field.startswith("-") != reverse
+            lookup = f"{name}__lt" if descending else f"{name}__gt"
+            equal = {
+                prior.lstrip("-"): values[prior_index]
+                for prior_index, prior in enumerate(self.ordering[:index])
+            }
+            conditions.append(Q(**equal, **{lookup: values[index]}))
+        seek = reduce(lambda left, right: left | right, conditions)
+        # The OR above is not an index range on its own; bounding the
+        # leading column lets the scan start at the cursor
+        first = self.ordering[0]
+        descending = first.startswith("-") != reverse
+        bound = f"{first.lstrip('-')}__{'lte' if descending else 'gte'}"
+        return Q(**{bound: values[0]}) & seek
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.request = request
+        self.model = queryset.model
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(
+                field[1:] if field.startswith("-") else f"-{field}"
+                for field in ordering
+            )
+        queryset = queryset.order_by(*ordering)
+        if self.cursor and self.cursor.position:
+            try:
+                seek = self._seek(self.cursor.position, reverse)
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+            queryset = queryset.filter(seek)
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = bool(self.cursor and self.cursor.position)
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        position = self._get_key(self.page[-1])
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=False, position=position)
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        position = self._get_key(self.page[0])
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=True, position=position)
+        )
+
+
+class KeysetPaginationMixin:
+    """Paginates list responses by keyset when the client sends ``?cursor``.
+
+    Clients start scrolling with an empty ``?cursor=`` and follow the
+    ``next`` links; requests without it keep page-number pagination.
+    """
+
+    keyset_pagination_class = KeysetPagination
+
+    @property
+    def paginator(self):
+        request = getattr(self, "request", None)
+        if (
+            not hasattr(self, "_paginator")
+            and request is not None
+            and self.keyset_pagination_class.cursor_query_param
+            in request.query_params
+        ):
+            self._paginator = self.keyset_pagination_class()
+        return super().paginator
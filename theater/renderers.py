@@ -0,0 +1,111 @@
+import orjson
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+from theater.export import stream_csv, stream_ndjson
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Datetimes go through DRF's encoder so stray ones are formatted exactly as
+# JSONRenderer would; serializer fields have formatted theirs already
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+def encode_default(obj):
+    """Encode what orjson and msgpack do not know the way DRF does."""
+    return JSONEncoder().default(obj)
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """``JSONRenderer`` with the encoding done by orjson.
+
+    The output is byte for byte what ``JSONRenderer`` produces with the
+    default compact, unicode settings. Indented output, as the browsable
+    API asks for, is left to the standard library.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+
+        content = orjson.dumps(
+            data, default=encode_default, option=ORJSON_OPTIONS
+        )
+        # Keep the output valid inside JavaScript, like JSONRenderer does
+        return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """Renders the same data as the JSON renderers in MessagePack.
+
+    Values without a native MessagePack type, datetimes included, are
+    encoded like JSON strings, so clients see identical values.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if msgpack is None:
+            raise ImproperlyConfigured(
+                "MessagePackRenderer requires the msgpack package"
+            )
+        if data is None:
+            return b""
+        return msgpack.packb(
+            data, default=encode_default, use_bin_type=True, datetime=False
+        )
+
+
+class StreamingRowsRenderer(renderers.BaseRenderer):
+    """Renders flat rows, and streams them for ``StreamingHttpResponse``.
+
+    ``stream(rows)`` yields the encoded chunks of an iterable of dicts;
+    ``render`` encodes whole data, such as an error detail, the same way.
+    """
+
+    charset = "utf-8"
+
+    def stream(self, rows):
+        raise NotImplementedError
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        return b"".join(self.stream(rows))
+
+
+class CSVRenderer(StreamingRowsRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+    def stream(self, rows):
+        return stream_csv(rows)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Errors are rendered as a one-row table of their own keys
+        if isinstance(data, dict):
+            return b"".join(stream_csv([data], list(data)))
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class NDJSONRenderer(StreamingRowsRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def stream(self, rows):
+        return stream_ndjson(rows)
@@ -0,0 +1,52 @@
+import functools
+import gzip
+import hashlib
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.http import quote_etag
+
+SCHEMA_CONTENT_TYPE = "application/vnd.oai.openapi; charset=utf-8"
+
+
+class SchemaArtifact:
+    """An OpenAPI document held as plain and gzip-compressed bytes."""
+
+    def __init__(self, content: bytes):
+        self.content = content
+        # mtime=0 keeps the compressed bytes identical across workers
+        self.compressed = gzip.compress(content, compresslevel=9, mtime=0)
+        self.etag = quote_etag(hashlib.sha256(content).hexdigest())
+
+
+def generate_schema() -> bytes:
+    """Introspect every view into an OpenAPI YAML document."""
+    if not settings.API_DOCS:
+        raise ImproperlyConfigured(
+            "Generating the API schema needs drf_spectacular; "
+            "use DJANGO_PROFILE=dev or set API_DOCS"
+        )
+    from drf_spectacular.renderers import OpenApiYamlRenderer
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return OpenApiYamlRenderer().render(schema, renderer_context={})
+
+
+@functools.cache
+def get_schema() -> SchemaArtifact | None:
+    """Load the schema once per process.
+
+    The file written by ``manage.py build_schema`` is served when
+    ``API_SCHEMA_PRECOMPUTED`` is set; otherwise, or if the file is missing,
+    the schema is generated on first use where drf_spectacular is loaded.
+    Returns None when neither is possible.
+    """
+    path = Path(settings.API_SCHEMA_FILE)
+    if settings.API_SCHEMA_PRECOMPUTED and path.exists():
+        return SchemaArtifact(path.read_bytes())
+    if settings.API_DOCS:
+        return SchemaArtifact(generate_schema())
+    return None
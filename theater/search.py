@@ -0,0 +1,38 @@
+from django.db import connection
+from django.db.models import Q
+
+SEARCH_FIELDS = {
+    "title": "title",
+    "genres": "genre_names",
+    "actors": "actor_names",
+}
+
+
+def search_plays(queryset, **terms):
+    """Filter plays on their denormalized search document.
+
+    ``terms`` maps ``title``, ``genres`` and ``actors`` to substrings. Each
+    one is matched against a single column of ``Play``, so no M2M join or
+    DISTINCT is needed. On PostgreSQL ``icontains`` compiles to
+    ``UPPER(column) LIKE``, which trigram indexes on ``UPPER(column)`` serve,
+    and results are ranked by word similarity.
+    """
+    filters = Q()
+    used_fields = []
+    for name, term in terms.items():
+        if term:
+            field = SEARCH_FIELDS[name]
+            filters &= Q(**{f"{field}__icontains": term})
+            used_fields.append((field, term))
+
+    queryset = queryset.filter(filters)
+
+    if used_fields and connection.vendor == "postgresql":
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        rank = sum(
+            TrigramWordSimilarity(term, field) for field, term in used_fields
+        )
+        queryset = queryset.annotate(rank=rank).order_by("-rank", "title")
+
+    return queryset
@@ -0,0 +1,124 @@
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Where the best seats are, as fractions of the hall: the row a little in
+# front of the middle, counted from the stage, and the centre of the row
+BEST_ROW = 0.4
+# How much a row away from the best one costs against a seat away from the
+# centre, both measured in fractions of the hall
+ROW_WEIGHT = 1.0
+
+
+class SeatMap:
+    """Bitmap of taken seats for a performance, one bit per seat.
+
+    Seat ``(row, seat)`` is stored at bit
+    ``(row - 1) * seats_in_row + (seat - 1)``, so the whole hall fits in
+    ``ceil(rows * seats_in_row / 8)`` bytes.
+    """
+
+    def __init__(self, rows: int, seats_in_row: int, data: bytes = b""):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        size = (rows * seats_in_row + 7) // 8
+        self.data = bytearray(bytes(data)[:size].ljust(size, b"\0"))
+
+    @classmethod
+    def for_hall(cls, theater_hall, data: bytes = b"") -> "SeatMap":
+        return cls(theater_hall.rows, theater_hall.seats_in_row, data)
+
+    def contains(self, row: int, seat: int) -> bool:
+        return 1 <= row <= self.rows and 1 <= seat <= self.seats_in_row
+
+    def _position(self, row: int, seat: int) -> tuple[int, int]:
+        if not self.contains(row, seat):
+            raise IndexError(f"Seat ({row}, {seat}) is outside the hall")
+        index = (row - 1) * self.seats_in_row + (seat - 1)
+        return index >> 3, 1 << (index & 7)
+
+    def is_taken(self, row: int, seat: int) -> bool:
+        byte, mask = self._position(row, seat)
+        return bool(self.data[byte] & mask)
+
+    def occupy(self, row: int, seat: int) -> None:
+        byte, mask = self._position(row, seat)
+        self.data[byte] |= mask
+
+    def release(self, row: int, seat: int) -> None:
+        byte, mask = self._position(row, seat)
+        self.data[byte] &= ~mask
+
+    @property
+    def capacity(self) -> int:
+        return self.rows * self.seats_in_row
+
+    @property
+    def taken_count(self) -> int:
+        return int.from_bytes(self.data, "little").bit_count()
+
+    @property
+    def available_count(self) -> int:
+        return self.capacity - self.taken_count
+
+    def taken_places(self) -> dict[int, list[int]]:
+        grouped_places = {}
+        for byte_index, byte in enumerate(self.data):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte & (1 << bit):
+                    row, seat = divmod(byte_index * 8 + bit, self.seats_in_row)
+                    grouped_places.setdefault(row + 1, []).append(seat + 1)
+        return grouped_places
+
+    def __bytes__(self) -> bytes:
+        return bytes(self.data)
+
+
+def best_block(count: int, *seat_maps: SeatMap) -> list[tuple[int, int]]:
+    """The best ``count`` adjacent seats free in all of ``seat_maps``.
+
+    The maps are or-ed and unpacked into a rows x seats_in_row grid; a
+    running sum along each row gives the taken seats of every window of
+    ``count`` seats at once, and the free windows are scored by how far
+    they are from the best row and from the centre. Ties go to the front
+    and then to the left. Returns ``[]`` when no row has such a block.
+    """
+    if numpy is None:
+        raise ImproperlyConfigured(
+            "Install numpy to search for the best available seats."
+        )
+    rows, seats_in_row = seat_maps[0].rows, seat_maps[0].seats_in_row
+    if not rows or not 1 <= count <= seats_in_row:
+        return []
+
+    taken = numpy.zeros(len(seat_maps[0].data), dtype=numpy.uint8)
+    for seat_map in seat_maps:
+        taken |= numpy.frombuffer(seat_map.data, dtype=numpy.uint8)
+    grid = numpy.unpackbits(
+        taken, count=rows * seats_in_row, bitorder="little"
+    ).reshape(rows, seats_in_row)
+
+    running = numpy.zeros((rows, seats_in_row + 1), dtype=numpy.int32)
+    numpy.cumsum(grid, axis=1, out=running[:, 1:])
+    windows = seats_in_row - count + 1
+    taken_in_window = running[:, count:] - running[:, :windows]
+
+    row_distance = numpy.abs(numpy.arange(rows) - BEST_ROW * (rows - 1))
+    centre_distance = numpy.abs(
+        numpy.arange(windows) - (windows - 1) / 2
+    )
+    score = numpy.add.outer(
+        ROW_WEIGHT * row_distance / rows, centre_distance / seats_in_row
+    )
+    score[taken_in_window > 0] = numpy.inf
+
+    best = int(numpy.argmin(score))
+    row, start = divmod(best, windows)
+    if numpy.isinf(score[row, start]):
+        return []
+    return [(row + 1, start + offset + 1) for offset in range(count)]
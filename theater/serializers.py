@@ -1,9 +1,9 @@
-from collections import defaultdict
-
+from django.conf import settings
 from django.db import transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
+from theater.fieldsets import SparseFieldsMixin
 from theater.models import (
     Genre,
     Actor,
@@ -11,17 +11,22 @@ from theater.models import (
     Performance,
     Play,
     Reservation,
+    SeatHold,
     Ticket,
 )
+from theater.seat_map import SeatMap
+from theater.values import ValuesSerializer
+
+DATETIME_FIELD = serializers.DateTimeField()
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Genre
         fields = ("id", "name")
 
 
-class ActorSerializer(serializers.ModelSerializer):
+class ActorSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Actor
         fields = ("id", "first_name", "last_name", "full_name")
@@ -40,7 +45,7 @@ class PlayImageSerializer(serializers.ModelSerializer):
         fields = ("id", "image")
 
 
-class PlayListSerializer(PlaySerializer):
+class PlayListSerializer(SparseFieldsMixin, PlaySerializer):
     actors = serializers.SlugRelatedField(
         many=True, read_only=True, slug_field="full_name"
     )
@@ -53,9 +58,13 @@ class PlayListSerializer(PlaySerializer):
     class Meta:
         model = Play
         fields = ("id", "title", "description", "actors", "genres", "image")
+        expandable_fields = {
+            "actors": (ActorSerializer, {"many": True}),
+            "genres": (GenreSerializer, {"many": True}),
+        }
 
 
-class PlayDetailSerializer(PlaySerializer):
+class PlayDetailSerializer(SparseFieldsMixin, PlaySerializer):
     actors = ActorSerializer(many=True, read_only=True)
     genres = GenreSerializer(many=True, read_only=True)
 
@@ -72,14 +81,35 @@ class PlayDetailSerializer(PlaySerializer):
         )
 
 
-class TheaterHallSerializer(serializers.ModelSerializer):
+class TheaterHallSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = TheaterHall
         fields = ("id", "name", "rows", "seats_in_row", "capacity")
 
 
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Looks up each primary key once per serializer instance.
+
+    Nested ``many=True`` serializers share one child, so a batch of tickets
+    for the same performance resolves it with a single query.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool) or not isinstance(data, (int, str)):
+            # Left to the parent, which rejects lists and objects with
+            # "incorrect_type" instead of failing to hash them
+            return super().to_internal_value(data)
+        resolved = self.__dict__.setdefault("_resolved", {})
+        if data not in resolved:
+            resolved[data] = super().to_internal_value(data)
+        return resolved[data]
+
+
 class TicketSerializer(serializers.ModelSerializer):
     reservation = serializers.PrimaryKeyRelatedField(read_only=True)
+    performance = CachedPrimaryKeyRelatedField(
+        queryset=Performance.objects.select_related("theater_hall")
+    )
 
     def validate(self, attrs):
         Ticket.validate_ticket(
@@ -92,11 +122,15 @@ class TicketSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         request = self.context["request"]
-        user = request.user
-
-        reservation, created = Reservation.objects.get_or_create(user=user)
-        validated_data["reservation"] = reservation
-        return super().create(validated_data)
+        ticket = Ticket(
+            reservation=Reservation.open_for(request.user.id),
+            **validated_data,
+        )
+        try:
+            Ticket.book_seats([ticket])
+        except ValidationError as error:
+            raise ValidationError(error.detail[0])
+        return ticket
 
     class Meta:
         model = Ticket
@@ -115,7 +149,7 @@ class PerformanceSerializer(serializers.ModelSerializer):
         fields = ("id", "play", "theater_hall", "show_time")
 
 
-class PerformanceListSerializer(PerformanceSerializer):
+class PerformanceListSerializer(SparseFieldsMixin, PerformanceSerializer):
     play_title = serializers.CharField(source="play.title", read_only=True)
     theater_hall = serializers.CharField(
         source="theater_hall.name",
@@ -136,9 +170,14 @@ class PerformanceListSerializer(PerformanceSerializer):
             "tickets_available",
             "show_time",
         )
+        expandable_fields = {
+            "play": (PlayListSerializer, {}),
+            "theater_hall": (TheaterHallSerializer, {}),
+        }
+        field_relations = {"tickets_available": ("theater_hall",)}
 
 
-class PerformanceDetailSerializer(PerformanceSerializer):
+class PerformanceDetailSerializer(SparseFieldsMixin, PerformanceSerializer):
     play = PlayListSerializer(read_only=True)
     theater_hall = TheaterHallSerializer(read_only=True)
     taken_places = serializers.SerializerMethodField()
@@ -154,19 +193,25 @@ class PerformanceDetailSerializer(PerformanceSerializer):
             "taken_places",
             "tickets_available",
         )
+        field_relations = {
+            "taken_places": ("theater_hall",),
+            "tickets_available": ("theater_hall",),
+        }
 
     def get_taken_places(self, obj):
-        tickets = Ticket.objects.filter(performance=obj).values("row", "seat")
+        return obj.seats.taken_places()
 
-        grouped_places = defaultdict(list)
-        for ticket in tickets:
-            grouped_places[ticket["row"]].append(ticket["seat"])
 
-        return dict(grouped_places)
+class TicketListSerializer(SparseFieldsMixin, TicketSerializer):
+    performance = PerformanceListSerializer(many=False, read_only=True)
 
 
-class TicketListSerializer(TicketSerializer):
-    performance = PerformanceListSerializer(many=False, read_only=True)
+class ReservationTicketSerializer(TicketSerializer):
+    class Meta:
+        model = Ticket
+        fields = ("id", "row", "seat", "performance", "reservation")
+        # Seat uniqueness is settled for the whole batch by Ticket.book_seats
+        validators = []
 
 
 class ReservationSerializer(serializers.ModelSerializer):
@@ -174,20 +219,231 @@ class ReservationSerializer(serializers.ModelSerializer):
         format="%d %b %Y, %H:%M",
         read_only=True
     )
-    tickets = TicketSerializer(many=True, read_only=False, required=False)
+    tickets = ReservationTicketSerializer(
+        many=True, read_only=False, required=False
+    )
 
     class Meta:
         model = Reservation
         fields = ("id", "tickets", "created_at", "user")
+        read_only_fields = ("user",)
 
     def create(self, validated_data):
         with transaction.atomic():
-            tickets_data = validated_data.pop("tickets")
+            tickets_data = validated_data.pop("tickets", [])
             reservation = Reservation.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(reservation=reservation, **ticket_data)
+            try:
+                Ticket.book_seats(
+                    [
+                        Ticket(reservation=reservation, **ticket_data)
+                        for ticket_data in tickets_data
+                    ]
+                )
+            except ValidationError as error:
+                raise ValidationError({"tickets": error.detail})
             return reservation
 
 
-class ReservationListSerializer(ReservationSerializer):
+class ReservationListSerializer(SparseFieldsMixin, ReservationSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+
+
+class SeatSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    performance = serializers.PrimaryKeyRelatedField(
+        queryset=Performance.objects.all()
+    )
+    seats = SeatSerializer(many=True, allow_empty=False)
+    minutes = serializers.IntegerField(
+        write_only=True,
+        min_value=1,
+        max_value=settings.SEAT_HOLD_MAX_MINUTES,
+        default=settings.SEAT_HOLD_MINUTES,
+    )
+
+    class Meta:
+        model = SeatHold
+        fields = ("id", "performance", "seats", "minutes", "expires_at")
+        read_only_fields = ("expires_at",)
+
+    def create(self, validated_data):
+        seats = [
+            (place["row"], place["seat"]) for place in validated_data["seats"]
+        ]
+        try:
+            return SeatHold.place(
+                validated_data["user"],
+                validated_data["performance"].id,
+                seats,
+                validated_data["minutes"],
+            )
+        except ValidationError as error:
+            raise ValidationError({"seats": error.detail})
+
+
+class BestAvailableSerializer(serializers.Serializer):
+    count = serializers.IntegerField(min_value=1)
+    seats = SeatSerializer(many=True, read_only=True)
+
+
+class BestAvailableHoldSerializer(BestAvailableSerializer):
+    minutes = serializers.IntegerField(
+        write_only=True,
+        min_value=1,
+        max_value=settings.SEAT_HOLD_MAX_MINUTES,
+        default=settings.SEAT_HOLD_MINUTES,
+    )
+
+
+class PerformanceListValuesSerializer(ValuesSerializer):
+    """``PerformanceListSerializer`` output built from ``.values()`` rows."""
+
+    columns = {
+        "id": ("id",),
+        "play_title": ("play__title",),
+        "theater_hall": ("theater_hall__name",),
+        "theater_hall_capacity": (
+            "theater_hall__rows",
+            "theater_hall__seats_in_row",
+        ),
+        "tickets_available": (
+            "seat_map",
+            "theater_hall__rows",
+            "theater_hall__seats_in_row",
+        ),
+        "show_time": ("show_time",),
+    }
+
+    def get_id(self, row):
+        return self.column(row, "id")
+
+    def get_play_title(self, row):
+        return self.column(row, "play__title")
+
+    def get_theater_hall(self, row):
+        return self.column(row, "theater_hall__name")
+
+    def get_theater_hall_capacity(self, row):
+        return str(
+            self.column(row, "theater_hall__rows")
+            * self.column(row, "theater_hall__seats_in_row")
+        )
+
+    def get_tickets_available(self, row):
+        return SeatMap(
+            self.column(row, "theater_hall__rows"),
+            self.column(row, "theater_hall__seats_in_row"),
+            self.column(row, "seat_map"),
+        ).available_count
+
+    def get_show_time(self, row):
+        return DATETIME_FIELD.to_representation(
+            self.column(row, "show_time")
+        )
+
+
+class TicketListValuesSerializer(ValuesSerializer):
+    """``TicketListSerializer`` output built from ``.values()`` rows."""
+
+    columns = {
+        "id": ("id",),
+        "row": ("row",),
+        "seat": ("seat",),
+        "performance": tuple(
+            PerformanceListValuesSerializer.get_values(prefix="performance__")
+        ),
+        "reservation": ("reservation",),
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.performance = PerformanceListValuesSerializer(
+            prefix=self.prefix + "performance__"
+        )
+
+    def get_id(self, row):
+        return row["id"]
+
+    def get_row(self, row):
+        return row["row"]
+
+    def get_seat(self, row):
+        return row["seat"]
+
+    def get_performance(self, row):
+        return self.performance.to_representation(row)
+
+    def get_reservation(self, row):
+        return row["reservation"]
+
+
+class PlayListValuesSerializer(ValuesSerializer):
+    """``PlayListSerializer`` output built from ``.values()`` rows.
+
+    Actor and genre names of a page take one query each, ordered by id
+    like the prefetches of the model serializer.
+    """
+
+    # Every field reads "id" so names can be matched to their play
+    columns = {
+        "id": ("id",),
+        "title": ("id", "title"),
+        "description": ("id", "description"),
+        "actors": ("id",),
+        "genres": ("id",),
+        "image": ("id", "image"),
+    }
+
+    def prepare(self, rows):
+        names = {name for name, _ in self.getters}
+        play_ids = [row["id"] for row in rows]
+        self.actors = {play_id: [] for play_id in play_ids}
+        self.genres = {play_id: [] for play_id in play_ids}
+
+        if "actors" in names:
+            play_actors = Play.actors.through.objects.filter(
+                play_id__in=play_ids
+            ).order_by("actor_id")
+            for play_id, first_name, last_name in play_actors.values_list(
+                "play_id", "actor__first_name", "actor__last_name"
+            ):
+                self.actors[play_id].append(f"{first_name} {last_name}")
+        if "genres" in names:
+            play_genres = Play.genres.through.objects.filter(
+                play_id__in=play_ids
+            ).order_by("genre_id")
+            for play_id, name in play_genres.values_list(
+                "play_id", "genre__name"
+            ):
+                self.genres[play_id].append(name)
+
+        self.storage = Play._meta.get_field("image").storage
+        self.request = self.context.get("request")
+
+    def get_id(self, row):
+        return row["id"]
+
+    def get_title(self, row):
+        return row["title"]
+
+    def get_description(self, row):
+        return row["description"]
+
+    def get_actors(self, row):
+        return self.actors[row["id"]]
+
+    def get_genres(self, row):
+        return self.genres[row["id"]]
+
+    def get_image(self, row):
+        name = row["image"]
+        if not name:
+            return None
+        url = self.storage.url(name)
+        if self.request is not None:
+            return self.request.build_absolute_uri(url)
+        return url
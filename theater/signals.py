@@ -0,0 +1,181 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from theater.cache import invalidate
+from theater.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    SeatHold,
+    TheaterHall,
+    Ticket,
+)
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_performance(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    instance._previous_performance_id = (
+        Ticket.objects.filter(pk=instance.pk)
+        .values_list("performance_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Ticket)
+def occupy_ticket_seat(sender, instance, created, **kwargs):
+    previous_performance_id = instance.__dict__.pop(
+        "_previous_performance_id", None
+    )
+    if created:
+        Performance.update_seat_map(
+            instance.performance_id, occupy=[(instance.row, instance.seat)]
+        )
+        return
+    performance_ids = {instance.performance_id}
+    if previous_performance_id is not None:
+        performance_ids.add(previous_performance_id)
+    for performance_id in sorted(performance_ids):
+        Performance.rebuild_seat_map(performance_id)
+
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_seat(sender, instance, **kwargs):
+    if Performance.objects.filter(pk=instance.performance_id).exists():
+        Performance.update_seat_map(
+            instance.performance_id, release=[(instance.row, instance.seat)]
+        )
+
+
+@receiver(post_delete, sender=SeatHold)
+def release_hold_seats(sender, instance, **kwargs):
+    if instance.__dict__.pop("_hold_map_released", False):
+        return
+    if Performance.objects.filter(pk=instance.performance_id).exists():
+        Performance.release_held_seats(
+            instance.performance_id, instance.seat_list
+        )
+
+
+@receiver(pre_save, sender=Performance)
+def remember_performance_hall(
+    sender, instance, raw=False, update_fields=None, **kwargs
+):
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not {
+        "theater_hall",
+        "theater_hall_id",
+    } & set(update_fields):
+        return
+    instance._previous_hall_id = (
+        Performance.objects.filter(pk=instance.pk)
+        .values_list("theater_hall_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Performance)
+def rebuild_moved_performance_seat_map(sender, instance, **kwargs):
+    previous_hall_id = instance.__dict__.pop("_previous_hall_id", None)
+    if previous_hall_id not in (None, instance.theater_hall_id):
+        Performance.rebuild_seat_map(instance.pk)
+
+
+@receiver(post_save, sender=TheaterHall)
+def rebuild_hall_seat_maps(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    performance_ids = sorted(
+        instance.performance_set.values_list("id", flat=True)
+    )
+    with transaction.atomic():
+        # Locked up front in id order, like every other writer that holds
+        # several performances, so a concurrent checkout cannot deadlock
+        Performance.lock_many(performance_ids)
+        for performance_id in performance_ids:
+            Performance.rebuild_seat_map(performance_id)
+
+
+@receiver(post_save, sender=Play)
+@receiver(post_delete, sender=Play)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Actor)
+@receiver(post_delete, sender=Actor)
+@receiver(post_save, sender=TheaterHall)
+@receiver(post_delete, sender=TheaterHall)
+def invalidate_catalog(sender, **kwargs):
+    invalidate(sender)
+
+
+@receiver(m2m_changed, sender=Play.genres.through)
+@receiver(m2m_changed, sender=Play.actors.through)
+def invalidate_play_catalog(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate(Play)
+
+
+@receiver(m2m_changed, sender=Play.genres.through)
+@receiver(m2m_changed, sender=Play.actors.through)
+def touch_play_updated_at(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        plays = Play.objects.filter(pk=instance.pk)
+    elif reverse and action in ("post_add", "post_remove"):
+        plays = Play.objects.filter(pk__in=pk_set)
+    elif reverse and action == "pre_clear":
+        plays = instance.plays.all()
+    else:
+        return
+    plays.update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Play.genres.through)
+@receiver(m2m_changed, sender=Play.actors.through)
+def update_play_search_fields(sender, instance, action, reverse, **kwargs):
+    if action == "pre_clear" and reverse:
+        instance._search_play_ids = list(
+            instance.plays.values_list("id", flat=True)
+        )
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        play_ids = [instance.pk]
+    elif action == "post_clear":
+        play_ids = instance.__dict__.pop("_search_play_ids", [])
+    else:
+        play_ids = kwargs["pk_set"]
+    Play.update_search_fields(play_ids)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Actor)
+def update_member_search_fields(sender, instance, created, **kwargs):
+    if not created:
+        Play.update_search_fields(
+            instance.plays.values_list("id", flat=True)
+        )
+
+
+@receiver(pre_delete, sender=Genre)
+@receiver(pre_delete, sender=Actor)
+def remember_member_plays(sender, instance, **kwargs):
+    instance._search_play_ids = list(
+        instance.plays.values_list("id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Actor)
+def update_member_plays_after_delete(sender, instance, **kwargs):
+    Play.update_search_fields(instance.__dict__.pop("_search_play_ids", []))
@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from theater.cache import CATALOG_CACHE
+from theater.models import Actor, Genre, Performance, Play, TheaterHall
+
+User = get_user_model()
+
+
+def sample_user(**params):
+    defaults = {
+        "username": "testuser",
+        "email": "test@email.test",
+        "password": "testpass",
+    }
+    defaults.update(params)
+    return User.objects.create_user(**defaults)
+
+
+def sample_actor(**params) -> Actor:
+    defaults = {
+        "first_name": "John",
+        "last_name": "Mitchel",
+    }
+    defaults.update(params)
+    return Actor.objects.create(**defaults)
+
+
+def sample_genre(**params) -> Genre:
+    defaults = {"name": "Drama"}
+    defaults.update(params)
+    return Genre.objects.create(**defaults)
+
+
+def sample_play(**params) -> Play:
+    defaults = {
+        "title": "Test Title",
+        "description": "Test Description",
+        "duration": 60,
+    }
+    defaults.update(params)
+    return Play.objects.create(**defaults)
+
+
+def sample_hall(**params) -> TheaterHall:
+    defaults = {"name": "Main Hall", "rows": 10, "seats_in_row": 20}
+    defaults.update(params)
+    return TheaterHall.objects.create(**defaults)
+
+
+def sample_performance(**params) -> Performance:
+    defaults = {"show_time": "2025-02-12T12:00:00Z"}
+    defaults.update(params)
+    if "play" not in defaults:
+        defaults["play"] = sample_play()
+    if "theater_hall" not in defaults:
+        defaults["theater_hall"] = sample_hall()
+
+    return Performance.objects.create(**defaults)
+
+
+class ApiTestCase(TestCase):
+    """Runs each test as ``self.user`` against freshly cleared caches.
+
+    Throttle history and cached catalog responses outlive the test
+    transaction, so both caches are emptied before and after every test.
+    """
+
+    def setUp(self):
+        for alias in (DEFAULT_CACHE_ALIAS, CATALOG_CACHE):
+            caches[alias].clear()
+            self.addCleanup(caches[alias].clear)
+        self.client = APIClient()
+        self.user = sample_user()
+        self.client.force_authenticate(user=self.user)
@@ -0,0 +1,157 @@
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock, skipIf
+
+from django.test import SimpleTestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from theater.admission import AdmissionStore, get_admission_store
+from theater.models import SeatHold, Ticket
+from theater.seat_map import numpy
+from theater.tests.base import ApiTestCase, sample_performance
+
+PERFORMANCE_URL = reverse("theater:performance-list")
+TICKET_URL = reverse("theater:ticket-list")
+RESERVATION_URL = reverse("theater:reservation-list")
+
+
+class AdmissionStoreTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.location = Path(directory.name) / "admission.sqlite3"
+        self.store = self.make_store()
+
+    def make_store(self):
+        return AdmissionStore(
+            self.location, concurrency=2, lease=30, patience=10
+        )
+
+    def test_waiters_go_in_first_come_first_served(self):
+        self.assertEqual(self.store.enter(1, "a", now=0), 0)
+        self.assertEqual(self.store.enter(1, "b", now=0), 0)
+
+        self.assertEqual(self.store.enter(1, "c", now=1), 1)
+        self.assertEqual(self.store.enter(1, "d", now=1), 2)
+        # Retrying does not move a waiter ahead
+        self.assertEqual(self.store.enter(1, "d", now=2), 2)
+
+        self.store.leave(1, "a")
+        self.assertEqual(self.store.enter(1, "d", now=3), 1)
+        self.assertEqual(self.store.enter(1, "c", now=3), 0)
+        self.assertEqual(self.store.enter(1, "d", now=3), 1)
+
+    def test_performances_are_queued_apart(self):
+        self.store.enter(1, "a", now=0)
+        self.store.enter(1, "b", now=0)
+
+        self.assertEqual(self.store.enter(2, "c", now=0), 0)
+
+    def test_several_performances_keep_their_place_in_line(self):
+        self.store.enter(2, "a", now=0)
+        self.store.enter(2, "b", now=0)
+
+        self.assertEqual(self.store.enter_all([1, 2], "c", now=1), 1)
+        self.assertEqual(self.store.enter(2, "d", now=1), 2)
+        # Waiting on 2 holds no slot of 1
+        self.assertEqual(self.store.enter(1, "e", now=1), 0)
+
+        self.store.leave(2, "a")
+        self.assertEqual(self.store.enter(2, "d", now=2), 1)
+        self.assertEqual(self.store.enter_all([1, 2], "c", now=2), 0)
+        self.assertEqual(self.store.enter(1, "f", now=2), 1)
+
+    def test_slots_of_dead_workers_expire(self):
+        self.store.enter(1, "a", now=0)
+        self.store.enter(1, "b", now=0)
+
+        self.assertEqual(self.store.enter(1, "c", now=29), 1)
+        self.assertEqual(self.store.enter(1, "c", now=30), 0)
+
+    def test_waiters_that_stop_retrying_leave_the_queue(self):
+        self.store.enter(1, "a", now=0)
+        self.store.enter(1, "b", now=0)
+        self.store.enter(1, "gone", now=0)
+        self.assertEqual(self.store.enter(1, "c", now=5), 2)
+
+        self.assertEqual(self.store.enter(1, "c", now=10), 1)
+
+    def test_workers_share_the_slots(self):
+        def worker(index):
+            # A store per thread stands in for a worker process
+            return self.make_store().enter(1, f"token{index}", now=0)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            positions = sorted(executor.map(worker, range(8)))
+
+        self.assertEqual(positions, [0, 0, 1, 2, 3, 4, 5, 6])
+
+
+class AdmissionApiTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.store = get_admission_store()
+        self.store.clear()
+        self.addCleanup(self.store.clear)
+        self.performance = sample_performance(show_time="2030-02-12T12:00:00Z")
+        for index in range(self.store.concurrency):
+            self.store.enter(self.performance.id, f"busy{index}")
+
+    def buy(self, **headers):
+        return self.client.post(
+            TICKET_URL,
+            {"performance": self.performance.id, "row": 1, "seat": 1},
+            **headers,
+        )
+
+    def test_busy_performance_queues_checkouts(self):
+        first = self.buy()
+        second = self.client.post(
+            RESERVATION_URL,
+            {
+                "tickets": [
+                    {"performance": self.performance.id, "row": 1, "seat": 2}
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(
+            first.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.assertEqual(first["Retry-After"], "1")
+        self.assertEqual(first.data["position"], 1)
+        self.assertEqual(second.data["position"], 2)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_queued_checkout_goes_in_with_its_token(self):
+        token = self.buy().data["token"]
+        self.store.leave(self.performance.id, "busy0")
+
+        response = self.buy(HTTP_WAITING_ROOM_TOKEN=token)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # The slot is given back once the checkout is done
+        self.assertEqual(self.store.enter(self.performance.id, "next"), 0)
+
+    @skipIf(numpy is None, "numpy is not installed")
+    def test_best_available_holds_are_queued(self):
+        url = reverse(
+            "theater:performance-best-available", args=[self.performance.id]
+        )
+
+        hold = self.client.post(url, {"count": 2})
+        lookup = self.client.get(url, {"count": 2})
+
+        self.assertEqual(hold.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(SeatHold.objects.exists())
+        self.assertEqual(lookup.status_code, status.HTTP_200_OK)
+
+    def test_catalog_reads_are_not_queued(self):
+        with mock.patch.object(AdmissionStore, "enter_all") as enter_all:
+            response = self.client.get(PERFORMANCE_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        enter_all.assert_not_called()
@@ -0,0 +1,909 @@
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from PIL import Image
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from theater.admission import get_admission_store
+from theater.fieldsets import QueryPlan
+from theater.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    Reservation,
+    SeatHold,
+    TheaterHall,
+    Ticket,
+)
+from theater.seat_map import SeatMap, best_block, numpy
+from theater.serializers import (
+    PerformanceListSerializer,
+    PerformanceListValuesSerializer,
+    PlayListSerializer,
+    PlayListValuesSerializer,
+    TicketListSerializer,
+    TicketListValuesSerializer,
+)
+from theater.urls import router
+from user.urls import urlpatterns as user_urlpatterns
+
+BUDGETS_PATH = Path(__file__).with_name("benchmark_budgets.json")
+SCALE = float(os.getenv("BENCHMARK_SCALE", "1"))
+ITERATIONS = int(os.getenv("BENCHMARK_ITERATIONS", "30"))
+# Rewrite the budget file from this run instead of checking against it
+RECORD = bool(os.getenv("BENCHMARK_RECORD"))
+
+PASSWORD = "benchpass"
+
+# Boots a worker the way the WSGI server does, then times requests that
+# only travel through the middleware stack
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+boot = time.perf_counter() - start
+from django.test import Client
+client = Client()
+client.get("/missing/")
+start = time.perf_counter()
+for _ in range({requests}):
+    client.get("/missing/")
+request = (time.perf_counter() - start) / {requests}
+print(json.dumps({{
+    "boot_ms": boot * 1000,
+    "request_us": request * 1e6,
+    "dev_modules": sorted(
+        name for name in sys.modules
+        if name == "debug_toolbar" or name.startswith("debug_toolbar.")
+        or name in ("drf_spectacular.openapi", "drf_spectacular.views")
+    ),
+}}))
+"""
+
+User = get_user_model()
+
+
+def report(line):
+    """Show a measurement beside the runner's output, not in a test's."""
+    sys.stderr.write(line + "\n")
+
+
+def seed_catalog(rng, plays_count, performances_count, tickets_count):
+    """Bulk-load a catalog with the given volumes, bypassing Ticket.save."""
+    genres = Genre.objects.bulk_create(
+        [Genre(name=f"Genre {index}") for index in range(20)]
+    )
+    actors = Actor.objects.bulk_create(
+        [
+            Actor(first_name=f"First{index}", last_name=f"Last{index}")
+            for index in range(200)
+        ]
+    )
+    plays = Play.objects.bulk_create(
+        [
+            Play(
+                title=f"Play {index}",
+                description="Benchmark description " * 5,
+                duration=rng.randint(60, 180),
+            )
+            for index in range(plays_count)
+        ]
+    )
+    Play.genres.through.objects.bulk_create(
+        [
+            Play.genres.through(play_id=play.id, genre_id=genre.id)
+            for play in plays
+            for genre in rng.sample(genres, 2)
+        ]
+    )
+    Play.actors.through.objects.bulk_create(
+        [
+            Play.actors.through(play_id=play.id, actor_id=actor.id)
+            for play in plays
+            for actor in rng.sample(actors, 5)
+        ]
+    )
+    Play.update_search_fields(play.id for play in plays)
+
+    halls = TheaterHall.objects.bulk_create(
+        [
+            TheaterHall(
+                name=f"Hall {index}",
+                rows=rng.randint(15, 25),
+                seats_in_row=rng.randint(20, 40),
+            )
+            for index in range(10)
+        ]
+    )
+
+    start = datetime(2025, 1, 1, 19, tzinfo=timezone.utc)
+    performances = []
+    sold_seats = []
+    per_performance = tickets_count // max(performances_count, 1)
+    for index in range(performances_count):
+        hall = rng.choice(halls)
+        capacity = hall.rows * hall.seats_in_row
+        sold = rng.sample(
+            range(capacity), min(rng.randint(0, per_performance * 2), capacity)
+        )
+        places = [
+            divmod(position, hall.seats_in_row) for position in sold
+        ]
+        places = [(row + 1, seat + 1) for row, seat in places]
+        seats = SeatMap.for_hall(hall)
+        for row, seat in places:
+            seats.occupy(row, seat)
+        performances.append(
+            Performance(
+                play=rng.choice(plays),
+                theater_hall=hall,
+                show_time=start + timedelta(hours=index * 7),
+                seat_map=bytes(seats),
+            )
+        )
+        sold_seats.append(places)
+    performances = Performance.objects.bulk_create(performances)
+    return performances, sold_seats
+
+
+def seed_sales(rng, users, performances, sold_seats, heavy_user):
+    tickets = []
+    reservation_users = []
+    for performance, places in zip(performances, sold_seats):
+        for offset in range(0, len(places), 4):
+            reservation_users.append(
+                heavy_user if rng.random() < 0.01 else rng.choice(users)
+            )
+            tickets.append((performance, places[offset:offset + 4]))
+
+    reservations = Reservation.objects.bulk_create(
+        [Reservation(user=user) for user in reservation_users],
+        batch_size=5000,
+    )
+    Ticket.objects.bulk_create(
+        [
+            Ticket(
+                performance=performance,
+                reservation=reservation,
+                row=row,
+                seat=seat,
+            )
+            for reservation, (performance, places) in zip(
+                reservations, tickets
+            )
+            for row, seat in places
+        ],
+        batch_size=5000,
+    )
+
+
+@skipUnless(
+    os.getenv("BENCHMARK"), "Set BENCHMARK=1 to run the endpoint benchmarks"
+)
+class EndpointBenchmark(TestCase):
+    """Drives every API route against seeded volumes and checks budgets.
+
+    Each route is requested ``BENCHMARK_ITERATIONS`` times. Query count,
+    p50/p99 latency and peak traced allocation are compared with
+    ``benchmark_budgets.json``; run with ``BENCHMARK_RECORD=1`` to rewrite
+    that file from the current numbers.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        media_root = cls.enterClassContext(tempfile.TemporaryDirectory())
+        cls.enterClassContext(override_settings(MEDIA_ROOT=media_root))
+        # Not in setUpTestData, whose attributes are copied for every test
+        cls.results = {}
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(2025)
+        password = make_password(PASSWORD)
+        users = User.objects.bulk_create(
+            [
+                User(
+                    username=f"customer{index}",
+                    email=f"customer{index}@bench.test",
+                    password=password,
+                )
+                for index in range(int(500 * SCALE) or 1)
+            ]
+        )
+        cls.user = User.objects.create_user(
+            username="heavy", email="heavy@bench.test", password=PASSWORD
+        )
+        cls.admin = User.objects.create_superuser(
+            "admin", "admin@bench.test", PASSWORD
+        )
+        performances, sold_seats = seed_catalog(
+            rng,
+            plays_count=int(300 * SCALE) or 1,
+            performances_count=int(3000 * SCALE) or 1,
+            tickets_count=int(200_000 * SCALE),
+        )
+        seed_sales(rng, users, performances, sold_seats, cls.user)
+
+        cls.play = Play.objects.first()
+        cls.performance = Performance.objects.first()
+        cls.genre = Genre.objects.first()
+        cls.actor = Actor.objects.first()
+        # An empty performance keeps write routes free of seat conflicts
+        cls.booking_performance = Performance.objects.create(
+            play=cls.play,
+            theater_hall=TheaterHall.objects.create(
+                name="Benchmark Hall", rows=100, seats_in_row=100
+            ),
+            show_time=datetime(2030, 1, 1, tzinfo=timezone.utc),
+        )
+        cls.refresh = str(RefreshToken.for_user(cls.user))
+
+    @classmethod
+    def tearDownClass(cls):
+        if RECORD and cls.results:
+            BUDGETS_PATH.write_text(
+                json.dumps(cls.results, indent=2, sort_keys=True) + "\n"
+            )
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.admin_client = APIClient()
+        self.admin_client.force_authenticate(user=self.admin)
+        self.anonymous_client = APIClient()
+
+    def seat(self, index, offset=0):
+        position = index * 3 + offset
+        return {"row": position // 100 + 1, "seat": position % 100 + 1}
+
+    def image(self):
+        content = io.BytesIO()
+        Image.new("RGB", (10, 10)).save(content, format="JPEG")
+        content.seek(0)
+        content.name = "bench.jpg"
+        return content
+
+    def hold(self, index):
+        return SeatHold.place(
+            self.user,
+            self.booking_performance.id,
+            [tuple(self.seat(index, 2).values())],
+            minutes=10,
+        )
+
+    def fill_cart(self, index):
+        """Put a ticket in the open reservation; return the checkout path."""
+        Ticket.objects.create(
+            reservation=Reservation.open_for(self.user.id),
+            performance=self.booking_performance,
+            **self.seat(index),
+        )
+        return reverse("theater:reservation-checkout")
+
+    def routes(self):
+        """Map "METHOD url-name" to a builder of (client, path, data)."""
+        performance_id = self.booking_performance.id
+        return {
+            "GET theater:genre-list": lambda i: (
+                self.client, reverse("theater:genre-list"), None
+            ),
+            "PATCH theater:genre-detail": lambda i: (
+                self.admin_client,
+                reverse("theater:genre-detail", args=[self.genre.id]),
+                {"name": f"Genre renamed {i}"},
+            ),
+            "GET theater:actor-list": lambda i: (
+                self.client, reverse("theater:actor-list"), None
+            ),
+            "PATCH theater:actor-detail": lambda i: (
+                self.admin_client,
+                reverse("theater:actor-detail", args=[self.actor.id]),
+                {"last_name": f"Renamed{i}"},
+            ),
+            "GET theater:play-list": lambda i: (
+                self.client, reverse("theater:play-list"), None
+            ),
+            "GET theater:play-list?actors": lambda i: (
+                self.client,
+                # Three-digit names match one actor whatever the index
+                reverse("theater:play-list") + f"?actors=last{100 + i % 100}",
+                None,
+            ),
+            "GET theater:play-detail": lambda i: (
+                self.client,
+                reverse("theater:play-detail", args=[self.play.id]),
+                None,
+            ),
+            "POST theater:play-upload-image": lambda i: (
+                self.admin_client,
+                reverse("theater:play-upload-image", args=[self.play.id]),
+                {"image": self.image()},
+            ),
+            "GET theater:performance-list": lambda i: (
+                self.client, reverse("theater:performance-list"), None
+            ),
+            "GET theater:performance-list?cursor": lambda i: (
+                self.client,
+                reverse("theater:performance-list") + "?cursor=",
+                None,
+            ),
+            "GET theater:performance-detail": lambda i: (
+                self.client,
+                reverse(
+                    "theater:performance-detail", args=[self.performance.id]
+                ),
+                None,
+            ),
+            "GET theater:performance-best-available": lambda i: (
+                self.client,
+                reverse(
+                    "theater:performance-best-available",
+                    args=[performance_id],
+                )
+                + "?count=4",
+                None,
+            ),
+            # Holds are taken around the middle of the hall, away from the
+            # seats the other write routes book at the front
+            "POST theater:performance-best-available": lambda i: (
+                self.client,
+                reverse(
+                    "theater:performance-best-available",
+                    args=[performance_id],
+                ),
+                {"count": 2},
+            ),
+            "GET theater:ticket-list": lambda i: (
+                self.client, reverse("theater:ticket-list"), None
+            ),
+            "POST theater:ticket-list": lambda i: (
+                self.client,
+                reverse("theater:ticket-list"),
+                {"performance": performance_id, **self.seat(i)},
+            ),
+            "GET theater:theaterhall-list": lambda i: (
+                self.client, reverse("theater:theaterhall-list"), None
+            ),
+            "GET theater:reservation-list": lambda i: (
+                self.client, reverse("theater:reservation-list"), None
+            ),
+            "POST theater:reservation-list": lambda i: (
+                self.client,
+                reverse("theater:reservation-list"),
+                {
+                    "tickets": [
+                        {"performance": performance_id, **self.seat(i, 1)}
+                    ]
+                },
+            ),
+            "POST theater:reservation-checkout": lambda i: (
+                self.client,
+                self.fill_cart(i + ITERATIONS * 6),
+                None,
+            ),
+            "POST theater:seathold-list": lambda i: (
+                self.client,
+                reverse("theater:seathold-list"),
+                {
+                    "performance": performance_id,
+                    "seats": [self.seat(i + ITERATIONS * 2, 2)],
+                },
+            ),
+            "GET theater:seathold-detail": lambda i: (
+                self.client,
+                reverse("theater:seathold-detail", args=[self.hold(i).id]),
+                None,
+            ),
+            "POST theater:seathold-checkout": lambda i: (
+                self.client,
+                reverse(
+                    "theater:seathold-checkout",
+                    args=[self.hold(i + ITERATIONS * 4).id],
+                ),
+                None,
+            ),
+            "POST user:create": lambda i: (
+                self.anonymous_client,
+                reverse("user:create"),
+                {
+                    "username": f"new{i}",
+                    "email": f"new{i}@bench.test",
+                    "password": PASSWORD,
+                    "first_name": "New",
+                    "last_name": "Customer",
+                },
+            ),
+            "GET user:manage": lambda i: (
+                self.client, reverse("user:manage"), None
+            ),
+            "POST user:login_user": lambda i: (
+                self.anonymous_client,
+                reverse("user:login_user"),
+                {"email": "heavy@bench.test", "password": PASSWORD},
+            ),
+            "POST user:token_refresh": lambda i: (
+                self.anonymous_client,
+                reverse("user:token_refresh"),
+                {"refresh": self.refresh},
+            ),
+            "POST user:token_verify": lambda i: (
+                self.anonymous_client,
+                reverse("user:token_verify"),
+                {"token": self.refresh},
+            ),
+        }
+
+    def request(self, route, build, index):
+        client, path, data = build(index)
+        method = route.split()[0].lower()
+        if data is None:
+            return lambda: getattr(client, method)(path)
+        if route == "POST theater:play-upload-image":
+            return lambda: client.post(path, data, format="multipart")
+        return lambda: getattr(client, method)(path, data, format="json")
+
+    def measure(self, route, build):
+        latencies = []
+        queries = 0
+        for index in range(ITERATIONS):
+            # Throttle history lives in the default cache
+            cache.clear()
+            send = self.request(route, build, index)
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = send()
+                latencies.append((time.perf_counter() - start) * 1000)
+            self.assertLess(response.status_code, 400, response.content)
+            queries = max(queries, len(captured))
+
+        cache.clear()
+        send = self.request(route, build, ITERATIONS)
+        tracemalloc.start()
+        send()
+        allocated = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+
+        percentiles = statistics.quantiles(latencies, n=100)
+        return {
+            "queries": queries,
+            "p50_ms": round(percentiles[49], 2),
+            "p99_ms": round(percentiles[98], 2),
+            "alloc_kib": round(allocated, 1),
+        }
+
+    def test_every_route_is_benchmarked(self):
+        url_names = {
+            f"theater:{url.name}"
+            for url in router.urls
+            if url.name != "api-root"
+        } | {f"user:{url.name}" for url in user_urlpatterns}
+        benchmarked = {
+            route.split()[1].split("?")[0] for route in self.routes()
+        }
+
+        self.assertEqual(url_names - benchmarked, set())
+
+    def test_routes_within_budget(self):
+        budgets = {} if RECORD else json.loads(BUDGETS_PATH.read_text())
+
+        for route, build in self.routes().items():
+            with self.subTest(route=route):
+                measured = self.measure(route, build)
+                report(f"{route:40} {measured}")
+                if RECORD:
+                    # Leave headroom for timing noise between machines
+                    self.results[route] = {
+                        "queries": measured["queries"],
+                        "p50_ms": round(measured["p50_ms"] * 3 + 5, 1),
+                        "p99_ms": round(measured["p99_ms"] * 3 + 10, 1),
+                        "alloc_kib": round(measured["alloc_kib"] * 1.5 + 64),
+                    }
+                    continue
+                budget = budgets[route]
+                for metric, value in measured.items():
+                    self.assertLessEqual(
+                        value, budget[metric], f"{route} {metric}"
+                    )
+
+
+@skipUnless(
+    os.getenv("BENCHMARK"), "Set BENCHMARK=1 to run the serializer benchmark"
+)
+class ListSerializerBenchmark(TestCase):
+    """Times a 50-item page through the model and the values serializers.
+
+    Each run fetches the page and builds its data, so the model side pays
+    for instances and prefetches and the values side for its own queries.
+    """
+
+    page_size = 50
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(2025)
+        performances, sold_seats = seed_catalog(
+            rng, plays_count=100, performances_count=100, tickets_count=5000
+        )
+        users = User.objects.bulk_create(
+            [
+                User(username=f"customer{index}", email=f"c{index}@b.test")
+                for index in range(10)
+            ]
+        )
+        seed_sales(rng, users, performances, sold_seats, users[0])
+
+    def time_page(self, serializer_class, queryset):
+        context = {"request": APIRequestFactory().get("/")}
+        timings = []
+        for _ in range(ITERATIONS):
+            start = time.perf_counter()
+            serializer_class(
+                list(queryset[: self.page_size]), many=True, context=context
+            ).data
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings) * 1000
+
+    def test_values_serializers_are_faster(self):
+        pages = {
+            "performance-list": (
+                PerformanceListSerializer,
+                PerformanceListValuesSerializer,
+                Performance.objects.all(),
+            ),
+            "play-list": (
+                PlayListSerializer,
+                PlayListValuesSerializer,
+                Play.objects.all(),
+            ),
+            "ticket-list": (
+                TicketListSerializer,
+                TicketListValuesSerializer,
+                Ticket.objects.all(),
+            ),
+        }
+        for name, (serializer, values_serializer, queryset) in pages.items():
+            with self.subTest(page=name):
+                model_ms = self.time_page(
+                    serializer,
+                    QueryPlan.for_serializer(serializer()).apply(queryset),
+                )
+                values_ms = self.time_page(
+                    values_serializer,
+                    queryset.prefetch_related(None).values(
+                        *values_serializer.get_values()
+                    ),
+                )
+                report(
+                    f"{name:17} model {model_ms:6.2f} ms, "
+                    f"values {values_ms:6.2f} ms, "
+                    f"{model_ms / values_ms:4.1f}x"
+                )
+                self.assertLess(values_ms, model_ms)
+
+
+@skipUnless(
+    os.getenv("BENCHMARK") and numpy is not None,
+    "Set BENCHMARK=1 and install numpy to run the seat search benchmark",
+)
+class BestBlockBenchmark(SimpleTestCase):
+    """Times the best-available search on a large, mostly sold hall."""
+
+    rows = 200
+    seats_in_row = 200
+
+    def test_search_within_a_millisecond(self):
+        rng = random.Random(2025)
+        taken = SeatMap(self.rows, self.seats_in_row)
+        held = SeatMap(self.rows, self.seats_in_row)
+        for row in range(1, self.rows + 1):
+            for seat in range(1, self.seats_in_row + 1):
+                draw = rng.random()
+                if draw < 0.7:
+                    taken.occupy(row, seat)
+                elif draw < 0.75:
+                    held.occupy(row, seat)
+
+        for count in (1, 4, 10):
+            timings = []
+            for _ in range(ITERATIONS):
+                start = time.perf_counter()
+                block = best_block(count, taken, held)
+                timings.append(time.perf_counter() - start)
+            median_ms = statistics.median(timings) * 1000
+            report(
+                f"best {count:2} of {self.rows * self.seats_in_row} seats "
+                f"{median_ms:.3f} ms"
+            )
+            with self.subTest(count=count):
+                self.assertLess(median_ms, 1)
+                self.assertTrue(
+                    all(
+                        not taken.is_taken(*place)
+                        and not held.is_taken(*place)
+                        for place in block
+                    )
+                )
+
+
+@skipUnless(
+    os.getenv("BENCHMARK") and connection.vendor == "postgresql",
+    "Set BENCHMARK=1 and use PostgreSQL to run the checkout benchmark",
+)
+class CheckoutBenchmark(TransactionTestCase):
+    """Runs overlapping multi-performance checkouts on a growing pool.
+
+    Every checkout books a seat in four performances picked at random, so
+    workers keep contending for the same rows; with the locks taken in id
+    order they only ever wait, and throughput should grow with them.
+    """
+
+    performances_count = 32
+    checkouts = int(400 * SCALE) or 1
+
+    def setUp(self):
+        hall = TheaterHall.objects.create(
+            name="Benchmark Hall", rows=100, seats_in_row=100
+        )
+        play = Play.objects.create(
+            title="Benchmark", description="Benchmark", duration=60
+        )
+        self.performance_ids = [
+            performance.id
+            for performance in Performance.objects.bulk_create(
+                [
+                    Performance(
+                        play=play,
+                        theater_hall=hall,
+                        show_time=datetime(2030, 1, 1, tzinfo=timezone.utc),
+                    )
+                    for _ in range(self.performances_count)
+                ]
+            )
+        ]
+        self.user = User.objects.create_user(
+            username="buyer", email="buyer@bench.test", password=PASSWORD
+        )
+
+    def checkout(self, index):
+        performance_ids = random.Random(index).sample(self.performance_ids, 4)
+        row, seat = divmod(index, 100)
+        try:
+            with transaction.atomic():
+                reservation = Reservation.objects.create(user=self.user)
+                Ticket.book_seats(
+                    [
+                        Ticket(
+                            performance_id=performance_id,
+                            reservation=reservation,
+                            row=row + 1,
+                            seat=seat + 1,
+                        )
+                        for performance_id in performance_ids
+                    ]
+                )
+        finally:
+            connection.close()
+
+    def test_checkouts_scale_with_workers(self):
+        offset = 0
+        for workers in (1, 2, 4, 8):
+            indexes = range(offset, offset + self.checkouts)
+            offset += self.checkouts
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(self.checkout, indexes))
+            elapsed = time.perf_counter() - start
+            report(
+                f"{workers} workers {self.checkouts / elapsed:8.1f} "
+                f"checkouts/s"
+            )
+
+        self.assertEqual(Ticket.objects.count(), offset * 4)
+
+
+@skipUnless(
+    os.getenv("BENCHMARK") and connection.vendor == "postgresql",
+    "Set BENCHMARK=1 and use PostgreSQL to run the admission benchmark",
+)
+@mock.patch.object(SimpleRateThrottle, "THROTTLE_RATES", {"user": None})
+class AdmissionBenchmark(TransactionTestCase):
+    """Puts one performance on sale to a crowd while others browse.
+
+    Buyers retry through the waiting room until they get their seat;
+    browsers time catalog reads. The run is repeated with admission
+    control effectively off, to show what the cap saves at the tail.
+    """
+
+    buyers = 64
+    browsers = 4
+    reads = int(200 * SCALE) or 1
+
+    def setUp(self):
+        self.performance = Performance.objects.create(
+            play=Play.objects.create(
+                title="On Sale", description="On Sale", duration=60
+            ),
+            theater_hall=TheaterHall.objects.create(
+                name="Benchmark Hall", rows=100, seats_in_row=100
+            ),
+            show_time=datetime(2030, 1, 1, tzinfo=timezone.utc),
+        )
+        self.users = [
+            User.objects.create_user(
+                username=f"buyer{index}",
+                email=f"buyer{index}@bench.test",
+                password=PASSWORD,
+            )
+            for index in range(self.buyers)
+        ]
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.location = Path(directory.name) / "admission.sqlite3"
+        self.addCleanup(get_admission_store.cache_clear)
+
+    def buy(self, index):
+        client = APIClient()
+        client.force_authenticate(user=self.users[index])
+        headers = {}
+        start = time.perf_counter()
+        try:
+            while True:
+                response = client.post(
+                    reverse("theater:ticket-list"),
+                    {
+                        "performance": self.performance.id,
+                        "row": index // 100 + 1,
+                        "seat": index % 100 + 1,
+                    },
+                    **headers,
+                )
+                if response.status_code != status.HTTP_503_SERVICE_UNAVAILABLE:
+                    self.assertEqual(
+                        response.status_code, status.HTTP_201_CREATED
+                    )
+                    return (time.perf_counter() - start) * 1000
+                headers["HTTP_WAITING_ROOM_TOKEN"] = response.data["token"]
+                time.sleep(0.01)
+        finally:
+            connection.close()
+
+    def browse(self, _):
+        client = APIClient()
+        client.force_authenticate(user=self.users[0])
+        latencies = []
+        try:
+            for _ in range(self.reads):
+                start = time.perf_counter()
+                client.get(reverse("theater:performance-list"))
+                latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection.close()
+        return latencies
+
+    def run_sale(self, concurrency):
+        Ticket.objects.all().delete()
+        config = {
+            **settings.ADMISSION_CONTROL,
+            "LOCATION": str(self.location),
+            "CONCURRENCY": concurrency,
+        }
+        with self.settings(ADMISSION_CONTROL=config):
+            get_admission_store.cache_clear()
+            get_admission_store().clear()
+            with ThreadPoolExecutor(
+                max_workers=self.buyers + self.browsers
+            ) as executor:
+                reads = executor.map(self.browse, range(self.browsers))
+                purchases = executor.map(self.buy, range(self.buyers))
+                reads = [latency for run in reads for latency in run]
+                purchases = list(purchases)
+        return (
+            statistics.quantiles(reads, n=100)[98],
+            statistics.quantiles(purchases, n=100)[98],
+        )
+
+    def test_cap_bounds_read_tail_latency(self):
+        capped = self.run_sale(settings.ADMISSION_CONTROL["CONCURRENCY"])
+        uncapped = self.run_sale(self.buyers)
+        for name, (read_p99, purchase_p99) in (
+            ("capped", capped),
+            ("uncapped", uncapped),
+        ):
+            report(
+                f"{name:9} read p99 {read_p99:7.1f} ms, "
+                f"purchase p99 {purchase_p99:7.1f} ms"
+            )
+
+        self.assertEqual(Ticket.objects.count(), self.buyers)
+        self.assertLessEqual(capped[0], uncapped[0])
+
+
+@skipUnless(
+    os.getenv("BENCHMARK"), "Set BENCHMARK=1 to run the startup benchmark"
+)
+class StartupBenchmark(SimpleTestCase):
+    """Compares worker boot time and middleware cost across profiles.
+
+    "dev" loads everything the settings used to load unconditionally, so it
+    is the baseline "prod" is measured against.
+    """
+
+    runs = 5
+    requests = 200
+
+    def boot(self, profile):
+        environment = {
+            **os.environ,
+            "DJANGO_PROFILE": profile,
+            "DEBUG": "",
+            "API_DOCS": "",
+            "THROTTLE_STORE_BACKEND": "theater.throttling.CacheThrottleStore",
+            "THROTTLE_STORE_LOCATION": "default",
+        }
+        runs = []
+        for _ in range(self.runs):
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    "-c",
+                    STARTUP_SCRIPT.format(requests=self.requests),
+                ],
+                env=environment,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            runs.append(json.loads(result.stdout.splitlines()[-1]))
+        return {
+            "boot_ms": round(statistics.median(r["boot_ms"] for r in runs)),
+            "request_us": round(
+                statistics.median(r["request_us"] for r in runs)
+            ),
+            "dev_modules": runs[0]["dev_modules"],
+        }
+
+    def test_prod_profile_skips_dev_only_modules(self):
+        dev = self.boot("dev")
+        prod = self.boot("prod")
+        for profile, measured in (("dev", dev), ("prod", prod)):
+            report(
+                f"{profile:5} boot {measured['boot_ms']} ms, "
+                f"{measured['request_us']} us per request through middleware"
+            )
+
+        self.assertIn("debug_toolbar.middleware", dev["dev_modules"])
+        self.assertEqual(prod["dev_modules"], [])
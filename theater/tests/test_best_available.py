@@ -0,0 +1,156 @@
+from datetime import timedelta
+from unittest import skipIf
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from theater.models import Reservation, SeatHold, Ticket
+from theater.seat_map import SeatMap, best_block, numpy
+from theater.tests.base import ApiTestCase, sample_hall, sample_performance
+
+
+def best_available_url(performance_id):
+    return reverse("theater:performance-best-available", args=[performance_id])
+
+
+@skipIf(numpy is None, "numpy is not installed")
+class BestBlockTest(SimpleTestCase):
+    def test_empty_hall_gets_the_centre_of_the_best_row(self):
+        seats = SeatMap(rows=10, seats_in_row=20)
+
+        self.assertEqual(
+            best_block(4, seats), [(5, 9), (5, 10), (5, 11), (5, 12)]
+        )
+
+    def test_taken_seats_split_blocks(self):
+        seats = SeatMap(rows=1, seats_in_row=9)
+        for seat in (3, 5, 7):
+            seats.occupy(1, seat)
+
+        self.assertEqual(best_block(2, seats), [(1, 1), (1, 2)])
+        self.assertEqual(best_block(1, seats), [(1, 4)])
+        self.assertEqual(best_block(3, seats), [])
+
+    def test_seats_taken_in_any_map_are_skipped(self):
+        taken = SeatMap(rows=3, seats_in_row=4)
+        held = SeatMap(rows=3, seats_in_row=4)
+        for seat in (1, 2):
+            taken.occupy(2, seat)
+        for seat in (3, 4):
+            held.occupy(2, seat)
+
+        self.assertEqual(best_block(2, taken, held), [(1, 2), (1, 3)])
+
+    def test_blocks_are_free_and_adjacent(self):
+        seats = SeatMap(rows=7, seats_in_row=11)
+        for index in range(0, 77, 3):
+            seats.occupy(index // 11 + 1, index % 11 + 1)
+
+        for count in range(1, 12):
+            with self.subTest(count=count):
+                block = best_block(count, seats)
+                if count > 2:
+                    self.assertEqual(block, [])
+                    continue
+                self.assertEqual(len(block), count)
+                self.assertEqual(
+                    [seat for _, seat in block],
+                    list(range(block[0][1], block[0][1] + count)),
+                )
+                self.assertTrue(
+                    all(not seats.is_taken(*place) for place in block)
+                )
+
+    def test_block_wider_than_the_hall(self):
+        self.assertEqual(best_block(5, SeatMap(rows=2, seats_in_row=4)), [])
+
+    def test_hall_without_seats(self):
+        self.assertEqual(best_block(2, SeatMap(rows=0, seats_in_row=4)), [])
+        self.assertEqual(best_block(2, SeatMap(rows=4, seats_in_row=0)), [])
+
+
+@skipIf(numpy is None, "numpy is not installed")
+class BestAvailableApiTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.performance = sample_performance(
+            theater_hall=sample_hall(rows=3, seats_in_row=6),
+            show_time=timezone.now() + timedelta(days=1),
+        )
+        self.url = best_available_url(self.performance.id)
+
+    def sell(self, row, seats):
+        reservation = Reservation.objects.create(user=self.user)
+        for seat in seats:
+            Ticket.objects.create(
+                performance=self.performance,
+                reservation=reservation,
+                row=row,
+                seat=seat,
+            )
+
+    def test_finds_seats_around_sold_ones(self):
+        self.sell(2, [3])
+
+        response = self.client.get(self.url, {"count": 3})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            {
+                "count": 3,
+                "seats": [
+                    {"row": 2, "seat": seat} for seat in (4, 5, 6)
+                ],
+            },
+        )
+
+    def test_no_block_left(self):
+        for row in (1, 2, 3):
+            self.sell(row, [3])
+
+        response = self.client.get(self.url, {"count": 4})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["seats"], [])
+
+    def test_invalid_count(self):
+        for params in ({}, {"count": 0}, {"count": "x"}):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
+
+    def test_post_holds_the_block(self):
+        first = self.client.post(self.url, {"count": 2, "minutes": 5})
+        second = self.client.post(self.url, {"count": 2})
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            first.data["seats"],
+            [{"row": 2, "seat": 3}, {"row": 2, "seat": 4}],
+        )
+        # The held block is not offered again
+        self.assertEqual(
+            second.data["seats"],
+            [{"row": 1, "seat": 3}, {"row": 1, "seat": 4}],
+        )
+        hold = SeatHold.objects.get(id=first.data["id"])
+        self.assertEqual(hold.user, self.user)
+        self.assertEqual(hold.seat_list, [(2, 3), (2, 4)])
+
+    def test_post_without_a_block(self):
+        response = self.client.post(self.url, {"count": 7})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("count", response.data)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_requires_authentication(self):
+        response = APIClient().get(self.url, {"count": 1})
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
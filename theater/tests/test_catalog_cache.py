@@ -0,0 +1,117 @@
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from theater.cache import CATALOG_CACHE, bump_version, get_versions
+from theater.models import Genre, Play
+from theater.tests.base import (
+    ApiTestCase,
+    sample_actor,
+    sample_genre,
+    sample_play,
+)
+
+GENRE_URL = reverse("theater:genre-list")
+PLAY_URL = reverse("theater:play-list")
+
+
+class CatalogCacheTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.genre = sample_genre()
+        self.actor = sample_actor(first_name="Tom", last_name="Cruse")
+        self.play = sample_play()
+        self.play.genres.add(self.genre)
+
+    def test_repeated_list_served_from_cache(self):
+        first = self.client.get(GENRE_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(GENRE_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+
+    def test_genre_change_invalidates_genre_and_play_lists(self):
+        self.client.get(GENRE_URL)
+        self.client.get(PLAY_URL)
+
+        self.genre.name = "Comedy"
+        self.genre.save()
+
+        self.assertEqual(
+            self.client.get(GENRE_URL).json()[0]["name"], "Comedy"
+        )
+        self.assertEqual(
+            self.client.get(PLAY_URL).json()[0]["genres"], ["Comedy"]
+        )
+
+    def test_play_m2m_change_invalidates_play_list(self):
+        self.client.get(PLAY_URL)
+
+        self.play.actors.add(self.actor)
+
+        self.assertEqual(
+            self.client.get(PLAY_URL).json()[0]["actors"], ["Tom Cruse"]
+        )
+
+    def test_versions_bumped_again_after_commit(self):
+        before = get_versions([Genre, Play])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.genre.save()
+            self.play.actors.add(self.actor)
+        during = get_versions([Genre, Play])
+        for callback in callbacks:
+            callback()
+        after = get_versions([Genre, Play])
+
+        # Bumped by the write and once more after it commits
+        self.assertEqual(len(callbacks), 2)
+        for old, new in zip(before, during):
+            self.assertGreater(new, old)
+        for old, new in zip(during, after):
+            self.assertGreater(new, old)
+
+    def test_query_params_normalized_into_key(self):
+        Play.objects.create(
+            title="Other", description="Test Description", duration=60
+        )
+        self.client.get(PLAY_URL, {"title": "TEST"})
+
+        with self.assertNumQueries(0):
+            res = self.client.get(PLAY_URL, {"title": "test", "page": "1"})
+        other = self.client.get(PLAY_URL, {"title": "other"})
+
+        self.assertEqual([play["title"] for play in res.json()], ["Test Title"])
+        self.assertEqual([play["title"] for play in other.json()], ["Other"])
+
+
+class SharedVersionTest(SimpleTestCase):
+    def test_bump_is_seen_by_other_workers(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        catalog = {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": directory.name,
+        }
+
+        def other_worker_versions():
+            # Cache connections are per thread, so this one reads the files
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                return executor.submit(get_versions, [Genre]).result()
+
+        with override_settings(
+            CACHES={**settings.CACHES, CATALOG_CACHE: catalog}
+        ):
+            before = get_versions([Genre])
+            self.assertEqual(other_worker_versions(), before)
+
+            bump_version(Genre)
+
+            self.assertNotEqual(other_worker_versions(), before)
+            self.assertEqual(other_worker_versions(), get_versions([Genre]))
@@ -0,0 +1,74 @@
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from theater.models import Actor, Reservation, Ticket
+from theater.tests.base import (
+    ApiTestCase,
+    sample_hall,
+    sample_performance,
+    sample_play,
+)
+
+PLAY_URL = reverse("theater:play-list")
+
+
+def performance_detail_url(performance_id):
+    return reverse("theater:performance-detail", args=[performance_id])
+
+
+class ConditionalGetTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.hall = sample_hall()
+        self.play = sample_play()
+        self.performance = sample_performance(
+            play=self.play, theater_hall=self.hall
+        )
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_performance_detail_not_modified(self):
+        url = performance_detail_url(self.performance.id)
+        res = self.client.get(url)
+
+        with self.assertNumQueries(1):
+            not_modified = self.revalidate(url, res["ETag"])
+
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified.content, b"")
+        self.assertIn("Last-Modified", res)
+
+    def test_performance_detail_etag_changes_with_seat_state(self):
+        url = performance_detail_url(self.performance.id)
+        etag = self.client.get(url)["ETag"]
+
+        Ticket.objects.create(
+            performance=self.performance,
+            reservation=Reservation.objects.create(user=self.user),
+            row=1,
+            seat=1,
+        )
+        res = self.revalidate(url, etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_play_list_not_modified(self):
+        res = self.client.get(PLAY_URL)
+
+        with self.assertNumQueries(0):
+            not_modified = self.revalidate(PLAY_URL, res["ETag"])
+
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_play_list_etag_changes_with_play_actors(self):
+        etag = self.client.get(PLAY_URL)["ETag"]
+
+        self.play.actors.add(
+            Actor.objects.create(first_name="Tom", last_name="Cruse")
+        )
+        res = self.revalidate(PLAY_URL, etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()[0]["actors"], ["Tom Cruse"])
@@ -0,0 +1,182 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.utils.timezone import localtime
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from theater.export import stream_csv, stream_ndjson
+from theater.models import Reservation, Ticket
+from theater.tests.base import (
+    ApiTestCase,
+    sample_hall,
+    sample_performance,
+    sample_play,
+)
+
+EXPORT_URL = reverse("theater:ticket-export")
+
+User = get_user_model()
+
+
+class StreamTest(SimpleTestCase):
+    rows = [{"play": "Hamlet, Act 1", "seat": index} for index in range(5)]
+
+    def test_csv_is_written_in_chunks(self):
+        chunks = list(
+            stream_csv(iter(self.rows), ("play", "seat"), chunk_size=2)
+        )
+
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(
+            list(csv.DictReader(io.StringIO(b"".join(chunks).decode()))),
+            [
+                {"play": "Hamlet, Act 1", "seat": str(row["seat"])}
+                for row in self.rows
+            ],
+        )
+
+    def test_ndjson_is_written_in_chunks(self):
+        chunks = list(stream_ndjson(iter(self.rows), chunk_size=2))
+
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(
+            [json.loads(line) for line in b"".join(chunks).splitlines()],
+            self.rows,
+        )
+
+    def test_no_rows_still_get_the_header(self):
+        self.assertEqual(
+            list(stream_csv(iter(()), ("play", "seat"))), [b"play,seat\r\n"]
+        )
+
+
+class TicketExportApiTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_superuser(
+            "admin", "admin@email.test", "testpass"
+        )
+        self.client.force_authenticate(user=self.admin)
+        hall = sample_hall()
+        play = sample_play(
+            title="Hamlet", description="Prince of Denmark", duration=180
+        )
+        start = datetime(2025, 2, 12, 12, tzinfo=timezone.utc)
+        self.performances = [
+            sample_performance(
+                play=play,
+                theater_hall=hall,
+                show_time=start + timedelta(days=index),
+            )
+            for index in range(2)
+        ]
+        self.reservation = Reservation.objects.create(user=self.user)
+        for performance in self.performances:
+            for seat in (2, 1):
+                Ticket.objects.create(
+                    reservation=self.reservation,
+                    performance=performance,
+                    row=3,
+                    seat=seat,
+                )
+
+    def export(self, params=None, **extra):
+        response = self.client.get(EXPORT_URL, params, **extra)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_csv_rows(self):
+        response, content = self.export()
+
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn(
+            'filename="tickets.csv"', response["Content-Disposition"]
+        )
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(
+            rows[0],
+            {
+                "performance": str(self.performances[0].id),
+                "show_time": "2025-02-12T14:00:00+02:00",
+                "play": "Hamlet",
+                "theater_hall": "Main Hall",
+                "row": "3",
+                "seat": "1",
+                "user_email": "test@email.test",
+                "created_at": localtime(
+                    self.reservation.created_at
+                ).isoformat(),
+            },
+        )
+        self.assertEqual(
+            [(row["performance"], row["seat"]) for row in rows],
+            [
+                (str(performance.id), seat)
+                for performance in self.performances
+                for seat in ("1", "2")
+            ],
+        )
+
+    def test_empty_csv_has_the_header(self):
+        Ticket.objects.all().delete()
+
+        _, content = self.export()
+
+        self.assertEqual(
+            content.splitlines(),
+            [
+                "performance,show_time,play,theater_hall,row,seat,"
+                "user_email,created_at"
+            ],
+        )
+
+    def test_ndjson_rows(self):
+        response, content = self.export(HTTP_ACCEPT="application/x-ndjson")
+
+        self.assertEqual(
+            response["Content-Type"], "application/x-ndjson; charset=utf-8"
+        )
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]["performance"], self.performances[0].id)
+        self.assertEqual(rows[0]["row"], 3)
+
+    def test_filter_by_performance_and_dates(self):
+        performance = self.performances[1]
+        for params in (
+            {"performance": performance.id, "format": "ndjson"},
+            {"date_from": "2025-02-13", "format": "ndjson"},
+            {"date_to": "2025-02-12", "format": "ndjson"},
+        ):
+            with self.subTest(params=params):
+                _, content = self.export(params)
+                rows = [json.loads(line) for line in content.splitlines()]
+                expected = (
+                    self.performances[0]
+                    if "date_to" in params
+                    else performance
+                )
+                self.assertEqual(
+                    {row["performance"] for row in rows}, {expected.id}
+                )
+
+    def test_invalid_filters(self):
+        for params in ({"performance": "x"}, {"date_from": "12.02.2025"}):
+            with self.subTest(params=params):
+                response = self.client.get(EXPORT_URL, params)
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
+
+    def test_export_requires_admin(self):
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(EXPORT_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,152 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from theater.models import IdempotencyKey, Reservation, Ticket
+from theater.tests.base import ApiTestCase, sample_performance, sample_user
+
+TICKET_URL = reverse("theater:ticket-list")
+RESERVATION_URL = reverse("theater:reservation-list")
+
+
+class IdempotencyKeyApiTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.performance = sample_performance(
+            show_time=timezone.now() + timedelta(days=1)
+        )
+
+    def buy(self, seat, key="retry-1", client=None):
+        return (client or self.client).post(
+            TICKET_URL,
+            {"performance": self.performance.id, "row": 1, "seat": seat},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_replays_the_first_response(self):
+        first = self.buy(1)
+
+        with CaptureQueriesContext(connection) as queries:
+            retry = self.buy(1)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertFalse(
+            any("theater_ticket" in query["sql"] for query in queries)
+        )
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_reservation_retry_is_replayed(self):
+        payload = {
+            "tickets": [
+                {"performance": self.performance.id, "row": 2, "seat": seat}
+                for seat in (1, 2)
+            ]
+        }
+        responses = [
+            self.client.post(
+                RESERVATION_URL,
+                payload,
+                format="json",
+                HTTP_IDEMPOTENCY_KEY="checkout-1",
+            )
+            for _ in range(2)
+        ]
+
+        self.assertEqual(responses[1].json(), responses[0].json())
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_key_reused_for_another_request(self):
+        self.buy(1)
+
+        response = self.buy(2)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_keys_are_scoped_per_user(self):
+        other_client = APIClient()
+        other_client.force_authenticate(
+            sample_user(username="other", email="other@email.test")
+        )
+        self.buy(1)
+
+        response = self.buy(2, client=other_client)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_failed_request_releases_the_key(self):
+        self.buy(1, key="first")
+
+        failed = self.buy(1, key="second")
+        self.assertEqual(failed.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.filter(key="second").exists())
+
+    def test_running_request_conflicts(self):
+        IdempotencyKey.claim(self.user.id, "retry-1", "fingerprint")
+
+        response = self.buy(1)
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_key_of_a_dead_request_is_taken_over(self):
+        lease = timedelta(seconds=settings.IDEMPOTENCY_KEY_LEASE_SECONDS)
+        # A worker killed mid-request never stores or releases its key
+        with mock.patch(
+            "django.utils.timezone.now",
+            return_value=timezone.now() - lease,
+        ):
+            IdempotencyKey.claim(self.user.id, "retry-1", "fingerprint")
+
+        response = self.buy(1)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        record = IdempotencyKey.objects.get()
+        self.assertGreater(
+            record.expires_at,
+            timezone.now()
+            + timedelta(hours=settings.IDEMPOTENCY_KEY_HOURS - 1),
+        )
+
+    def test_expired_key_runs_again(self):
+        self.buy(1)
+        IdempotencyKey.objects.update(expires_at=timezone.now())
+
+        response = self.buy(2, key="retry-1")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_expire_command_sweeps_old_keys(self):
+        self.buy(1, key="old")
+        self.buy(2, key="new")
+        IdempotencyKey.objects.filter(key="old").update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        out = StringIO()
+        call_command("expire_idempotency_keys", stdout=out)
+
+        self.assertIn("Deleted 1", out.getvalue())
+        self.assertEqual(
+            list(IdempotencyKey.objects.values_list("key", flat=True)),
+            ["new"],
+        )
@@ -0,0 +1,99 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from rest_framework import serializers, status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from theater.metrics import REGISTRY, Histogram, TimedDataMixin
+from theater.serializers import GenreSerializer
+from theater.tests.base import ApiTestCase, sample_genre
+
+METRICS_URL = reverse("theater:metrics")
+GENRE_URL = reverse("theater:genre-list")
+PLAY_URL = reverse("theater:play-list")
+
+User = get_user_model()
+
+
+def sample(text, line_start):
+    for line in text.splitlines():
+        if line.startswith(line_start):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"No sample starting with {line_start}")
+
+
+class HistogramTest(SimpleTestCase):
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram((1, 5))
+        for value in (0, 1, 3, 7):
+            histogram.observe(value)
+
+        cumulative, total = histogram.snapshot()
+
+        self.assertEqual(cumulative, [(1, 2), (5, 3), ("+Inf", 4)])
+        self.assertEqual(total, 11)
+
+
+class MetricsApiTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        REGISTRY.clear()
+        self.addCleanup(REGISTRY.clear)
+        self.admin = User.objects.create_superuser(
+            "admin", "admin@email.test", "testpass"
+        )
+        sample_genre()
+
+    def test_metrics_require_admin(self):
+        self.assertEqual(
+            APIClient().get(METRICS_URL).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+        self.assertEqual(
+            self.client.get(METRICS_URL).status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
+
+    def test_records_requests_per_view(self):
+        response = self.client.get(GENRE_URL)
+        self.client.get(GENRE_URL)
+        self.client.force_authenticate(user=self.admin)
+
+        metrics = self.client.get(METRICS_URL)
+
+        self.assertEqual(metrics.status_code, status.HTTP_200_OK)
+        self.assertTrue(metrics["Content-Type"].startswith("text/plain"))
+        text = metrics.content.decode()
+        labels = 'view="theater:genre-list",method="GET"'
+        self.assertIn("# TYPE theater_request_db_queries histogram", text)
+        self.assertEqual(
+            sample(text, f"theater_request_db_queries_count{{{labels}}}"), 2
+        )
+        # The second request is served from the catalog cache
+        self.assertEqual(
+            sample(
+                text,
+                f'theater_request_db_queries_bucket{{{labels},le="0"}}',
+            ),
+            1,
+        )
+        serializer_seconds = sample(
+            text, f"theater_request_serializer_seconds_sum{{{labels}}}"
+        )
+        self.assertGreater(serializer_seconds, 0)
+        self.assertEqual(
+            sample(text, f"theater_response_size_bytes_sum{{{labels}}}"),
+            2 * len(response.content),
+        )
+
+    def test_library_serializers_are_left_alone(self):
+        self.client.get(PLAY_URL)
+
+        self.assertEqual(
+            serializers.Serializer.data.fget.__qualname__, "Serializer.data"
+        )
+        self.assertEqual(
+            serializers.ListSerializer.data.fget.__qualname__,
+            "ListSerializer.data",
+        )
+        self.assertNotIsInstance(GenreSerializer(), TimedDataMixin)
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta, timezone
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from theater.models import Performance
+from theater.tests.base import (
+    ApiTestCase,
+    sample_hall,
+    sample_performance,
+    sample_play,
+)
+
+PERFORMANCE_URL = reverse("theater:performance-list")
+
+
+class KeysetPaginationTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        hall = sample_hall()
+        play = sample_play()
+        start = datetime(2025, 2, 12, 12, tzinfo=timezone.utc)
+        # Pairs of performances share a show time to exercise the id tiebreak
+        for index in range(12):
+            sample_performance(
+                play=play,
+                theater_hall=hall,
+                show_time=start + timedelta(days=index // 2),
+            )
+        self.expected_ids = list(
+            Performance.objects.order_by("-show_time", "-id").values_list(
+                "id", flat=True
+            )
+        )
+
+    def test_cursor_walks_every_performance_once(self):
+        seen = []
+        url = PERFORMANCE_URL + "?cursor="
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", res.data)
+            seen.extend(item["id"] for item in res.data["results"])
+            url = res.data["next"]
+
+        self.assertEqual(seen, self.expected_ids)
+
+    def test_previous_link_returns_prior_page(self):
+        first = self.client.get(PERFORMANCE_URL + "?cursor=")
+        second = self.client.get(first.data["next"])
+
+        previous = self.client.get(second.data["previous"])
+
+        self.assertIsNone(first.data["previous"])
+        self.assertEqual(previous.data["results"], first.data["results"])
+
+    def test_cursor_page_skips_count_query(self):
+        first = self.client.get(PERFORMANCE_URL + "?cursor=")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first.data["next"])
+
+        self.assertFalse(
+            any("COUNT(" in query["sql"] for query in queries)
+        )
+        self.assertFalse(
+            any("OFFSET" in query["sql"] for query in queries)
+        )
+
+    def test_cursor_bounds_the_leading_column(self):
+        first = self.client.get(PERFORMANCE_URL + "?cursor=")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first.data["next"])
+
+        page_query = next(
+            query["sql"]
+            for query in queries
+            if 'FROM "theater_performance"' in query["sql"]
+            and "LIMIT" in query["sql"]
+        )
+        where = page_query.split("WHERE", 1)[1]
+        # A plain range on show_time, ANDed ahead of the tiebreak OR
+        self.assertIn('"show_time" <= ', where)
+        self.assertLess(where.index('"show_time" <= '), where.index(" OR "))
+
+    def test_page_number_pagination_kept_without_cursor(self):
+        res = self.client.get(PERFORMANCE_URL)
+
+        self.assertEqual(res.data["count"], 12)
+
+    def test_invalid_cursor(self):
+        res = self.client.get(PERFORMANCE_URL + "?cursor=bogus")
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,92 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+
+from theater.models import Play
+from theater.search import search_plays
+from theater.tests.base import (
+    ApiTestCase,
+    sample_actor,
+    sample_genre,
+    sample_play,
+)
+
+PLAY_URL = reverse("theater:play-list")
+
+
+class PlaySearchTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.genre = sample_genre()
+        self.actor = sample_actor(first_name="Tom", last_name="Cruse")
+        self.play = sample_play()
+        self.play.genres.add(self.genre)
+        self.play.actors.add(self.actor)
+        self.other_play = sample_play(title="Other")
+
+    def search(self, **params):
+        return [play["title"] for play in self.client.get(PLAY_URL, params).json()]
+
+    def test_search_document_kept_in_sync(self):
+        self.play.refresh_from_db()
+        self.assertEqual(self.play.genre_names, "Drama")
+        self.assertEqual(self.play.actor_names, "Tom Cruse")
+
+        self.genre.name = "Comedy"
+        self.genre.save()
+        self.actor.delete()
+
+        self.play.refresh_from_db()
+        self.assertEqual(self.play.genre_names, "Comedy")
+        self.assertEqual(self.play.actor_names, "")
+
+    def test_reverse_m2m_changes_update_search_document(self):
+        self.genre.plays.add(self.other_play)
+        self.genre.plays.clear()
+
+        self.play.refresh_from_db()
+        self.other_play.refresh_from_db()
+        self.assertEqual(self.play.genre_names, "")
+        self.assertEqual(self.other_play.genre_names, "")
+
+    def test_search_by_actor_full_name(self):
+        self.assertEqual(self.search(actors="tom cruse"), ["Test Title"])
+        self.assertEqual(self.search(actors="cruse"), ["Test Title"])
+
+    def test_search_without_join_or_distinct(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.search(title="test", genres="drama", actors="tom")
+
+        play_query = queries.captured_queries[0]["sql"]
+        self.assertNotIn("DISTINCT", play_query)
+        self.assertNotIn("JOIN", play_query)
+
+
+@skipUnless(
+    connection.vendor == "postgresql", "Trigram indexes need PostgreSQL"
+)
+class PlaySearchIndexTest(TestCase):
+    indexes = {
+        "title": "play_title_upper_trgm_idx",
+        "genres": "play_genre_names_upper_trgm_idx",
+        "actors": "play_actor_names_upper_trgm_idx",
+    }
+
+    def test_search_uses_trigram_indexes(self):
+        Play.objects.bulk_create(
+            Play(title=f"Play {index}", description="", duration=60)
+            for index in range(100)
+        )
+        with connection.cursor() as cursor:
+            # The table is too small for the planner to prefer an index
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+        for term, index in self.indexes.items():
+            with self.subTest(term=term):
+                queryset = search_plays(
+                    Play.objects.all(), **{term: "hamlet"}
+                )
+                self.assertIn(index, queryset.explain())
@@ -0,0 +1,116 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import skipIf
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.utils.timezone import localtime
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.reverse import reverse
+
+from theater.models import Reservation, Ticket
+from theater.renderers import MessagePackRenderer, ORJSONRenderer, msgpack
+from theater.tests.base import ApiTestCase, sample_genre, sample_performance
+
+RESERVATION_URL = reverse("theater:reservation-list")
+GENRE_URL = reverse("theater:genre-list")
+
+User = get_user_model()
+
+SAMPLE = {
+    "id": 1,
+    "title": "Cyrano de Bergerac   à l'Odéon",
+    "price": Decimal("12.50"),
+    "created_at": datetime(2025, 2, 12, 12, 30, 15, 123456, timezone.utc),
+    "label": gettext_lazy("Drama"),
+    "taken_places": {1: [1, 2], 3: [5]},
+    "tickets": [{"row": 1, "seat": 2, "ratio": 0.1}, None, True],
+}
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    def test_matches_json_renderer(self):
+        self.assertEqual(
+            ORJSONRenderer().render(SAMPLE), JSONRenderer().render(SAMPLE)
+        )
+
+    def test_indented_output_matches_json_renderer(self):
+        media_type = "application/json; indent=4"
+
+        self.assertEqual(
+            ORJSONRenderer().render(SAMPLE, media_type),
+            JSONRenderer().render(SAMPLE, media_type),
+        )
+
+
+@skipIf(msgpack is None, "msgpack is not installed")
+class MessagePackRendererTest(SimpleTestCase):
+    def test_values_match_json(self):
+        content = MessagePackRenderer().render(SAMPLE)
+
+        self.assertEqual(
+            msgpack.unpackb(content, strict_map_key=False),
+            json.loads(
+                JSONRenderer().render(SAMPLE),
+                object_hook=lambda obj: {
+                    int(key) if key.isdigit() else key: value
+                    for key, value in obj.items()
+                },
+            ),
+        )
+
+
+class ContentNegotiationTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.genre = sample_genre()
+        performance = sample_performance()
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.create(
+            reservation=reservation, performance=performance, row=1, seat=1
+        )
+        self.created_at = reservation.created_at
+
+    def test_json_is_the_default(self):
+        response = self.client.get(RESERVATION_URL, HTTP_ACCEPT="*/*")
+
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+        self.assertEqual(
+            response.json()["results"][0]["created_at"],
+            localtime(self.created_at).strftime("%d %b %Y, %H:%M"),
+        )
+
+    @skipIf(msgpack is None, "msgpack is not installed")
+    def test_accept_msgpack(self):
+        json_response = self.client.get(RESERVATION_URL)
+
+        response = self.client.get(
+            RESERVATION_URL, HTTP_ACCEPT="application/msgpack"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        self.assertEqual(
+            msgpack.unpackb(response.content), json_response.json()
+        )
+
+    @skipIf(msgpack is None, "msgpack is not installed")
+    def test_cached_lists_are_kept_per_format(self):
+        genres = [{"id": self.genre.id, "name": "Drama"}]
+        self.client.get(GENRE_URL)
+
+        response = self.client.get(GENRE_URL, {"format": "msgpack"})
+
+        self.assertEqual(msgpack.unpackb(response.content), genres)
+        self.assertEqual(self.client.get(GENRE_URL).json(), genres)
+
+    def test_unsupported_accept_is_not_acceptable(self):
+        response = self.client.get(
+            RESERVATION_URL, HTTP_ACCEPT="application/xml"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_406_NOT_ACCEPTABLE)
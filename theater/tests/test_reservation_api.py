@@ -0,0 +1,265 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from theater.models import (
+    Performance,
+    Play,
+    Reservation,
+    TheaterHall,
+    Ticket,
+)
+from theater.tests.base import (
+    ApiTestCase,
+    sample_hall,
+    sample_performance,
+    sample_play,
+)
+
+RESERVATION_URL = reverse("theater:reservation-list")
+
+User = get_user_model()
+
+
+class ReservationApiTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.hall = sample_hall()
+        self.play = sample_play()
+        self.performance = sample_performance(
+            play=self.play, theater_hall=self.hall
+        )
+
+    def book(self, seats):
+        payload = {
+            "tickets": [
+                {"performance": self.performance.id, "row": row, "seat": seat}
+                for row, seat in seats
+            ]
+        }
+        return self.client.post(RESERVATION_URL, payload, format="json")
+
+    def test_create_reservation_with_tickets(self):
+        res = self.book([(1, seat) for seat in range(1, 11)])
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["tickets"]), 10)
+        self.assertEqual(res.data["user"], self.user.id)
+        reservation = Reservation.objects.get(id=res.data["id"])
+        self.assertEqual(reservation.tickets.count(), 10)
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_available, 190)
+
+    def test_create_reservation_inserts_tickets_in_bulk(self):
+        with CaptureQueriesContext(connection) as single:
+            self.book([(1, 1)])
+        with CaptureQueriesContext(connection) as group:
+            self.book([(2, seat) for seat in range(1, 11)])
+        inserts = [
+            query["sql"]
+            for query in group.captured_queries
+            if query["sql"].startswith('INSERT INTO "theater_ticket"')
+        ]
+
+        self.assertEqual(len(group), len(single))
+        self.assertEqual(len(inserts), 1)
+
+    def test_taken_seat_reported_per_ticket(self):
+        self.book([(2, 5)])
+
+        res = self.book([(2, 4), (2, 5)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["tickets"][0], {})
+        self.assertIn("seat", res.data["tickets"][1])
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_checkout_spans_performances(self):
+        other = Performance.objects.create(
+            play=self.play,
+            theater_hall=self.hall,
+            show_time="2025-02-13T12:00:00Z",
+        )
+        self.book([(1, 1)])
+        payload = {
+            "tickets": [
+                {"performance": performance.id, "row": 5, "seat": seat}
+                for performance in (other, self.performance)
+                for seat in (1, 2)
+            ]
+        }
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        statements = [query["sql"].split()[0] for query in queries]
+        # One lock, one insert and one seat map update for every performance
+        self.assertEqual(statements.count("INSERT"), 2)
+        self.assertEqual(statements.count("UPDATE"), 1)
+        self.assertEqual(
+            [
+                performance.tickets_available
+                for performance in Performance.objects.order_by("id")
+            ],
+            [197, 198],
+        )
+
+    def test_duplicate_seat_in_request_rejected(self):
+        res = self.book([(3, 3), (3, 3)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_seat_outside_hall_rejected(self):
+        res = self.book([(11, 1)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_performance_of_wrong_type_rejected(self):
+        ticket = {"performance": {"id": self.performance.id}, "row": 1}
+
+        res = self.client.post(
+            RESERVATION_URL,
+            {"tickets": [{**ticket, "seat": 1}]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("performance", res.data["tickets"][0])
+
+    def test_constraint_conflict_reported_per_ticket(self):
+        self.book([(4, 4)])
+        Performance.objects.filter(id=self.performance.id).update(
+            seat_map=b""
+        )
+
+        res = self.book([(4, 3), (4, 4)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["tickets"][0], {})
+        self.assertIn("seat", res.data["tickets"][1])
+        self.assertEqual(Ticket.objects.count(), 1)
+
+
+class ReservationListQueryTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        play = sample_play()
+        self.performances = [
+            sample_performance(
+                play=play, theater_hall=sample_hall(name=f"Hall {index}")
+            )
+            for index in range(3)
+        ]
+
+    def create_reservation(self, row, seats_per_performance):
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.book_seats(
+            [
+                Ticket(
+                    performance=performance,
+                    reservation=reservation,
+                    row=row,
+                    seat=seat,
+                )
+                for performance in self.performances
+                for seat in range(1, seats_per_performance + 1)
+            ]
+        )
+        return reservation
+
+    def test_reservation_list_query_count_is_fixed(self):
+        for row in range(1, 6):
+            self.create_reservation(row, 1)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(RESERVATION_URL)
+
+        for row in range(6, 11):
+            self.create_reservation(row, 4)
+        with CaptureQueriesContext(connection) as large:
+            res = self.client.get(RESERVATION_URL)
+
+        self.assertEqual(len(res.data["results"]), 5)
+        self.assertEqual(len(res.data["results"][0]["tickets"]), 12)
+        self.assertEqual(len(large), len(small))
+        self.assertLessEqual(len(large), 3)
+
+    def test_reservation_list_includes_tickets_available(self):
+        self.create_reservation(1, 2)
+
+        res = self.client.get(RESERVATION_URL)
+
+        performance = res.data["results"][0]["tickets"][0]["performance"]
+        self.assertEqual(performance["tickets_available"], 198)
+
+
+@skipUnless(
+    connection.vendor == "postgresql",
+    "SQLite locks the whole database instead of performance rows",
+)
+class ConcurrentCheckoutTest(TransactionTestCase):
+    def test_overlapping_checkouts_do_not_deadlock(self):
+        hall = TheaterHall.objects.create(
+            name="Main Hall", rows=20, seats_in_row=20
+        )
+        play = Play.objects.create(
+            title="Test Title", description="Test Description", duration=60
+        )
+        performances = [
+            Performance.objects.create(
+                play=play,
+                theater_hall=hall,
+                show_time="2025-02-12T12:00:00Z",
+            )
+            for _ in range(4)
+        ]
+        users = [
+            User.objects.create_user(
+                username=f"user{index}",
+                email=f"user{index}@email.test",
+                password="testpass",
+            )
+            for index in range(8)
+        ]
+
+        def checkout(index):
+            # Every worker lists the performances in its own order
+            ordered = random.Random(index).sample(performances, 4)
+            client = APIClient()
+            client.force_authenticate(user=users[index % 8])
+            try:
+                return client.post(
+                    RESERVATION_URL,
+                    {
+                        "tickets": [
+                            {
+                                "performance": performance.id,
+                                "row": index // 20 + 1,
+                                "seat": index % 20 + 1,
+                            }
+                            for performance in ordered
+                        ]
+                    },
+                    format="json",
+                ).status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            codes = list(executor.map(checkout, range(80)))
+
+        self.assertEqual(codes, [status.HTTP_201_CREATED] * 80)
+        self.assertEqual(Ticket.objects.count(), 320)
+        for performance in Performance.objects.all():
+            self.assertEqual(performance.tickets_available, 320)
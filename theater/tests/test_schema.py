@@ -0,0 +1,76 @@
+import gzip
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from theater.schema import get_schema
+
+SCHEMA_URL = reverse("schema")
+
+
+class BuildSchemaCommandTest(TestCase):
+    def test_committed_schema_is_up_to_date(self):
+        # CI runs this to catch API changes without a rebuilt openapi.yaml
+        call_command("build_schema", "--check", stdout=StringIO())
+
+    def test_check_fails_on_a_stale_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "openapi.yaml"
+            path.write_text("openapi: 3.0.3\n")
+            with override_settings(API_SCHEMA_FILE=path):
+                with self.assertRaisesMessage(CommandError, "out of date"):
+                    call_command("build_schema", "--check", stdout=StringIO())
+
+                call_command("build_schema", stdout=StringIO())
+                call_command("build_schema", "--check", stdout=StringIO())
+
+
+class SchemaViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        get_schema.cache_clear()
+        self.addCleanup(get_schema.cache_clear)
+        self.content = Path(settings.API_SCHEMA_FILE).read_bytes()
+
+    def test_serves_the_precomputed_file(self):
+        response = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, self.content)
+        self.assertTrue(
+            response["Content-Type"].startswith("application/vnd.oai.openapi")
+        )
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_serves_gzip_when_accepted(self):
+        response = self.client.get(
+            SCHEMA_URL, HTTP_ACCEPT_ENCODING="gzip, deflate"
+        )
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), self.content)
+
+    def test_revalidates_with_etag(self):
+        etag = self.client.get(SCHEMA_URL)["ETag"]
+
+        response = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_missing_file_without_docs_is_not_found(self):
+        with override_settings(
+            API_SCHEMA_FILE=Path(settings.BASE_DIR) / "missing.yaml",
+            API_DOCS=False,
+        ):
+            response = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,149 @@
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from theater.models import Performance, SeatHold, Ticket
+from theater.tests.base import ApiTestCase, sample_performance, sample_user
+
+SEAT_HOLD_URL = reverse("theater:seathold-list")
+TICKET_URL = reverse("theater:ticket-list")
+
+
+def checkout_url(hold_id):
+    return reverse("theater:seathold-checkout", args=[hold_id])
+
+
+def seat_hold_detail_url(hold_id):
+    return reverse("theater:seathold-detail", args=[hold_id])
+
+
+class SeatHoldApiTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other_user = sample_user(
+            username="otheruser", email="other@email.test"
+        )
+        self.performance = sample_performance()
+
+    def hold(self, seats, **extra):
+        payload = {
+            "performance": self.performance.id,
+            "seats": [{"row": row, "seat": seat} for row, seat in seats],
+            **extra,
+        }
+        return self.client.post(SEAT_HOLD_URL, payload, format="json")
+
+    def test_hold_seats(self):
+        res = self.hold([(1, 1), (1, 2)], minutes=5)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.performance.refresh_from_db()
+        held = self.performance.get_held_seats()
+        self.assertEqual(held.taken_places(), {1: [1, 2]})
+        self.assertEqual(
+            self.performance.holds_expire_at,
+            SeatHold.objects.get().expires_at,
+        )
+
+    def test_held_seat_cannot_be_held_or_bought_by_others(self):
+        self.hold([(1, 1)])
+        self.client.force_authenticate(user=self.other_user)
+
+        hold_res = self.hold([(1, 2), (1, 1)])
+        ticket_res = self.client.post(
+            TICKET_URL,
+            {"performance": self.performance.id, "row": 1, "seat": 1},
+        )
+
+        self.assertEqual(hold_res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(hold_res.data["seats"][0], {})
+        self.assertIn("seat", hold_res.data["seats"][1])
+        self.assertEqual(ticket_res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("seat", ticket_res.data)
+        self.assertEqual(SeatHold.objects.count(), 1)
+
+    def test_checkout_turns_hold_into_tickets(self):
+        hold_id = self.hold([(2, 3), (2, 4)]).data["id"]
+
+        res = self.client.post(checkout_url(hold_id))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["tickets"]), 2)
+        self.assertFalse(SeatHold.objects.exists())
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.seats.taken_places(), {2: [3, 4]})
+        self.assertEqual(self.performance.get_held_seats().taken_count, 0)
+
+    def test_release_hold(self):
+        hold_id = self.hold([(2, 3)]).data["id"]
+
+        res = self.client.delete(seat_hold_detail_url(hold_id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.get_held_seats().taken_count, 0)
+        self.assertIsNone(self.performance.holds_expire_at)
+
+    def test_expired_hold_frees_seats(self):
+        hold_id = self.hold([(3, 3)]).data["id"]
+        past = timezone.now() - timedelta(minutes=1)
+        SeatHold.objects.filter(id=hold_id).update(expires_at=past)
+        Performance.objects.filter(id=self.performance.id).update(
+            holds_expire_at=past
+        )
+        self.client.force_authenticate(user=self.other_user)
+
+        res = self.hold([(3, 3)])
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.count(), 1)
+
+    def test_expired_hold_cannot_be_checked_out(self):
+        hold_id = self.hold([(3, 3)]).data["id"]
+        SeatHold.objects.filter(id=hold_id).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        res = self.client.post(checkout_url(hold_id))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_expire_command_releases_holds_in_bulk(self):
+        self.hold([(4, 1)])
+        self.hold([(4, 2)])
+        SeatHold.objects.update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        call_command("expire_seat_holds", stdout=open("/dev/null", "w"))
+
+        self.assertFalse(SeatHold.objects.exists())
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.get_held_seats().taken_count, 0)
+        self.assertIsNone(self.performance.holds_expire_at)
+
+    def test_deleting_the_holder_frees_seats(self):
+        self.hold([(5, 5)])
+        self.client.force_authenticate(user=self.other_user)
+
+        self.user.delete()
+        res = self.client.post(
+            TICKET_URL,
+            {"performance": self.performance.id, "row": 5, "seat": 5},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_queryset_delete_frees_seats(self):
+        self.hold([(6, 1), (6, 2)])
+        self.hold([(6, 3)])
+
+        SeatHold.objects.all().delete()
+
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.get_held_seats().taken_count, 0)
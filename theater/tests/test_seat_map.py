@@ -0,0 +1,152 @@
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from theater.models import Performance, Reservation, TheaterHall, Ticket
+from theater.seat_map import SeatMap
+from theater.tests.base import (
+    ApiTestCase,
+    sample_hall,
+    sample_performance,
+    sample_play,
+)
+
+
+def performance_detail_url(performance_id):
+    return reverse("theater:performance-detail", args=[performance_id])
+
+
+class SeatMapTest(TestCase):
+    def test_occupy_and_release(self):
+        seats = SeatMap(rows=3, seats_in_row=5)
+
+        seats.occupy(1, 1)
+        seats.occupy(3, 5)
+
+        self.assertEqual(len(bytes(seats)), 2)
+        self.assertTrue(seats.is_taken(3, 5))
+        self.assertEqual(seats.taken_count, 2)
+        self.assertEqual(seats.available_count, 13)
+        self.assertEqual(seats.taken_places(), {1: [1], 3: [5]})
+
+        seats.release(1, 1)
+
+        self.assertFalse(seats.is_taken(1, 1))
+        self.assertEqual(seats.taken_places(), {3: [5]})
+
+    def test_seat_outside_hall(self):
+        seats = SeatMap(rows=2, seats_in_row=2)
+
+        with self.assertRaises(IndexError):
+            seats.occupy(3, 1)
+
+
+class PerformanceSeatMapTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.hall = sample_hall()
+        self.play = sample_play()
+        self.performance = sample_performance(
+            play=self.play, theater_hall=self.hall
+        )
+        self.reservation = Reservation.objects.create(user=self.user)
+
+    def create_ticket(self, row, seat):
+        return Ticket.objects.create(
+            performance=self.performance,
+            reservation=self.reservation,
+            row=row,
+            seat=seat,
+        )
+
+    def test_ticket_create_and_delete_update_seat_map(self):
+        ticket = self.create_ticket(2, 7)
+        self.create_ticket(2, 3)
+
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.seats.taken_places(), {2: [3, 7]})
+        self.assertEqual(self.performance.tickets_available, 198)
+
+        ticket.delete()
+
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.seats.taken_places(), {2: [3]})
+
+    def test_hall_resize_rebuilds_seat_map(self):
+        self.create_ticket(2, 7)
+
+        self.hall.seats_in_row = 30
+        self.hall.save()
+
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.seats.taken_places(), {2: [7]})
+        self.assertEqual(self.performance.tickets_available, 299)
+
+    def test_moving_ticket_frees_seat_in_old_performance(self):
+        ticket = self.create_ticket(2, 3)
+        other = sample_performance(play=self.play, theater_hall=self.hall)
+
+        ticket.performance = other
+        ticket.save()
+
+        self.performance.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.performance.seats.taken_places(), {})
+        self.assertEqual(other.seats.taken_places(), {2: [3]})
+
+    def test_hall_resize_locks_performances_in_id_order(self):
+        other = sample_performance(
+            play=self.play,
+            theater_hall=self.hall,
+            show_time="2025-03-12T12:00:00Z",
+        )
+        self.hall.seats_in_row = 30
+
+        with mock.patch.object(
+            Performance, "lock_many", wraps=Performance.lock_many
+        ) as lock_many:
+            self.hall.save()
+
+        lock_many.assert_called_once_with([self.performance.id, other.id])
+
+    def test_shrinking_hall_skips_seats_outside_it(self):
+        self.create_ticket(2, 3)
+        self.create_ticket(9, 18)
+        self.hall.rows = 5
+        self.hall.seats_in_row = 10
+
+        with self.assertRaises(ValidationError):
+            self.hall.full_clean()
+        self.hall.save()
+
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.seats.taken_places(), {2: [3]})
+
+    def test_moving_to_another_hall_rebuilds_seat_map(self):
+        self.create_ticket(2, 3)
+        hall = TheaterHall.objects.create(
+            name="Small Hall", rows=3, seats_in_row=4
+        )
+
+        self.performance.theater_hall = hall
+        self.performance.save()
+
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.seats.taken_places(), {2: [3]})
+        self.assertEqual(self.performance.tickets_available, 11)
+
+    def test_performance_detail_reads_seat_map(self):
+        self.create_ticket(1, 1)
+        self.create_ticket(4, 2)
+
+        with self.assertNumQueries(3):
+            res = self.client.get(
+                performance_detail_url(self.performance.id)
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["taken_places"], {1: [1], 4: [2]})
+        self.assertEqual(res.data["tickets_available"], 198)
@@ -0,0 +1,91 @@
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.db.models import Count
+from django.test import TestCase
+
+from theater.models import (
+    Performance,
+    Play,
+    Reservation,
+    TheaterHall,
+    Ticket,
+)
+from theater.seat_map import SeatMap
+
+User = get_user_model()
+
+SEED_OPTIONS = {"users": 50, "days": 21, "chunk": 7, "start": date(2025, 3, 3)}
+
+
+def seed_load(**options):
+    call_command("seed_load", stdout=StringIO(), **{**SEED_OPTIONS, **options})
+
+
+def seeded_season(**options):
+    """Seed inside a savepoint and return the tickets it produced."""
+    with transaction.atomic():
+        seed_load(**options)
+        season = sorted(
+            Ticket.objects.values_list(
+                "performance__show_time",
+                "performance__theater_hall__name",
+                "performance__play__title",
+                "reservation__user__username",
+                "reservation__created_at",
+                "row",
+                "seat",
+            )
+        )
+        transaction.set_rollback(True)
+    return season
+
+
+class SeedLoadCommandTest(TestCase):
+    def setUp(self):
+        TheaterHall.objects.create(name="Main Hall", rows=10, seats_in_row=12)
+        TheaterHall.objects.create(name="Studio", rows=4, seats_in_row=8)
+        for title in ("Hamlet", "Macbeth", "The Tempest"):
+            Play.objects.create(
+                title=title, description="Description", duration=90
+            )
+
+    def test_requires_halls_and_plays(self):
+        TheaterHall.objects.all().delete()
+
+        with self.assertRaises(CommandError):
+            seed_load()
+
+    def test_loads_a_consistent_season(self):
+        seed_load()
+
+        self.assertEqual(User.objects.count(), SEED_OPTIONS["users"])
+        performances = Performance.objects.select_related("theater_hall")
+        self.assertTrue(performances.exists())
+        self.assertFalse(
+            performances.filter(show_time__week_day=2).exists(),
+            "Halls are dark on Mondays",
+        )
+        self.assertGreater(Ticket.objects.count(), 0)
+        self.assertFalse(
+            Reservation.objects.annotate(count=Count("tickets"))
+            .filter(count=0)
+            .exists()
+        )
+        for performance in performances:
+            seats = SeatMap.for_hall(performance.theater_hall)
+            for row, seat in performance.tickets.values_list("row", "seat"):
+                seats.occupy(row, seat)
+            self.assertEqual(bytes(seats), bytes(performance.seat_map))
+
+    def test_same_seed_reproduces_the_season(self):
+        first = seeded_season(seed=7)
+
+        self.assertTrue(first)
+        self.assertEqual(seeded_season(seed=7, chunk=3), first)
+
+    def test_different_seed_changes_the_season(self):
+        self.assertNotEqual(seeded_season(seed=1), seeded_season(seed=2))
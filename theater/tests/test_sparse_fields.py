@@ -0,0 +1,172 @@
+from datetime import datetime, timedelta, timezone
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from theater.fieldsets import QueryPlan
+from theater.models import Reservation, Ticket
+from theater.serializers import PerformanceListSerializer
+from theater.tests.base import (
+    ApiTestCase,
+    sample_actor,
+    sample_genre,
+    sample_hall,
+    sample_performance,
+    sample_play,
+)
+
+PERFORMANCE_URL = reverse("theater:performance-list")
+PLAY_URL = reverse("theater:play-list")
+TICKET_URL = reverse("theater:ticket-list")
+RESERVATION_URL = reverse("theater:reservation-list")
+
+
+def performance_detail_url(performance_id):
+    return reverse("theater:performance-detail", args=[performance_id])
+
+
+class QueryPlanTest(TestCase):
+    def test_plans_joins_and_prefetches_from_fields(self):
+        plan = QueryPlan.for_serializer(
+            PerformanceListSerializer(expand=["play.actors"])
+        )
+
+        self.assertEqual(plan.select, {"play", "theater_hall"})
+        self.assertEqual(set(plan.prefetch), {"play__actors", "play__genres"})
+
+    def test_sparse_fields_need_no_relations(self):
+        plan = QueryPlan.for_serializer(
+            PerformanceListSerializer(fields=["id", "show_time"])
+        )
+
+        self.assertEqual(plan.select, set())
+        self.assertEqual(plan.prefetch, {})
+
+    def test_property_fields_load_their_relations(self):
+        plan = QueryPlan.for_serializer(
+            PerformanceListSerializer(fields=["tickets_available"])
+        )
+
+        self.assertEqual(plan.select, {"theater_hall"})
+
+
+class SparseFieldsApiTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        hall = sample_hall()
+        self.play = sample_play(
+            title="Hamlet", description="Prince of Denmark", duration=180
+        )
+        self.play.actors.set(
+            [
+                sample_actor(first_name="Zoe", last_name="Adams"),
+                sample_actor(first_name="Ann", last_name="Young"),
+            ]
+        )
+        self.play.genres.set([sample_genre()])
+        start = datetime(2025, 2, 12, 12, tzinfo=timezone.utc)
+        self.performances = [
+            sample_performance(
+                play=self.play,
+                theater_hall=hall,
+                show_time=start + timedelta(days=index),
+            )
+            for index in range(3)
+        ]
+        reservation = Reservation.objects.create(user=self.user)
+        for index, performance in enumerate(self.performances):
+            Ticket.objects.create(
+                reservation=reservation,
+                performance=performance,
+                row=1,
+                seat=index + 1,
+            )
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data, [query["sql"] for query in queries]
+
+    def test_fields_drop_unneeded_joins(self):
+        data, queries = self.get(PERFORMANCE_URL, {"fields": "id,show_time"})
+
+        self.assertEqual(
+            [set(item) for item in data["results"]], [{"id", "show_time"}] * 3
+        )
+        self.assertFalse(any("JOIN" in sql for sql in queries))
+
+    def test_expand_nested_relations(self):
+        data, queries = self.get(
+            PERFORMANCE_URL, {"expand": "play.actors", "fields": "id,play"}
+        )
+
+        play = data["results"][0]["play"]
+        self.assertEqual(set(data["results"][0]), {"id", "play"})
+        self.assertEqual(
+            [actor["full_name"] for actor in play["actors"]],
+            ["Zoe Adams", "Ann Young"],
+        )
+        self.assertEqual(play["genres"], ["Drama"])
+        # Count, page with the play joined, actors and genres
+        self.assertEqual(len(queries), 4)
+
+    def test_nested_fields(self):
+        data, _ = self.get(
+            TICKET_URL, {"fields": "id,performance.show_time"}
+        )
+
+        # Newest tickets come first, so the first show is on the last row
+        self.assertEqual(
+            data["results"][-1],
+            {
+                "id": data["results"][-1]["id"],
+                "performance": {"show_time": "2025-02-12T14:00:00+02:00"},
+            },
+        )
+
+    def test_reservations_expand_through_tickets(self):
+        data, queries = self.get(
+            RESERVATION_URL,
+            {"expand": "tickets.performance.play", "fields": "id,tickets"},
+        )
+
+        tickets = data["results"][0]["tickets"]
+        self.assertEqual(len(tickets), 3)
+        self.assertEqual(tickets[0]["performance"]["play"]["title"], "Hamlet")
+        # Count, page, tickets with their performance and play, play actors
+        # and genres
+        self.assertEqual(len(queries), 5)
+
+    def test_retrieve_with_fields(self):
+        data, _ = self.get(
+            performance_detail_url(self.performances[0].id),
+            {"fields": "id,tickets_available"},
+        )
+
+        self.assertEqual(
+            data, {"id": self.performances[0].id, "tickets_available": 199}
+        )
+
+    def test_cached_play_list_varies_by_fields(self):
+        full, _ = self.get(PLAY_URL, {})
+        sparse, queries = self.get(PLAY_URL, {"fields": "id,title"})
+
+        self.assertIn("actors", full[0])
+        self.assertEqual(sparse, [{"id": self.play.id, "title": "Hamlet"}])
+        self.assertFalse(any("actor" in sql for sql in queries))
+
+    def test_unknown_fields_are_rejected(self):
+        for params in (
+            {"fields": "id,price"},
+            {"fields": "play.title"},
+            {"expand": "show_time"},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(PERFORMANCE_URL, params)
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
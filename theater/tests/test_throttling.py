@@ -0,0 +1,131 @@
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+
+from theater.tests.base import sample_user
+from theater.throttling import (
+    CacheThrottleStore,
+    DatabaseThrottleStore,
+    SQLiteThrottleStore,
+    get_throttle_store,
+)
+
+User = get_user_model()
+
+MINUTE = 60
+
+
+class SlidingWindowMixin:
+    def make_store(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.store = self.make_store()
+        self.store.clear()
+        self.addCleanup(self.store.clear)
+
+    def test_rejects_hits_over_the_limit(self):
+        hits = [self.store.hit("bucket", 3, MINUTE, 600 + i) for i in range(4)]
+
+        self.assertEqual(
+            [allowed for allowed, _ in hits], [True, True, True, False]
+        )
+        self.assertEqual(hits[-1][1], MINUTE - 3)
+
+    def test_rejected_hits_are_not_counted(self):
+        for second in range(10):
+            self.store.hit("bucket", 2, MINUTE, 600 + second)
+
+        # Half of the previous window still counts: 2 * 0.5 + 1 <= 2
+        self.assertTrue(self.store.hit("bucket", 2, MINUTE, 690)[0])
+
+    def test_previous_window_slides_out(self):
+        for second in range(4):
+            self.store.hit("bucket", 4, MINUTE, 600 + second)
+
+        allowed, wait = self.store.hit("bucket", 4, MINUTE, 660 + 6)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, MINUTE / 4 - 6)
+        self.assertTrue(self.store.hit("bucket", 4, MINUTE, 660 + 15)[0])
+
+    def test_buckets_are_independent(self):
+        self.store.hit("one", 1, MINUTE, 600)
+
+        self.assertTrue(self.store.hit("two", 1, MINUTE, 600)[0])
+        self.assertFalse(self.store.hit("one", 1, MINUTE, 601)[0])
+
+
+class CacheThrottleStoreTest(SlidingWindowMixin, SimpleTestCase):
+    def make_store(self):
+        return CacheThrottleStore("default")
+
+
+class DatabaseThrottleStoreTest(SlidingWindowMixin, TestCase):
+    def make_store(self):
+        return DatabaseThrottleStore("default")
+
+
+class SQLiteThrottleStoreTest(SlidingWindowMixin, SimpleTestCase):
+    def make_store(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.location = Path(directory.name) / "throttle.sqlite3"
+        return SQLiteThrottleStore(self.location)
+
+    def test_workers_share_one_atomic_counter(self):
+        def worker(_):
+            # A store per thread stands in for a worker process
+            store = SQLiteThrottleStore(self.location)
+            return sum(
+                store.hit("bucket", 100, MINUTE, 600)[0] for _ in range(50)
+            )
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            allowed = sum(executor.map(worker, range(8)))
+
+        self.assertEqual(allowed, 100)
+
+
+@mock.patch.object(
+    SimpleRateThrottle, "THROTTLE_RATES", {"anon": "2/min", "user": "3/min"}
+)
+class SharedThrottleApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.assertIsInstance(get_throttle_store(), CacheThrottleStore)
+        self.client = APIClient()
+
+    def test_anon_scope(self):
+        url = reverse("user:create")
+        responses = [self.client.post(url, {}) for _ in range(3)]
+
+        self.assertEqual(
+            [response.status_code for response in responses],
+            [
+                status.HTTP_400_BAD_REQUEST,
+                status.HTTP_400_BAD_REQUEST,
+                status.HTTP_429_TOO_MANY_REQUESTS,
+            ],
+        )
+        self.assertIn("Retry-After", responses[-1])
+
+    def test_user_scope(self):
+        user = sample_user()
+        self.client.force_authenticate(user=user)
+        url = reverse("theater:genre-list")
+        responses = [self.client.get(url) for _ in range(4)]
+
+        self.assertEqual(
+            [response.status_code for response in responses],
+            [status.HTTP_200_OK] * 3 + [status.HTTP_429_TOO_MANY_REQUESTS],
+        )
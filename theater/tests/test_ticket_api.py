@@ -0,0 +1,197 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from theater.models import Reservation, Ticket
+from theater.tests.base import (
+    ApiTestCase,
+    sample_hall,
+    sample_performance,
+    sample_play,
+    sample_user,
+)
+
+TICKET_URL = reverse("theater:ticket-list")
+CHECKOUT_URL = reverse("theater:reservation-checkout")
+
+User = get_user_model()
+
+
+class TicketListApiTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other_user = sample_user(
+            username="otheruser", email="other@email.test"
+        )
+        hall = sample_hall()
+        play = sample_play()
+        self.past = sample_performance(
+            play=play,
+            theater_hall=hall,
+            show_time=timezone.now() - timedelta(days=1),
+        )
+        self.upcoming = sample_performance(
+            play=play,
+            theater_hall=hall,
+            show_time=timezone.now() + timedelta(days=1),
+        )
+        reservation = Reservation.objects.create(user=self.user)
+        other_reservation = Reservation.objects.create(user=self.other_user)
+        self.past_ticket = Ticket.objects.create(
+            performance=self.past, reservation=reservation, row=1, seat=1
+        )
+        self.upcoming_ticket = Ticket.objects.create(
+            performance=self.upcoming, reservation=reservation, row=1, seat=2
+        )
+        Ticket.objects.create(
+            performance=self.upcoming,
+            reservation=other_reservation,
+            row=1,
+            seat=3,
+        )
+
+    def result_ids(self, res):
+        return [ticket["id"] for ticket in res.data["results"]]
+
+    def test_ticket_list_scoped_to_user(self):
+        with self.assertNumQueries(2):
+            res = self.client.get(TICKET_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(self.result_ids(res)),
+            [self.past_ticket.id, self.upcoming_ticket.id],
+        )
+        performances = {
+            ticket["id"]: ticket["performance"] for ticket in res.data["results"]
+        }
+        self.assertEqual(
+            performances[self.past_ticket.id]["tickets_available"], 199
+        )
+
+    def test_filter_upcoming_tickets(self):
+        res = self.client.get(TICKET_URL, {"show_time": "upcoming"})
+
+        self.assertEqual(self.result_ids(res), [self.upcoming_ticket.id])
+
+    def test_cursor_pages_newest_reservation_first(self):
+        newer = Reservation.objects.create(user=self.user)
+        ticket = Ticket.objects.create(
+            performance=self.upcoming, reservation=newer, row=2, seat=1
+        )
+
+        res = self.client.get(TICKET_URL, {"cursor": ""})
+
+        self.assertEqual(
+            self.result_ids(res),
+            [ticket.id, self.upcoming_ticket.id, self.past_ticket.id],
+        )
+
+    def test_filter_past_tickets(self):
+        res = self.client.get(TICKET_URL, {"show_time": "past"})
+
+        self.assertEqual(self.result_ids(res), [self.past_ticket.id])
+
+
+class TicketCreateApiTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.performance = sample_performance(
+            show_time=timezone.now() + timedelta(days=1)
+        )
+
+    def buy(self, seat):
+        return self.client.post(
+            TICKET_URL,
+            {"performance": self.performance.id, "row": 1, "seat": seat},
+        )
+
+    def test_tickets_are_added_to_one_open_reservation(self):
+        # Reservations made at checkout stay apart from the cart
+        Reservation.objects.create(user=self.user)
+        Reservation.objects.create(user=self.user)
+
+        responses = [self.buy(seat) for seat in (1, 2)]
+
+        self.assertEqual(
+            [response.status_code for response in responses],
+            [status.HTTP_201_CREATED] * 2,
+        )
+        cart = Reservation.objects.get(user=self.user, is_open=True)
+        self.assertEqual(
+            {response.data["reservation"] for response in responses},
+            {cart.id},
+        )
+        self.assertEqual(self.user.reservations.count(), 3)
+
+    def test_checkout_closes_the_cart(self):
+        first = self.buy(1).data["reservation"]
+
+        response = self.client.post(CHECKOUT_URL)
+        second = self.buy(2).data["reservation"]
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["id"], first)
+        self.assertEqual(len(response.data["tickets"]), 1)
+        self.assertFalse(Reservation.objects.get(id=first).is_open)
+        self.assertNotEqual(second, first)
+        self.assertTrue(Reservation.objects.get(id=second).is_open)
+
+    def test_checkout_without_a_cart(self):
+        response = self.client.post(CHECKOUT_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_performance_of_wrong_type_rejected(self):
+        response = self.client.post(
+            TICKET_URL,
+            {"performance": [self.performance.id], "row": 1, "seat": 1},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("performance", response.data)
+
+    def test_carts_are_per_user(self):
+        other_user = User.objects.create_user(
+            username="otheruser", email="other@email.test", password="testpass"
+        )
+
+        cart = Reservation.open_for(self.user.id)
+        other_cart = Reservation.open_for(other_user.id)
+
+        self.assertNotEqual(cart.id, other_cart.id)
+        self.assertEqual(Reservation.open_for(self.user.id).id, cart.id)
+        self.assertEqual(cart.user_id, self.user.id)
+        self.assertTrue(cart.is_open)
+        self.assertIsNotNone(cart.created_at)
+
+
+@skipUnless(
+    connection.vendor == "postgresql",
+    "SQLite test databases lock the whole table between threads",
+)
+class OpenReservationConcurrencyTest(TransactionTestCase):
+    def test_parallel_claims_share_one_reservation(self):
+        user = User.objects.create_user(
+            username="testuser", email="test@email.test", password="testpass"
+        )
+
+        def claim(_):
+            try:
+                return Reservation.open_for(user.id).id
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            ids = set(executor.map(claim, range(32)))
+
+        self.assertEqual(len(ids), 1)
+        self.assertEqual(Reservation.objects.filter(user=user).count(), 1)
@@ -0,0 +1,144 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from theater.fieldsets import QueryPlan
+from theater.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    Reservation,
+    TheaterHall,
+    Ticket,
+)
+from theater.serializers import (
+    PerformanceListSerializer,
+    PerformanceListValuesSerializer,
+    PlayListSerializer,
+    PlayListValuesSerializer,
+    TicketListSerializer,
+    TicketListValuesSerializer,
+)
+
+User = get_user_model()
+
+
+class ValuesSerializerParityTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        small = TheaterHall.objects.create(
+            name="Studio", rows=3, seats_in_row=5
+        )
+        large = TheaterHall.objects.create(
+            name="Main Hall", rows=12, seats_in_row=20
+        )
+        drama, comedy, mystery = (
+            Genre.objects.create(name=name)
+            for name in ("Drama", "Comedy", "Mystery")
+        )
+        actors = [
+            Actor.objects.create(first_name=first, last_name=last)
+            for first, last in (
+                ("Zoe", "Adams"),
+                ("Ann", "Young"),
+                ("Ann", "Young"),
+                ("Bob", "Marley"),
+            )
+        ]
+        plays = [
+            Play.objects.create(
+                title="Hamlet",
+                description="Prince of Denmark",
+                duration=180,
+                image="uploads/plays/hamlet.jpg",
+            ),
+            Play.objects.create(
+                title="Cats", description="Musical", duration=120
+            ),
+            Play.objects.create(
+                title="Empty", description="No cast yet", duration=60
+            ),
+        ]
+        plays[0].genres.set([mystery, drama])
+        plays[0].actors.set([actors[3], actors[0], actors[2]])
+        plays[1].genres.set([comedy])
+        plays[1].actors.set([actors[1], actors[2]])
+
+        now = timezone.now().replace(microsecond=0)
+        performances = [
+            Performance.objects.create(
+                play=play,
+                theater_hall=hall,
+                show_time=now + timedelta(days=index),
+            )
+            for index, (play, hall) in enumerate(
+                [(plays[0], small), (plays[1], large), (plays[0], large)]
+            )
+        ]
+        user = User.objects.create_user(
+            username="buyer", email="buyer@email.test", password="testpass"
+        )
+        reservation = Reservation.objects.create(user=user)
+        for performance, row, seat in (
+            (performances[0], 1, 1),
+            (performances[0], 3, 5),
+            (performances[1], 12, 20),
+            (performances[2], 2, 7),
+        ):
+            Ticket.objects.create(
+                reservation=reservation,
+                performance=performance,
+                row=row,
+                seat=seat,
+            )
+
+    def setUp(self):
+        self.context = {"request": APIRequestFactory().get("/")}
+
+    def assertSameOutput(self, serializer, values_serializer, queryset):
+        # Loaded the way the list views plan it
+        queryset = QueryPlan.for_serializer(serializer()).apply(queryset)
+        expected = serializer(queryset, many=True, context=self.context).data
+        rows = queryset.prefetch_related(None).values(
+            *values_serializer.get_values()
+        )
+
+        actual = values_serializer(rows, many=True, context=self.context).data
+
+        self.assertEqual(actual, expected)
+        # Key order shows up in the rendered response as well
+        self.assertEqual(
+            JSONRenderer().render(actual), JSONRenderer().render(expected)
+        )
+
+    def test_performance_list(self):
+        self.assertSameOutput(
+            PerformanceListSerializer,
+            PerformanceListValuesSerializer,
+            Performance.objects.all(),
+        )
+
+    def test_play_list(self):
+        self.assertSameOutput(
+            PlayListSerializer, PlayListValuesSerializer, Play.objects.all()
+        )
+
+    def test_ticket_list(self):
+        self.assertSameOutput(
+            TicketListSerializer,
+            TicketListValuesSerializer,
+            Ticket.objects.all(),
+        )
+
+    def test_play_names_take_one_query_each(self):
+        rows = Play.objects.values(*PlayListValuesSerializer.get_values())
+
+        with self.assertNumQueries(3):
+            PlayListValuesSerializer(
+                rows, many=True, context=self.context
+            ).data
@@ -0,0 +1,257 @@
+import functools
+import os
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.utils.module_loading import import_string
+from rest_framework import throttling
+
+from theater.models import ThrottleCounter
+
+# Prune idle counters once every this many hits per process
+PRUNE_EVERY = 1000
+
+# Rolls the counter into the current slot and counts the hit in one
+# statement, so concurrent workers can never lose an update
+HIT_SQL = """
+    INSERT INTO {table} (bucket, slot, hits, previous_hits, expires_at)
+    VALUES (%s, %s, 1, 0, %s)
+    ON CONFLICT (bucket) DO UPDATE SET
+        previous_hits = CASE
+            WHEN {table}.slot >= excluded.slot THEN {table}.previous_hits
+            WHEN {table}.slot = excluded.slot - 1 THEN {table}.hits
+            ELSE 0
+        END,
+        hits = CASE
+            WHEN {table}.slot >= excluded.slot THEN {table}.hits + 1
+            ELSE 1
+        END,
+        slot = CASE
+            WHEN {table}.slot >= excluded.slot THEN {table}.slot
+            ELSE excluded.slot
+        END,
+        expires_at = excluded.expires_at
+    RETURNING previous_hits, hits
+"""
+UNDO_SQL = """
+    UPDATE {table} SET hits = hits - 1
+    WHERE bucket = %s AND slot = %s AND hits > 0
+"""
+PRUNE_SQL = "DELETE FROM {table} WHERE expires_at < %s"
+
+
+class ThrottleStore:
+    """Sliding-window request counters shared by every worker.
+
+    Each key keeps the hit count of the current fixed window and of the one
+    before it; the previous count is weighted by how much of it still
+    overlaps the sliding window. A hit costs one atomic increment and a
+    rejected hit one more to take it back, whatever the request rate.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def increment(self, key, slot, expires_at) -> tuple[int, int]:
+        """Count a hit in ``slot`` and return (previous, current) counts."""
+        raise NotImplementedError
+
+    def undo(self, key, slot) -> None:
+        raise NotImplementedError
+
+    def prune(self, now) -> None:
+        """Drop counters that have been idle for a whole window."""
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def hit(self, key, limit, duration, now) -> tuple[bool, float]:
+        """Record a request; return whether it is allowed and the wait."""
+        slot, elapsed = divmod(now, duration)
+        slot = int(slot)
+        self.calls += 1
+        if self.calls % PRUNE_EVERY == 0:
+            self.prune(now)
+
+        previous, current = self.increment(key, slot, now + 2 * duration)
+        remaining = 1 - elapsed / duration
+        if previous * remaining + current <= limit:
+            return True, 0.0
+
+        self.undo(key, slot)
+        current -= 1
+        if previous and current < limit:
+            # Wait until enough of the previous window has slid out
+            wait = (1 - (limit - current - 1) / previous) * duration - elapsed
+        else:
+            wait = duration - elapsed
+        return False, max(wait, 0.0)
+
+
+class CacheThrottleStore(ThrottleStore):
+    """Counters in a Django cache, shared if that cache is.
+
+    ``incr`` is atomic on Memcached, Redis and the local-memory cache, so
+    this is only as shared as the cache alias given as ``location``.
+    """
+
+    def __init__(self, location="default"):
+        super().__init__()
+        self.alias = location
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _key(self, key, slot):
+        return f"throttle:{key}:{slot}"
+
+    def increment(self, key, slot, expires_at):
+        counter = self._key(key, slot)
+        # Keep the counter while it can still be read as the previous one
+        timeout = max(int(expires_at - time.time()) + 1, 1)
+        if self.cache.add(counter, 1, timeout=timeout):
+            current = 1
+        else:
+            try:
+                current = self.cache.incr(counter)
+            except ValueError:
+                self.cache.add(counter, 0, timeout=timeout)
+                current = self.cache.incr(counter)
+        return self.cache.get(self._key(key, slot - 1), 0), current
+
+    def undo(self, key, slot):
+        try:
+            self.cache.decr(self._key(key, slot))
+        except ValueError:
+            pass
+
+    def clear(self):
+        self.cache.clear()
+
+
+class SQLiteThrottleStore(ThrottleStore):
+    """Counters in an on-disk SQLite file shared by the workers of a host.
+
+    Every hit is a single ``INSERT ... ON CONFLICT ... RETURNING`` that
+    SQLite serializes under its write lock. Connections are opened per
+    thread and re-opened after a fork.
+    """
+
+    table = "throttle_counter"
+
+    def __init__(self, location):
+        super().__init__()
+        self.location = str(location)
+        self.local = threading.local()
+
+    @property
+    def connection(self):
+        if getattr(self.local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(
+                self.location, timeout=5, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "bucket TEXT PRIMARY KEY, slot INTEGER NOT NULL, "
+                "hits INTEGER NOT NULL, previous_hits INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL)"
+            )
+            self.local.connection = connection
+            self.local.pid = os.getpid()
+        return self.local.connection
+
+    def execute(self, sql, params):
+        return self.connection.execute(
+            sql.format(table=self.table).replace("%s", "?"), params
+        )
+
+    def increment(self, key, slot, expires_at):
+        return self.execute(HIT_SQL, (key, slot, expires_at)).fetchone()
+
+    def undo(self, key, slot):
+        self.execute(UNDO_SQL, (key, slot))
+
+    def prune(self, now):
+        self.execute(PRUNE_SQL, (now,))
+
+    def clear(self):
+        self.execute("DELETE FROM {table}", ())
+
+
+class DatabaseThrottleStore(ThrottleStore):
+    """Counters in the ``ThrottleCounter`` table of a Django database.
+
+    On PostgreSQL the table is unlogged, so the counters skip the WAL and
+    cost about as much as an in-memory write; they are lost on a crash,
+    which only forgives recent requests.
+    """
+
+    def __init__(self, location="default"):
+        super().__init__()
+        self.alias = location
+
+    table = ThrottleCounter._meta.db_table
+
+    def execute(self, sql, params):
+        connection = connections[self.alias]
+        cursor = connection.cursor()
+        cursor.execute(
+            sql.format(table=connection.ops.quote_name(self.table)), params
+        )
+        return cursor
+
+    def increment(self, key, slot, expires_at):
+        with self.execute(HIT_SQL, (key, slot, expires_at)) as cursor:
+            return cursor.fetchone()
+
+    def undo(self, key, slot):
+        self.execute(UNDO_SQL, (key, slot)).close()
+
+    def prune(self, now):
+        self.execute(PRUNE_SQL, (now,)).close()
+
+    def clear(self):
+        self.execute("DELETE FROM {table}", ()).close()
+
+
+@functools.cache
+def get_throttle_store() -> ThrottleStore:
+    config = settings.THROTTLE_STORE
+    return import_string(config["BACKEND"])(config["LOCATION"])
+
+
+class SharedThrottleMixin:
+    """Checks a DRF rate throttle against ``get_throttle_store()``.
+
+    Replaces the per-process list of timestamps kept in the cache; scopes,
+    rates and cache keys are those of the throttle class it is mixed into.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        allowed, self._wait = get_throttle_store().hit(
+            key, self.num_requests, self.duration, self.timer()
+        )
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class AnonRateThrottle(SharedThrottleMixin, throttling.AnonRateThrottle):
+    pass
+
+
+class UserRateThrottle(SharedThrottleMixin, throttling.UserRateThrottle):
+    pass
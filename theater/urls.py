@@ -9,6 +9,9 @@ from theater.views import (
     TicketViewSet,
     TheaterHallViewSet,
     ReservationViewSet,
+    SeatHoldViewSet,
+    MetricsView,
+    TicketExportView,
 )
 
 router = routers.DefaultRouter()
@@ -19,7 +22,16 @@ router.register("performances", PerformanceViewSet)
 router.register("tickets", TicketViewSet)
 router.register("theater_halls", TheaterHallViewSet)
 router.register("reservations", ReservationViewSet)
+router.register("seat_holds", SeatHoldViewSet)
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+    path(
+        "export/tickets/",
+        TicketExportView.as_view(),
+        name="ticket-export",
+    ),
+    path("", include(router.urls)),
+]
 
 app_name = "theater"
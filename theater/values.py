@@ -0,0 +1,129 @@
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from theater.fieldsets import SparseFieldsViewMixin
+from theater.metrics import timed
+
+
+class ValuesListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        rows = list(data)
+        self.child.prepare(rows)
+        to_representation = self.child.to_representation
+        return [to_representation(row) for row in rows]
+
+
+class ValuesSerializer(serializers.BaseSerializer):
+    """Read-only serializer for the rows of a ``.values()`` queryset.
+
+    ``columns`` maps every output field, in output order, to the columns
+    it is built from, and ``get_<field>(row)`` builds it. Only the fields
+    passed as ``fields`` are built, from only the columns they need, which
+    skips the field binding and attribute lookups a ``ModelSerializer``
+    does for every instance. Data that is not in the row, such as
+    many-to-many names, is loaded once per page in ``prepare``.
+    """
+
+    columns = {}
+
+    class Meta:
+        list_serializer_class = ValuesListSerializer
+
+    def __init__(self, *args, fields=None, prefix="", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prefix = prefix
+        self.getters = [
+            (name, getattr(self, f"get_{name}"))
+            for name in self.get_field_names(fields)
+        ]
+
+    @classmethod
+    def get_field_names(cls, fields=None) -> list[str]:
+        if fields is None:
+            return list(cls.columns)
+        unknown = sorted(set(fields) - set(cls.columns))
+        if unknown:
+            raise ValidationError(
+                {"fields": [f"Unknown field: {name}" for name in unknown]}
+            )
+        return [name for name in cls.columns if name in fields]
+
+    @classmethod
+    def get_values(cls, fields=None, prefix="") -> list[str]:
+        """The ``.values()`` columns that ``fields`` are built from."""
+        return list(
+            dict.fromkeys(
+                prefix + column
+                for name in cls.get_field_names(fields)
+                for column in cls.columns[name]
+            )
+        )
+
+    def column(self, row, name):
+        return row[self.prefix + name]
+
+    def prepare(self, rows) -> None:
+        """Load what a page of ``rows`` needs beyond its own columns."""
+
+    def to_representation(self, row):
+        return {name: getter(row) for name, getter in self.getters}
+
+
+class ValuesListMixin(SparseFieldsViewMixin):
+    """Serves ``list`` through ``values_serializer_class``.
+
+    The filtered queryset is read with ``.values()``, so no model instances
+    are built, and ``?fields=`` narrows the columns and joins read.
+    Requests that expand or trim nested fields fall back to the model
+    serializer, which ``get_serializer_class`` still returns for the
+    schema; the two must produce the same output.
+    """
+
+    values_serializer_class = None
+
+    def serves_values(self) -> bool:
+        if self.action != "list" or self.get_requested_expand():
+            return False
+        fields = self.get_requested_fields() or ()
+        return not any("." in name for name in fields)
+
+    def get_query_plan(self):
+        if self.serves_values():
+            return None
+        return super().get_query_plan()
+
+    def list(self, request, *args, **kwargs):
+        if not self.serves_values():
+            return super().list(request, *args, **kwargs)
+
+        serializer_class = self.values_serializer_class
+        fields = self.get_requested_fields()
+        queryset = self.filter_queryset(self.get_queryset())
+        # Pagination reads the sort key from the rows
+        ordering = [
+            field.lstrip("-")
+            for field in queryset.query.order_by
+            or queryset.model._meta.ordering
+            if isinstance(field, str)
+        ]
+        rows = queryset.prefetch_related(None).values(
+            *dict.fromkeys(
+                serializer_class.get_values(fields) + ordering + ["id"]
+            )
+        )
+        context = self.get_serializer_context()
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            serializer = timed(
+                serializer_class(
+                    page, many=True, fields=fields, context=context
+                )
+            )
+            return self.get_paginated_response(serializer.data)
+
+        serializer = timed(
+            serializer_class(rows, many=True, fields=fields, context=context)
+        )
+        return Response(serializer.data)
@@ -1,15 +1,35 @@
 from datetime import datetime
 
-from django.db.models import F, Count, Q
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.timezone import now
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import (
+    AllowAny,
+    IsAdminUser,
+    IsAuthenticated,
+)
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
 
+from theater.admission import (
+    AdmissionControlMixin,
+    ReservationAdmissionMixin,
+)
+from theater.cache import CachedListMixin
+from theater.fieldsets import SparseFieldsViewMixin
+from theater.export import export_rows
+from theater.idempotency import IDEMPOTENCY_HEADER, IdempotentCreateMixin
+from theater.conditional import (
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+)
+from theater.metrics import REGISTRY, SerializerTimingMixin, timed
 from theater.models import (
     Genre,
     Actor,
@@ -17,9 +37,15 @@ from theater.models import (
     Performance,
     TheaterHall,
     Reservation,
+    SeatHold,
     Ticket,
 )
+from theater.renderers import CSVRenderer, NDJSONRenderer
+from theater.pagination import KeysetPaginationMixin, OrderPagination
 from theater.permissions import IsAdminOrAuthenticatedReadOnly
+from theater.schema import SCHEMA_CONTENT_TYPE, get_schema
+from theater.search import search_plays
+from theater.values import ValuesListMixin
 from theater.serializers import (
     GenreSerializer,
     ActorSerializer,
@@ -35,48 +61,97 @@ from theater.serializers import (
     ReservationListSerializer,
     TicketListSerializer,
     PlayImageSerializer,
+    SeatHoldSerializer,
+    BestAvailableSerializer,
+    BestAvailableHoldSerializer,
+    PlayListValuesSerializer,
+    PerformanceListValuesSerializer,
+    TicketListValuesSerializer,
 )
 
 
+SPARSE_FIELDS_PARAMETERS = [
+    OpenApiParameter(
+        "fields",
+        type=OpenApiTypes.STR,
+        description=(
+            "Comma-separated fields to return, dotted for nested ones "
+            "(ex. ?fields=id,show_time)"
+        ),
+    ),
+    OpenApiParameter(
+        "expand",
+        type=OpenApiTypes.STR,
+        description=(
+            "Comma-separated relations to return as nested objects "
+            "(ex. ?expand=play.actors)"
+        ),
+    ),
+]
+
+IDEMPOTENCY_PARAMETERS = [
+    OpenApiParameter(
+        IDEMPOTENCY_HEADER,
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.HEADER,
+        description=(
+            "Client-chosen key; retries sending it again get the first "
+            "successful response back instead of buying twice"
+        ),
+    ),
+]
+
+
 class GenreViewSet(
+    CachedListMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.UpdateModelMixin,
+    SerializerTimingMixin,
     GenericViewSet,
 ):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_models = (Genre,)
     permission_classes = [
         IsAdminOrAuthenticatedReadOnly,
     ]
 
 
 class ActorViewSet(
+    CachedListMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.UpdateModelMixin,
+    SerializerTimingMixin,
     GenericViewSet,
 ):
     queryset = Actor.objects.all()
     serializer_class = ActorSerializer
+    cache_models = (Actor,)
     permission_classes = [
         IsAdminOrAuthenticatedReadOnly,
     ]
 
 
-class OrderPagination(PageNumberPagination):
-    page_size = 5
-    max_page_size = 50
-
-
 class PlayViewSet(
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    CachedListMixin,
+    ValuesListMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.UpdateModelMixin,
     mixins.RetrieveModelMixin,
+    SerializerTimingMixin,
     viewsets.GenericViewSet,
 ):
-    queryset = Play.objects.prefetch_related("genres", "actors")
+    # Relations are loaded as the requested fields need them
+    queryset = Play.objects.all()
+    values_serializer_class = PlayListValuesSerializer
+    cache_models = (Play, Genre, Actor)
+    cache_query_params = ("title", "genres", "actors", "fields", "expand")
+    etag_models = (Genre, Actor)
     permission_classes = (IsAdminOrAuthenticatedReadOnly,)
 
     def get_queryset(self):
@@ -84,22 +159,9 @@ class PlayViewSet(
         genres = self.request.query_params.get("genres")
         actors = self.request.query_params.get("actors")
 
-        queryset = self.queryset
-
-        filters = Q()
-
-        if title:
-            filters &= Q(title__icontains=title)
-
-        if genres:
-            filters &= Q(genres__name__icontains=genres)
-
-        if actors:
-            filters &= Q(actors__first_name__icontains=actors) | Q(
-                actors__last_name__icontains=actors
-            )
-
-        return queryset.filter(filters).distinct()
+        return search_plays(
+            self.queryset, title=title, genres=genres, actors=actors
+        )
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -146,26 +208,49 @@ class PlayViewSet(
                 type=OpenApiTypes.STR,
                 description="Filter by title (ex. ?title=title)",
             ),
+            *SPARSE_FIELDS_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(parameters=SPARSE_FIELDS_PARAMETERS)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
 
 class TicketViewSet(
+    IdempotentCreateMixin,
+    AdmissionControlMixin,
+    KeysetPaginationMixin,
+    ValuesListMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
+    SerializerTimingMixin,
     GenericViewSet,
 ):
     queryset = Ticket.objects.all()
     serializer_class = TicketSerializer
+    values_serializer_class = TicketListValuesSerializer
     pagination_class = OrderPagination
     permission_classes = [
         IsAuthenticated,
     ]
 
     def get_queryset(self):
-        queryset = Ticket.objects.select_related()
+        show_time = self.request.query_params.get("show_time")
+
+        # Newest reservations first, in an order ticket_reservation_id_idx
+        # can seek on once the user's reservations are known
+        queryset = self.queryset.filter(
+            reservation__user=self.request.user
+        ).order_by("-reservation_id", "-id")
+
+        if show_time == "upcoming":
+            queryset = queryset.filter(performance__show_time__gte=now())
+        elif show_time == "past":
+            queryset = queryset.filter(performance__show_time__lt=now())
+
         return queryset
 
     def get_serializer_class(self):
@@ -173,26 +258,55 @@ class TicketViewSet(
             return TicketListSerializer
         return TicketSerializer
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "show_time",
+                type=OpenApiTypes.STR,
+                enum=["upcoming", "past"],
+                description=(
+                    "Filter by performance show time "
+                    "(ex. ?show_time=upcoming)"
+                ),
+            ),
+            *SPARSE_FIELDS_PARAMETERS,
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(parameters=IDEMPOTENCY_PARAMETERS)
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
 
 class TheaterHallViewSet(
+    ConditionalListMixin,
+    CachedListMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
+    SerializerTimingMixin,
     GenericViewSet,
 ):
     queryset = TheaterHall.objects.all()
     serializer_class = TheaterHallSerializer
+    cache_models = (TheaterHall,)
     permission_classes = [
         IsAdminOrAuthenticatedReadOnly,
     ]
 
 
 class ReservationViewSet(
+    IdempotentCreateMixin,
+    ReservationAdmissionMixin,
+    KeysetPaginationMixin,
+    SparseFieldsViewMixin,
     mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    SerializerTimingMixin,
     GenericViewSet,
 ):
-    queryset = Reservation.objects.prefetch_related(
-        "tickets__performance__play", "tickets__performance__theater_hall"
-    )
+    queryset = Reservation.objects.all()
     serializer_class = ReservationSerializer
     pagination_class = OrderPagination
     permission_classes = [
@@ -206,30 +320,91 @@ class ReservationViewSet(
         return ReservationSerializer
 
     def get_queryset(self):
-        return Reservation.objects.filter(user=self.request.user)
+        return self.queryset.filter(user=self.request.user)
+
+    @extend_schema(parameters=SPARSE_FIELDS_PARAMETERS)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(parameters=IDEMPOTENCY_PARAMETERS)
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @extend_schema(request=None)
+    @action(methods=["POST"], detail=False, url_path="checkout")
+    def checkout(self, request):
+        """Close the reservation tickets are being added to."""
+        reservation = Reservation.close_for(request.user.id)
+        if reservation is None:
+            raise NotFound("There is no open reservation to check out.")
+        serializer = self.get_serializer(reservation)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class SeatHoldViewSet(
+    AdmissionControlMixin,
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    SerializerTimingMixin,
+    GenericViewSet,
+):
+    """Seats set aside for the current user until checkout or expiry."""
+
+    queryset = SeatHold.objects.all()
+    serializer_class = SeatHoldSerializer
+    permission_classes = [
+        IsAuthenticated,
+    ]
+
+    def get_queryset(self):
+        return SeatHold.objects.filter(user=self.request.user)
+
+    def get_serializer_class(self):
+        if self.action == "checkout":
+            return ReservationSerializer
+
+        return SeatHoldSerializer
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    def perform_destroy(self, instance):
+        instance.release()
+
+    @action(methods=["POST"], detail=True, url_path="checkout")
+    def checkout(self, request, pk=None):
+        hold = self.get_object()
+        with self.admission(request, [hold.performance_id]):
+            reservation = hold.checkout()
+        serializer = self.get_serializer(reservation)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
 
 class PerformanceViewSet(
+    AdmissionControlMixin,
+    ConditionalRetrieveMixin,
+    KeysetPaginationMixin,
+    ValuesListMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.UpdateModelMixin,
     mixins.RetrieveModelMixin,
+    SerializerTimingMixin,
     GenericViewSet,
 ):
-    queryset = (
-        Performance.objects.all()
-        .select_related("play", "theater_hall")
-        .annotate(
-            tickets_available=(
-                F("theater_hall__rows") * F("theater_hall__seats_in_row")
-                - Count("tickets")
-            )
-        )
-    )
+    """Scheduled showings of plays, with the seats still free."""
+
+    queryset = Performance.objects.all()
     serializer_class = PerformanceSerializer
+    values_serializer_class = PerformanceListValuesSerializer
+    etag_related = ("play", "theater_hall")
+    # Lists are left unconditional: counting every performance would undo
+    # the keyset pagination savings
+    etag_models = (Genre, Actor)
     pagination_class = OrderPagination
     permission_classes = [
         IsAdminOrAuthenticatedReadOnly,
@@ -251,6 +426,9 @@ class PerformanceViewSet(
         if play:
             queryset = queryset.filter(play__id=play)
 
+        if self.action == "best_available":
+            queryset = queryset.select_related("theater_hall")
+
         return queryset
 
     def get_serializer_class(self):
@@ -260,8 +438,25 @@ class PerformanceViewSet(
         if self.action == "retrieve":
             return PerformanceDetailSerializer
 
+        if self.action == "best_available":
+            if self.request.method == "POST":
+                return BestAvailableHoldSerializer
+            return BestAvailableSerializer
+
         return PerformanceSerializer
 
+    def get_admission_performance_ids(self, request):
+        # Creating a performance books nothing; best-available holds pass
+        # their performance to ``admission`` themselves
+        return []
+
+    def get_query_plan(self):
+        plan = super().get_query_plan()
+        if plan is not None and self.action == "retrieve":
+            # The validators read updated_at of these relations
+            plan.select.update(self.etag_related)
+        return plan
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -274,7 +469,189 @@ class PerformanceViewSet(
                 type=OpenApiTypes.INT,
                 description="Filter by play(ex. ?play=4)",
             ),
+            OpenApiParameter(
+                "cursor",
+                type=OpenApiTypes.STR,
+                description=(
+                    "Keyset pagination cursor, send it empty to start "
+                    "(ex. ?cursor=)"
+                ),
+            ),
+            *SPARSE_FIELDS_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
+
+    @extend_schema(parameters=SPARSE_FIELDS_PARAMETERS)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @extend_schema(
+        methods=["GET"],
+        parameters=[
+            OpenApiParameter(
+                "count",
+                type=OpenApiTypes.INT,
+                required=True,
+                description="Number of adjacent seats (ex. ?count=4)",
+            ),
+        ],
+    )
+    @extend_schema(methods=["POST"], responses={201: SeatHoldSerializer})
+    @action(
+        methods=["GET", "POST"],
+        detail=True,
+        url_path="best-available",
+        permission_classes=[IsAuthenticated],
+    )
+    def best_available(self, request, pk=None):
+        """The best block of adjacent free seats; POST holds it."""
+        performance = self.get_object()
+        if request.method == "POST":
+            serializer = self.get_serializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            with self.admission(request, [performance.id]):
+                hold = SeatHold.place_best(
+                    request.user,
+                    performance.id,
+                    serializer.validated_data["count"],
+                    serializer.validated_data["minutes"],
+                )
+            return Response(
+                timed(SeatHoldSerializer(hold)).data,
+                status=status.HTTP_201_CREATED,
+            )
+
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        count = serializer.validated_data["count"]
+        seats = performance.best_available(count)
+        return Response(
+            self.get_serializer(
+                {
+                    "count": count,
+                    "seats": [
+                        {"row": row, "seat": seat} for row, seat in seats
+                    ],
+                }
+            ).data
+        )
+
+
+@extend_schema(exclude=True)
+class MetricsView(APIView):
+    """Request histograms of this worker in the Prometheus text format."""
+
+    permission_classes = (IsAdminUser,)
+    # Scrapers poll far more often than the user rate allows
+    throttle_classes = ()
+
+    def get(self, request):
+        return HttpResponse(
+            REGISTRY.render(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+
+@extend_schema(exclude=True)
+class SchemaView(APIView):
+    """The OpenAPI schema, served from bytes computed once per process."""
+
+    permission_classes = (AllowAny,)
+
+    def get(self, request):
+        schema = get_schema()
+        if schema is None:
+            raise Http404("The API schema has not been built")
+        response = get_conditional_response(request, etag=schema.etag)
+        if response is None:
+            if "gzip" in request.headers.get("Accept-Encoding", ""):
+                response = HttpResponse(
+                    schema.compressed, content_type=SCHEMA_CONTENT_TYPE
+                )
+                response["Content-Encoding"] = "gzip"
+            else:
+                response = HttpResponse(
+                    schema.content, content_type=SCHEMA_CONTENT_TYPE
+                )
+        response["ETag"] = schema.etag
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+
+class TicketExportView(APIView):
+    """Every sold ticket as flat CSV or NDJSON rows, streamed as read.
+
+    The format is negotiated on Accept or ``?format=``, CSV by default.
+    """
+
+    permission_classes = (IsAdminUser,)
+    renderer_classes = (CSVRenderer, NDJSONRenderer)
+
+    def get_queryset(self):
+        params = self.request.query_params
+        queryset = Ticket.objects.all()
+
+        performance = params.get("performance")
+        if performance:
+            if not performance.isdigit():
+                raise ValidationError(
+                    {"performance": ["A valid integer is required."]}
+                )
+            queryset = queryset.filter(performance_id=performance)
+
+        for param, lookup in (
+            ("date_from", "performance__show_time__date__gte"),
+            ("date_to", "performance__show_time__date__lte"),
+        ):
+            date_str = params.get(param)
+            if not date_str:
+                continue
+            try:
+                date = datetime.strptime(date_str, "%Y-%m-%d").date()
+            except ValueError:
+                raise ValidationError({param: ["Use the YYYY-MM-DD format."]})
+            queryset = queryset.filter(**{lookup: date})
+
+        return queryset
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "performance",
+                type=OpenApiTypes.INT,
+                description="Export one performance (ex. ?performance=4)",
+            ),
+            OpenApiParameter(
+                "date_from",
+                type=OpenApiTypes.DATE,
+                description=(
+                    "Performances on or after this date "
+                    "(format: YYYY-MM-DD)"
+                ),
+            ),
+            OpenApiParameter(
+                "date_to",
+                type=OpenApiTypes.DATE,
+                description=(
+                    "Performances on or before this date "
+                    "(format: YYYY-MM-DD)"
+                ),
+            ),
+        ],
+        responses={
+            (200, CSVRenderer.media_type): OpenApiTypes.STR,
+            (200, NDJSONRenderer.media_type): OpenApiTypes.STR,
+        },
+    )
+    def get(self, request):
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(export_rows(self.get_queryset())),
+            content_type=f"{renderer.media_type}; charset=utf-8",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="tickets.{renderer.format}"'
+        )
+        return response